@@ -0,0 +1,65 @@
+"""015_migration
+
+Revision ID: 19b4ab0bf600
+Revises: d1427aedabe4
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+import jwt
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '19b4ab0bf600'
+down_revision: Union[str, None] = 'd1427aedabe4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('crl', sa.Column('token_digest', sa.String(length=64), nullable=True))
+    op.add_column('crl', sa.Column('expires_at', sa.TIMESTAMP(), nullable=True))
+
+    # Переносим существующие записи: digest и exp вычисляются из сохраненного JWT
+    connection = op.get_bind()
+    crl = sa.table('crl', sa.column('id', sa.Integer), sa.column('token', sa.String),
+                   sa.column('token_digest', sa.String), sa.column('expires_at', sa.TIMESTAMP))
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    for crl_id, token in connection.execute(sa.select(crl.c.id, crl.c.token)).all():
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False, "verify_exp": False}).get("exp")
+        except jwt.PyJWTError:
+            exp = None
+        expires_at = datetime.fromtimestamp(exp, tz=timezone.utc).replace(tzinfo=None) if exp else now + timedelta(days=1)
+
+        connection.execute(
+            crl.update().where(crl.c.id == crl_id).values(
+                token_digest=hashlib.sha256(token.encode()).hexdigest(),
+                expires_at=expires_at
+            )
+        )
+
+    op.execute("DELETE FROM crl a USING crl b WHERE a.token_digest = b.token_digest AND a.id > b.id")
+    op.alter_column('crl', 'token_digest', nullable=False)
+    op.alter_column('crl', 'expires_at', nullable=False)
+    op.create_index(op.f('ix_crl_token_digest'), 'crl', ['token_digest'], unique=True)
+    op.create_index(op.f('ix_crl_expires_at'), 'crl', ['expires_at'], unique=False)
+    op.drop_index('ix_crl_token', table_name='crl')
+    op.drop_column('crl', 'token')
+
+
+def downgrade() -> None:
+    # Исходные токены по digest не восстановить: отозванные записи теряются
+    op.execute("DELETE FROM crl")
+    op.add_column('crl', sa.Column('token', sa.VARCHAR(), autoincrement=False, nullable=False))
+    op.create_index('ix_crl_token', 'crl', ['token'], unique=False)
+    op.drop_index(op.f('ix_crl_expires_at'), table_name='crl')
+    op.drop_index(op.f('ix_crl_token_digest'), table_name='crl')
+    op.drop_column('crl', 'expires_at')
+    op.drop_column('crl', 'token_digest')
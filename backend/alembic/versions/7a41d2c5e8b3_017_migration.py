@@ -0,0 +1,50 @@
+"""017_migration
+
+Revision ID: 7a41d2c5e8b3
+Revises: 3c8e1f0a9d27
+Create Date: 2026-10-18 12:41:05.528317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a41d2c5e8b3'
+down_revision: Union[str, None] = '3c8e1f0a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+order_status = sa.Enum('created', 'assigned', 'in_progress', 'completed', 'cancelled', name='orderstatusenum')
+driver_status = sa.Enum('available', 'busy', 'offline', name='driverstatusenum')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    order_status.create(bind, checkfirst=True)
+    driver_status.create(bind, checkfirst=True)
+
+    op.add_column('order', sa.Column('status', order_status, server_default='created', nullable=False))
+    op.create_index(op.f('ix_order_status'), 'order', ['status'], unique=False)
+    # Заказы, созданные до появления статусов, считаем завершенными
+    op.execute("UPDATE \"order\" SET status = 'completed'")
+
+    op.add_column('driver', sa.Column('status', driver_status, server_default='available', nullable=False))
+    op.add_column('driver', sa.Column('active_orders', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_driver_status'), 'driver', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_driver_status'), table_name='driver')
+    op.drop_column('driver', 'active_orders')
+    op.drop_column('driver', 'status')
+
+    op.drop_index(op.f('ix_order_status'), table_name='order')
+    op.drop_column('order', 'status')
+
+    bind = op.get_bind()
+    driver_status.drop(bind, checkfirst=True)
+    order_status.drop(bind, checkfirst=True)
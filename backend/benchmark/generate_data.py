@@ -0,0 +1,374 @@
+# Генератор синтетических данных для нагрузочного тестирования: пользователи, дома, водители, заказы.
+#
+# Запуск из каталога backend:
+#   python -m benchmark.generate_data --url sqlite:///load.db --create-tables --reset
+#   python -m benchmark.generate_data --users 1000000 --houses 500000 --drivers 50000 --orders 5000000 --reset
+#
+# Без --url используется база приложения из переменных окружения (DB_URL или DB_HOST и т.д.).
+# В PostgreSQL строки загружаются через COPY, в остальные СУБД - пачками многострочных вставок.
+# Данные детерминированы: одинаковые --seed и --until дают одинаковое содержимое, а после --reset
+# и одинаковые ID. Каждая сущность генерируется из своего потока случайных чисел, поэтому
+# изменение числа заказов не меняет дома и водителей.
+#
+# Распределения:
+#  - дома стоят вдоль улиц: у улицы случайные центр (ближе к центру города) и направление,
+#    длина улицы логнормальная, часть домов со строениями и литерами;
+#  - водители: 60% эконом, 30% комфорт, 10% бизнес; 20% не на линии; координаты - вокруг центра;
+#  - у всех пользователей один пароль (--password): bcrypt на каждого занял бы часы;
+#  - заказы: немногие пользователи и адреса дают большую часть заказов, время заказа следует
+#    суточному профилю с утренним и вечерним пиками, 90% заказов выполнены, 10% отменены.
+import argparse
+import csv
+import io
+import itertools
+import math
+import os
+import random
+import time
+
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+
+# Центр и масштаб города (Москва): координаты домов и водителей разбрасываются вокруг центра
+CITY_CENTER = (55.751, 37.618)
+CITY_SIGMA_DEGREES = (0.08, 0.13)
+# Шаг номеров домов вдоль улицы, градусы (~50 м)
+HOUSE_STEP_DEGREES = 0.00045
+
+STREET_TYPES = ("ул.", "пр.", "пер.", "б-р", "ш.")
+STREET_NAMES = (
+    "Ленина", "Пушкина", "Гоголя", "Садовая", "Мира", "Красная", "Октябрьская", "Комсомольская",
+    "Советская", "Гагарина", "Тимирязева", "Беринга", "Чехова", "Степана Разина", "Кленовая",
+    "Полярная", "Лесная", "Центральная", "Дружбы", "Уральская", "Ломоносова", "Солнечная", "Новая",
+    "Восточная", "Западная", "Северная", "Южная", "Зелёная", "Набережная", "Заречная", "Широкая",
+    "Фрунзе", "Гармония", "Лермонтова", "Толстого", "Куйбышева", "Чкалова", "Свердлова", "Кирова",
+    "Маяковского", "Есенина", "Суворова", "Кутузова", "Жукова", "Победы", "Молодёжная", "Школьная",
+    "Парковая", "Вокзальная", "Заводская", "Рабочая", "Строителей", "Энтузиастов", "Космонавтов",
+    "Луговая", "Полевая", "Речная", "Озёрная", "Берёзовая", "Сосновая", "Рябиновая", "Вишнёвая",
+)
+BUILDING_SHARE = 0.3
+LETTER_SHARE = 0.08
+LETTERS = ("А", "Б", "В")
+
+LAST_NAMES = (
+    "Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев", "Зайцев", "Михайлов",
+    "Лебедев", "Федоров", "Морозов", "Соловьев", "Чернов", "Тихонов", "Синицын", "Григорьев", "Ковалев",
+    "Николаев", "Белов", "Костин", "Захаров", "Романов", "Волков", "Соколов", "Новиков", "Егоров",
+)
+FIRST_NAMES = (
+    "Иван", "Петр", "Сергей", "Алексей", "Артем", "Андрей", "Михаил", "Игорь", "Николай", "Антон",
+    "Виктор", "Дмитрий", "Денис", "Роман", "Павел", "Юрий", "Василий", "Олег", "Максим", "Евгений",
+)
+PATRONYMICS = (
+    "Иванович", "Петрович", "Сергеевич", "Алексеевич", "Андреевич", "Михайлович", "Николаевич",
+    "Викторович", "Дмитриевич", "Павлович", "Юрьевич", "Олегович", "Владимирович", "Игоревич",
+)
+
+DRIVER_CLASS_WEIGHTS = (("econom", 0.6), ("comfortable", 0.3), ("business", 0.1))
+DRIVER_OFFLINE_SHARE = 0.2
+CARS = {
+    "econom": ("Kia Rio", "Hyundai Solaris", "Volkswagen Polo", "Skoda Rapid", "Renault Logan", "Lada Vesta"),
+    "comfortable": ("Toyota Camry", "Kia K5", "Skoda Octavia", "Hyundai Sonata", "Volkswagen Passat"),
+    "business": ("Mercedes-Benz E-Class", "BMW 5 Series", "Audi A6", "Lexus ES", "Genesis G80"),
+}
+
+# Доля заказов по часам суток: ночной спад, пики в 8-9 и 18-19
+HOUR_WEIGHTS = (2, 1, 1, 1, 1, 2, 4, 8, 10, 9, 6, 5, 5, 5, 5, 6, 7, 9, 10, 9, 7, 6, 4, 3)
+ORDER_CANCELLED_SHARE = 0.1
+# Показатель перекоса популярности: индекс выбирается как n * u ** POPULARITY_SKEW
+POPULARITY_SKEW = 3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Synthetic data generator")
+    parser.add_argument("--url", help="URL базы данных, по умолчанию база приложения")
+    parser.add_argument("--users", type=int, default=10000, help="Число пользователей")
+    parser.add_argument("--houses", type=int, default=20000, help="Число домов")
+    parser.add_argument("--drivers", type=int, default=2000, help="Число водителей")
+    parser.add_argument("--orders", type=int, default=100000, help="Число заказов")
+    parser.add_argument("--days", type=int, default=90, help="За сколько дней до --until распределены заказы")
+    parser.add_argument("--until", help="Конец периода заказов, YYYY-MM-DD; по умолчанию начало текущих суток UTC")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password", help="Пароль всех пользователей")
+    parser.add_argument("--batch", type=int, default=10000, help="Строк в одной пачке загрузки")
+    parser.add_argument("--create-tables", action="store_true", help="Создать таблицы по моделям (без миграций)")
+    parser.add_argument("--reset", action="store_true", help="Удалить существующих пользователей, дома, водителей и заказы")
+    return parser.parse_args()
+
+
+def stream(seed, name):
+    # Отдельный детерминированный поток на каждую сущность
+    return random.Random(f"{seed}:{name}")
+
+
+def skewed_index(rng, size):
+    return min(size - 1, int(size * rng.random() ** POPULARITY_SKEW))
+
+
+def person_name(rng):
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(PATRONYMICS)}"
+
+
+def phone(rng, separator=""):
+    # У водителей номер записан как "+7(9xx) ...", у пользователей схема требует пробел после +7
+    return (f"+7{separator}(9{rng.randint(0, 99):02d}) {rng.randint(0, 999):03d} "
+            f"{rng.randint(0, 99):02d}-{rng.randint(0, 99):02d}")
+
+
+def city_point(rng):
+    return (rng.gauss(CITY_CENTER[0], CITY_SIGMA_DEGREES[0]), rng.gauss(CITY_CENTER[1], CITY_SIGMA_DEGREES[1]))
+
+
+def street_names(rng):
+    # Сначала простые названия, затем "ул. 2-я Парковая" и т.д. - улиц хватает на любое число домов
+    for ordinal in itertools.count(1):
+        names = [(street_type, name) for street_type in STREET_TYPES for name in STREET_NAMES]
+        rng.shuffle(names)
+        for street_type, name in names:
+            yield f"{street_type} {name}" if ordinal == 1 else f"{street_type} {ordinal}-я {name}"
+
+
+def generate_users(args):
+    from src.general.auth.service.hashing import password_context
+
+    password = password_context.hash(args.password)
+    rng = stream(args.seed, "users")
+
+    for index in range(1, args.users + 1):
+        yield (person_name(rng), phone(rng, " "), f"user{index}@example.com", password)
+
+
+def generate_houses(args, houses):
+    # Заполняет houses кортежами (улица, строение, номер) - они нужны заказам
+    rng = stream(args.seed, "houses")
+    names = street_names(rng)
+
+    while len(houses) < args.houses:
+        street = next(names)
+        latitude, longitude = city_point(rng)
+        angle = rng.uniform(0, math.pi)
+        step_lat = math.sin(angle) * HOUSE_STEP_DEGREES
+        step_lon = math.cos(angle) * HOUSE_STEP_DEGREES / math.cos(math.radians(latitude))
+        length = max(1, int(rng.lognormvariate(3.2, 0.8)))
+
+        for number in range(1, length + 1):
+            number_text = str(number) + (rng.choice(LETTERS) if rng.random() < LETTER_SHARE else "")
+            buildings = [str(b) for b in range(1, rng.randint(2, 4))] if rng.random() < BUILDING_SHARE else [None]
+            offset = number - length / 2
+
+            for building in buildings:
+                if len(houses) >= args.houses:
+                    return
+                houses.append((street, building, number_text))
+                yield (
+                    number_text, building, street,
+                    round(latitude + offset * step_lat + rng.gauss(0, 0.0001), 6),
+                    round(longitude + offset * step_lon + rng.gauss(0, 0.0001), 6)
+                )
+
+
+def generate_drivers(args, until, drivers):
+    # Заполняет drivers парами (класс, машина) - они нужны заказам
+    from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+    from src.general.driver.enum.DriverStatusEnum import DriverStatusEnum
+
+    rng = stream(args.seed, "drivers")
+    classes = [name for name, _ in DRIVER_CLASS_WEIGHTS]
+    weights = [weight for _, weight in DRIVER_CLASS_WEIGHTS]
+
+    for index in range(args.drivers):
+        driver_class = rng.choices(classes, weights)[0]
+        car = rng.choice(CARS[driver_class])
+        offline = rng.random() < DRIVER_OFFLINE_SHARE
+        latitude, longitude = city_point(rng)
+        drivers.append((driver_class, car))
+
+        yield (
+            person_name(rng), phone(rng), car, DriverClassEnum[driver_class],
+            DriverStatusEnum.offline if offline else DriverStatusEnum.available, 0,
+            round(latitude, 6), round(longitude, 6),
+            until - timedelta(seconds=rng.randint(0, 86400 if offline else 60))
+        )
+
+
+def generate_orders(args, until, user_ids, house_ids, houses, driver_ids, drivers):
+    from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+    from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
+
+    rng = stream(args.seed, "orders")
+    hours = list(range(24))
+    # Порядок популярности не должен совпадать с порядком ID
+    popular_users = list(user_ids)
+    popular_houses = list(range(len(house_ids)))
+    rng.shuffle(popular_users)
+    rng.shuffle(popular_houses)
+
+    drivers_by_class = {}
+    for driver_id, (driver_class, car) in zip(driver_ids, drivers):
+        drivers_by_class.setdefault(driver_class, []).append((driver_id, car))
+    classes = [name for name, _ in DRIVER_CLASS_WEIGHTS if name in drivers_by_class]
+    weights = [weight for name, weight in DRIVER_CLASS_WEIGHTS if name in drivers_by_class]
+    start = until - timedelta(days=args.days)
+
+    for _ in range(args.orders):
+        user_id = popular_users[skewed_index(rng, len(popular_users))]
+        house_from = popular_houses[skewed_index(rng, len(popular_houses))]
+        house_to = popular_houses[skewed_index(rng, len(popular_houses))]
+        driver_class = rng.choices(classes, weights)[0]
+        driver_id, car = rng.choice(drivers_by_class[driver_class])
+        order_date = start + timedelta(
+            days=rng.randrange(args.days),
+            hours=rng.choices(hours, HOUR_WEIGHTS)[0],
+            seconds=rng.randrange(3600)
+        )
+        status = OrderStatusEnum.cancelled if rng.random() < ORDER_CANCELLED_SHARE else OrderStatusEnum.completed
+        from_street, from_building, from_number = houses[house_from]
+        to_street, to_building, to_number = houses[house_to]
+
+        yield (
+            user_id, driver_id,
+            house_ids[house_from], from_street, from_building, from_number,
+            house_ids[house_to], to_street, to_building, to_number,
+            DriverClassEnum[driver_class], car, status, order_date
+        )
+
+
+def copy_value(value):
+    # Перечисления хранятся в БД под именами членов
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+class Loader:
+    def __init__(self, engine, batch):
+        self.engine = engine
+        self.batch = batch
+        self.postgres = engine.dialect.name == "postgresql"
+
+    def load(self, table, columns, rows) -> int:
+        count = 0
+        with self.engine.begin() as connection:
+            for chunk in iter(lambda: list(itertools.islice(rows, self.batch)), []):
+                if self.postgres:
+                    self._copy(connection, table, columns, chunk)
+                else:
+                    connection.execute(table.insert(), [dict(zip(columns, row)) for row in chunk])
+                count += len(chunk)
+        return count
+
+    @staticmethod
+    def _copy(connection, table, columns, chunk):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in chunk:
+            writer.writerow([copy_value(value) for value in row])
+        buffer.seek(0)
+
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+        finally:
+            cursor.close()
+
+    def max_id(self, table) -> int:
+        from sqlalchemy import func, select
+
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+
+    def ids_after(self, table, last_id):
+        from sqlalchemy import select
+
+        with self.engine.connect() as connection:
+            return list(connection.execute(select(table.c.id).where(table.c.id > last_id).order_by(table.c.id)).scalars())
+
+    def reset(self, tables):
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            if self.postgres:
+                names = ", ".join(f'"{table.name}"' for table in tables)
+                connection.execute(text(f"TRUNCATE {names} RESTART IDENTITY"))
+            else:
+                for table in tables:
+                    connection.execute(table.delete())
+
+    def analyze(self):
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+
+USER_COLUMNS = ("name", "tel", "email", "password")
+HOUSE_COLUMNS = ("number", "building", "street", "latitude", "longitude")
+DRIVER_COLUMNS = ("name", "tel", "car", "driver_class", "status", "active_orders",
+                  "latitude", "longitude", "location_updated_at")
+ORDER_COLUMNS = ("user_id", "driver_id",
+                 "house_from_id", "house_from_street", "house_from_building", "house_from_number",
+                 "house_to_id", "house_to_street", "house_to_building", "house_to_number",
+                 "driver_class", "car", "status", "order_date")
+
+
+def populate(loader, args, until, verbose=False):
+    from src.general.auth.models import User
+    from src.general.driver.models import Driver
+    from src.general.house.models import House
+    from src.general.order.models import Order
+
+    def load(title, table, columns, rows):
+        before = loader.max_id(table)
+        started = time.perf_counter()
+        count = loader.load(table, columns, rows)
+        elapsed = time.perf_counter() - started
+        if verbose:
+            print(f"{title:>8}: {count:>9} rows in {elapsed:7.1f} s ({count / max(elapsed, 1e-9):>9.0f} rows/s)")
+        return loader.ids_after(table, before)
+
+    houses = []
+    drivers = []
+
+    user_ids = load("users", User.__table__, USER_COLUMNS, generate_users(args))
+    house_ids = load("houses", House.__table__, HOUSE_COLUMNS, generate_houses(args, houses))
+    driver_ids = load("drivers", Driver.__table__, DRIVER_COLUMNS, generate_drivers(args, until, drivers))
+
+    if args.orders and user_ids and house_ids and driver_ids:
+        load("orders", Order.__table__, ORDER_COLUMNS,
+             generate_orders(args, until, user_ids, house_ids, houses, driver_ids, drivers))
+
+    if loader.postgres:
+        loader.analyze()
+
+
+def main():
+    args = parse_args()
+    if args.url:
+        os.environ["DB_URL"] = args.url
+
+    from src.database import Base, engine
+    from src.general.auth.models import User
+    from src.general.driver.models import Driver
+    from src.general.house.models import House
+    from src.general.order.models import Order, OrderIdempotencyKey
+
+    if args.until:
+        until = datetime.strptime(args.until, "%Y-%m-%d")
+    else:
+        until = datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+    if args.create_tables:
+        Base.metadata.create_all(engine)
+
+    loader = Loader(engine, args.batch)
+    if args.reset:
+        loader.reset([Order.__table__, OrderIdempotencyKey.__table__, Driver.__table__, House.__table__, User.__table__])
+
+    populate(loader, args, until, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
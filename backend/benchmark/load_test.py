@@ -0,0 +1,307 @@
+# Нагрузочный тест HTTP API: смесь пользовательских сценариев при заданной конкурентности.
+#
+# Запуск из каталога backend:
+#   python -m benchmark.load_test --generate --duration 30 --concurrency 32 --output results.json
+#   python -m benchmark.load_test --mix booking --compare results.json
+#   python -m benchmark.load_test --target http://localhost:8000 --users 1000
+#
+# Без --target приложение поднимается отдельным процессом uvicorn на базе --url
+# (--generate предварительно заполняет ее через benchmark.generate_data). Переменные окружения
+# приложения (JWT_SECRET_KEY и т.д.) берутся из текущего окружения.
+#
+# Каждый виртуальный пользователь входит под одним из сгенерированных пользователей
+# (user<N>@example.com, пароль --password) и выполняет операции, выбирая их по весам смеси.
+# Созданный заказ сразу отменяется, чтобы водители не заканчивались.
+# Для каждого эндпоинта считаются число запросов, коды ответов, пропускная способность и
+# p50/p95/p99 задержки; результат пишется в JSON и может сравниваться с прошлым прогоном.
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from datetime import datetime, timezone
+
+import httpx
+
+API_PREFIX = "/api/taksa"
+
+# Веса операций в смесях
+MIXES = {
+    "default": {"login": 1, "profile": 4, "houses": 1, "autocomplete": 4, "create_order": 2, "list_orders": 4},
+    "browse": {"login": 1, "profile": 6, "houses": 2, "autocomplete": 6, "list_orders": 8},
+    "booking": {"login": 1, "profile": 1, "autocomplete": 4, "create_order": 8, "list_orders": 2},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HTTP API load test")
+    parser.add_argument("--target", help="URL запущенного приложения; по умолчанию приложение поднимается само")
+    parser.add_argument("--url", default="sqlite:///load_test.db", help="URL базы для поднимаемого приложения")
+    parser.add_argument("--generate", action="store_true", help="Заполнить базу генератором перед тестом")
+    parser.add_argument("--scale", type=float, default=1.0, help="Множитель объема генерируемых данных")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default", help="Смесь операций")
+    parser.add_argument("--concurrency", type=int, default=16, help="Виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=20, help="Длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=3, help="Прогрев перед замером, с")
+    parser.add_argument("--users", type=int, default=1000, help="Сколько сгенерированных пользователей использовать")
+    parser.add_argument("--password", default="password", help="Пароль сгенерированных пользователей")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--server-log", help="Файл для вывода поднятого приложения")
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+class Stats:
+    def __init__(self):
+        self.recording = False
+        self.samples = {}
+        self.statuses = {}
+
+    def record(self, name, status, elapsed):
+        if not self.recording:
+            return
+        self.samples.setdefault(name, []).append(elapsed)
+        statuses = self.statuses.setdefault(name, {})
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def report(self, duration):
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            statuses = self.statuses[name]
+            endpoints[name] = {
+                "requests": len(samples),
+                "errors": sum(count for status, count in statuses.items() if not 200 <= status < 300),
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                "rps": round(len(samples) / duration, 2),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+            }
+
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        total = {
+            "requests": len(everything),
+            "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+            "rps": round(len(everything) / duration, 2),
+            "p50_ms": round(percentile(everything, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(everything, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(everything, 0.99) * 1000, 2),
+        }
+        return endpoints, total
+
+
+class VirtualUser:
+    def __init__(self, client, stats, rng, args, addresses):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.args = args
+        self.addresses = addresses
+        self.headers = {}
+
+    async def request(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, API_PREFIX + path, headers=self.headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        self.stats.record(name, status, time.perf_counter() - started)
+        return response
+
+    async def login(self):
+        email = f"user{self.rng.randint(1, self.args.users)}@example.com"
+        response = await self.request("POST /user/login/", "POST", "/user/login/",
+                                      json={"email": email, "password": self.args.password})
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def profile(self):
+        await self.request("GET /user/", "GET", "/user/")
+
+    async def houses(self):
+        await self.request("GET /house/", "GET", "/house/")
+
+    async def autocomplete(self):
+        street = self.rng.choice(self.addresses)["street"]
+        # Пользователь набирает начало названия улицы без типа
+        prefix = street.split(" ", 1)[-1][:self.rng.randint(2, 6)]
+        await self.request("GET /house/autocomplete", "GET", "/house/autocomplete", params={"q": prefix})
+
+    async def create_order(self):
+        house_from, house_to = self.rng.sample(self.addresses, 2)
+        response = await self.request("POST /order/create/", "POST", "/order/create/", json={
+            "house_from_street": house_from["street"],
+            "house_from_building": house_from["building"],
+            "house_from_number": house_from["number"],
+            "house_to_street": house_to["street"],
+            "house_to_building": house_to["building"],
+            "house_to_number": house_to["number"],
+            "driver_class": self.rng.choice(("econom", "econom", "comfortable", "business")),
+        })
+        if response is not None and response.status_code == 200:
+            order_id = response.json()["messageDigest"]
+            await self.request("POST /order/{order_id}/cancel/", "POST", f"/order/{order_id}/cancel/")
+
+    async def list_orders(self):
+        await self.request("GET /order/", "GET", "/order/", params={"limit": 20})
+
+    async def run(self, deadline):
+        await self.login()
+        mix = MIXES[self.args.mix]
+        operations = [getattr(self, name) for name in mix]
+        weights = list(mix.values())
+
+        while time.monotonic() < deadline:
+            await self.rng.choices(operations, weights)[0]()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args):
+    port = free_port()
+    env = dict(os.environ, DB_URL=args.url)
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    target = f"http://127.0.0.1:{port}"
+
+    # Ждем, пока приложение начнет отвечать (метрики доступны без авторизации)
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"Application exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{target}{API_PREFIX}/metrics/pool", timeout=1).status_code == 200:
+                return process, target
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError("Application did not start")
+
+
+def generate(args):
+    scale = args.scale
+    subprocess.run(
+        [sys.executable, "-m", "benchmark.generate_data", "--url", args.url, "--create-tables", "--reset",
+         "--seed", str(args.seed), "--password", args.password,
+         "--users", str(max(args.users, int(10000 * scale))), "--houses", str(int(20000 * scale)),
+         "--drivers", str(int(2000 * scale)), "--orders", str(int(100000 * scale))],
+        check=True
+    )
+
+
+async def load(args, target):
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=30) as client:
+        setup = VirtualUser(client, stats, random.Random(args.seed), args, [])
+        await setup.login()
+        response = await client.get(f"{API_PREFIX}/house/", headers=setup.headers)
+        response.raise_for_status()
+        addresses = response.json()
+        if len(addresses) < 2:
+            raise RuntimeError("Not enough houses in the database, run with --generate")
+
+        users = [
+            VirtualUser(client, stats, random.Random(f"{args.seed}:{index}"), args, addresses)
+            for index in range(args.concurrency)
+        ]
+        started = time.monotonic()
+        tasks = [asyncio.create_task(user.run(started + args.warmup + args.duration)) for user in users]
+
+        await asyncio.sleep(args.warmup)
+        stats.recording = True
+        measured = time.monotonic()
+        await asyncio.gather(*tasks)
+        stats.recording = False
+
+        return stats.report(time.monotonic() - measured)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(endpoints, total, baseline):
+    print(f"{'endpoint':<32} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          + (f" {'p95 vs base':>12}" if baseline else ""))
+
+    rows = list(endpoints.items()) + [("total", total)]
+    for name, stats in rows:
+        line = (f"{name:<32} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+        if baseline:
+            base = baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+            if base and base["p95_ms"]:
+                line += f" {(stats['p95_ms'] / base['p95_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main():
+    args = parse_args()
+    started_at = datetime.now(timezone.utc).isoformat()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    process = None
+    target = args.target
+    try:
+        if not target:
+            if args.generate:
+                generate(args)
+            process, target = start_server(args)
+
+        endpoints, total = asyncio.run(load(args, target))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    print_report(endpoints, total, baseline)
+
+    if args.output:
+        result = {
+            "commit": git_commit(),
+            "started_at": started_at,
+            "params": {
+                "mix": args.mix,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "target": args.target or args.url,
+            },
+            "endpoints": endpoints,
+            "total": total,
+        }
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
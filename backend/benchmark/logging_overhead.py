@@ -0,0 +1,151 @@
+# Пропускная способность API при разных режимах логирования.
+#
+# Запуск из каталога backend:
+#   python -m benchmark.logging_overhead
+#   python -m benchmark.logging_overhead --requests 5000 --concurrency 32 --log-file /tmp/app.log
+#
+# Приложение вызывается в процессе через ASGI-транспорт httpx, без сети, чтобы в замере
+# оставалась только обработка запроса. Каждый режим получает одинаковую смесь запросов
+# авторизованного пользователя (профиль, список заказов, адреса):
+#   off       - логирование выключено (logging.disable)
+#   sync      - прежняя схема: StreamHandler на корневом логгере, запись в потоке запроса
+#   queue     - очередь и поток записи, JSON, без выборки
+#   sampled   - то же с выборкой LOG_SAMPLING
+# Сообщения пишутся в --log-file (по умолчанию /dev/null: форматирование и системный вызов остаются).
+# Кроме запросов в секунду выводится процессорное время процесса на запрос: на общей машине оно
+# шумит заметно меньше. Отдельно замеряется, сколько занимает сам вызов логгера в вызывающем потоке
+# (половина вызовов - от логгера с выборкой, половина - от обычного).
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+MODES = ("off", "sync", "queue", "sampled")
+PATHS = ("/api/taksa/user/", "/api/taksa/order/", "/api/taksa/house/")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=3000, help="Запросов на режим")
+    parser.add_argument("--concurrency", type=int, default=16, help="Конкурентных клиентов")
+    parser.add_argument("--rounds", type=int, default=5, help="Повторов режима, берется лучший")
+    parser.add_argument("--calls", type=int, default=20000, help="Вызовов логгера в замере одного вызова")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Режимы")
+    parser.add_argument("--log-file", default=os.devnull, help="Куда писать логи")
+    return parser.parse_args()
+
+
+def configure(mode, sink):
+    from src.config import LOG_SAMPLING
+    from src.helper.log.pipeline import setup_logging, shutdown_logging, TEXT_FORMAT
+
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    logging.disable(logging.NOTSET)
+
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        setup_logging("INFO", "json", LOG_SAMPLING if mode == "sampled" else "", sink)
+
+
+async def measure(client, headers, requests, concurrency):
+    per_client = requests // concurrency
+
+    async def worker(offset):
+        for index in range(per_client):
+            response = await client.get(PATHS[(offset + index) % len(PATHS)], headers=headers)
+            response.raise_for_status()
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    done = per_client * concurrency
+    # Процессорное время всего процесса, включая поток записи логов: устойчивее к шуму соседей по машине
+    return done / (time.perf_counter() - started), (time.process_time() - cpu_started) / done
+
+
+def measure_calls(calls):
+    # Сколько вызов логгера занимает поток, из которого он сделан (для сервиса - цикл событий)
+    hot = logging.getLogger("src.general.house.service")
+    regular = logging.getLogger("src.general.order.router")
+    # Время процессора только этого потока: форматирование в потоке записи сюда не входит
+    started = time.thread_time()
+    for index in range(calls // 2):
+        hot.info("(Get house by ID) Found house with ID %s", index)
+        regular.info("(Get order by ID) Order successful found: %s", index)
+    return (time.thread_time() - started) / calls
+
+
+async def run(args, sink):
+    import httpx
+
+    from src.database import Base, engine, SessionLocal
+    from src.general.house.models import House
+    from src.main import app
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        session.add(House(street="ул. Ленина", building=None, number="1"))
+        session.commit()
+
+    # Клиент логирует каждый запрос; в замере нужны только логи приложения
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            user = {"name": "bench", "tel": "+7 (999) 111 22-33", "email": "bench@example.com", "password": "password1"}
+            (await client.post("/api/taksa/user/register/", json=user)).raise_for_status()
+            response = await client.post("/api/taksa/user/login/", json={"email": user["email"],
+                                                                         "password": user["password"]})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            configure("off", sink)
+            await measure(client, headers, args.requests // 4, args.concurrency)
+
+            # Режимы чередуются внутри раунда, чтобы дрейф машины влиял на все одинаково
+            results = {mode: (0.0, float("inf")) for mode in args.modes}
+            calls = {}
+            for _ in range(args.rounds):
+                for mode in args.modes:
+                    configure(mode, sink)
+                    rate, cpu = await measure(client, headers, args.requests, args.concurrency)
+                    results[mode] = (max(results[mode][0], rate), min(results[mode][1], cpu))
+                    calls[mode] = min(calls.get(mode, float("inf")), measure_calls(args.calls))
+            configure("off", sink)
+
+    baseline = results.get("off")
+    print(f"{'mode':>8} {'requests/s':>11} {'vs off':>8} {'cpu us/req':>11} {'vs off':>8} {'us/log call':>12}")
+    for mode, (rate, cpu) in results.items():
+        rate_delta = f"{(rate / baseline[0] - 1) * 100:+.1f}%" if baseline else "-"
+        cpu_delta = f"{(cpu / baseline[1] - 1) * 100:+.1f}%" if baseline else "-"
+        print(f"{mode:>8} {rate:>11.0f} {rate_delta:>8} {cpu * 1e6:>11.0f} {cpu_delta:>8} {calls[mode] * 1e6:>12.2f}")
+
+
+def main():
+    args = parse_args()
+    directory = tempfile.mkdtemp(prefix="logging-benchmark-")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-of-at-least-32-bytes")
+    os.environ.setdefault("JWT_REFRESH_SECRET_KEY", "benchmark-refresh-secret-key-of-at-least-32-bytes")
+
+    with open(args.log_file, "w") as sink:
+        asyncio.run(run(args, sink))
+    print(f"database: {directory}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
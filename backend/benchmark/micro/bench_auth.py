@@ -0,0 +1,21 @@
+from src.general.auth.service.auth import AuthService
+from src.general.auth.service.hashing import password_context
+
+PASSWORD = "benchmark-password"
+
+
+def bench_create_access_token(benchmark, loop):
+    service = AuthService()
+    benchmark(lambda: loop.run_until_complete(service.create_access_token({"sub": "1"})))
+
+
+def bench_get_data_from_access_token(benchmark, loop):
+    service = AuthService()
+    token = loop.run_until_complete(service.create_access_token({"sub": "1"}))
+    benchmark(lambda: loop.run_until_complete(service.get_data_from_access_token(token)))
+
+
+def bench_bcrypt_verify(benchmark):
+    # Один вызов - сотни миллисекунд, поэтому раундов немного
+    hashed = password_context.hash(PASSWORD)
+    benchmark.pedantic(password_context.verify, args=(PASSWORD, hashed), rounds=5, iterations=1)
@@ -0,0 +1,30 @@
+import pytest
+
+from sqlalchemy import select
+
+from src.general.house.index import HouseRecord, address_index
+from src.general.house.models import House
+from src.general.house.service import HouseService
+
+
+@pytest.fixture(scope="module")
+def house(small_database):
+    houses = small_database.execute(select(House)).scalars().all()
+    address_index.replace(HouseRecord.from_model(house) for house in houses)
+    return houses[len(houses) // 2]
+
+
+def bench_get_house_id_index(benchmark, loop, small_database, house):
+    service = HouseService()
+    benchmark(lambda: loop.run_until_complete(
+        service.get_house_id(small_database, house.street, house.building, house.number)
+    ))
+
+
+def bench_get_house_id_db(benchmark, loop, small_database, house, monkeypatch):
+    # Справочник в памяти не загружен: каждый поиск идет в БД
+    monkeypatch.setattr(address_index, "loaded", False)
+    service = HouseService()
+    benchmark(lambda: loop.run_until_complete(
+        service.get_house_id(small_database, house.street, house.building, house.number)
+    ))
@@ -0,0 +1,42 @@
+import pytest
+
+from sqlalchemy import func, select
+
+from src.config import ORDER_PAGE_SIZE, ORDER_PAGE_SIZE_MAX
+from src.general.order.models import Order
+from src.general.order.router import to_order_detail
+from src.general.order.service import OrderService
+
+
+def bench_get_orders_first_page(benchmark, loop, database):
+    service = OrderService()
+    benchmark(lambda: loop.run_until_complete(service.get_orders(database, ORDER_PAGE_SIZE)))
+
+
+def bench_get_orders_deep_page(benchmark, loop, database):
+    # Страница из середины истории по курсору
+    service = OrderService()
+    total = database.execute(select(func.count()).select_from(Order)).scalar()
+    cursor = None
+    for _ in range(min(total // ORDER_PAGE_SIZE_MAX // 2, 50)):
+        _, cursor = loop.run_until_complete(service.get_orders(database, ORDER_PAGE_SIZE_MAX, cursor))
+
+    benchmark(lambda: loop.run_until_complete(service.get_orders(database, ORDER_PAGE_SIZE, cursor)))
+
+
+def bench_get_user_orders_busiest_user(benchmark, loop, database):
+    service = OrderService()
+    user_id = database.execute(
+        select(Order.user_id).group_by(Order.user_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    benchmark(lambda: loop.run_until_complete(service.get_user_orders(database, user_id, ORDER_PAGE_SIZE)))
+
+
+@pytest.fixture(scope="module")
+def page(small_database):
+    return small_database.execute(select(Order).limit(ORDER_PAGE_SIZE_MAX)).scalars().all()
+
+
+def bench_order_detail_conversion(benchmark, page):
+    # Преобразование страницы ORM-объектов в схемы ответа, как в GET /order/
+    benchmark(lambda: [to_order_detail(order) for order in page])
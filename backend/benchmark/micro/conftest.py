@@ -0,0 +1,103 @@
+# Микробенчмарки отдельных частей сервиса на pytest-benchmark.
+#
+# Запуск из каталога backend:
+#   pytest benchmark/micro                                   # замер
+#   pytest benchmark/micro --benchmark-compare=0001          # сравнить с базовой линией из репозитория
+#   pytest benchmark/micro --benchmark-save=baseline         # сохранить новую базовую линию
+#   pytest benchmark/micro --benchmark-compare               # сравнить с последней сохраненной
+#
+# Базовые линии хранятся в benchmark/micro/baselines (по каталогу на платформу и версию Python).
+# В репозитории лежит 0001_baseline для Linux-CPython-3.11-64bit; на другой машине абсолютные
+# значения другие, поэтому сначала сохраните свою базовую линию с текущей ветки, затем сравнивайте с ней.
+# При сравнении прогон падает, если медиана какого-либо замера выросла больше чем на
+# BENCH_REGRESSION_THRESHOLD (по умолчанию 25%).
+# Размеры таблицы заказов задаются BENCH_ORDER_ROWS (по умолчанию 10000,100000,1000000).
+# Базы SQLite с данными генерируются один раз и переиспользуются из кэша pytest.
+import argparse
+import asyncio
+import os
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Модули src создают движок при импорте: без DB_URL он смотрел бы в PostgreSQL приложения
+os.environ.setdefault("DB_URL", "sqlite://")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("JWT_REFRESH_SECRET_KEY", "benchmark-refresh-secret-key-of-at-least-32-bytes")
+
+BASELINES = Path(__file__).parent / "baselines"
+REGRESSION_THRESHOLD = os.environ.get("BENCH_REGRESSION_THRESHOLD", "25%")
+ORDER_ROWS = [int(rows) for rows in os.environ.get("BENCH_ORDER_ROWS", "10000,100000,1000000").split(",")]
+DATA_SEED = 42
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    # Хранилище и порог задаются здесь, а не в addopts: пути в pytest.ini считались бы от текущего каталога
+    from pytest_benchmark.utils import parse_compare_fail
+
+    options = config.option
+    if options.benchmark_storage == "file://./.benchmarks":
+        options.benchmark_storage = f"file://{BASELINES}"
+    if options.benchmark_compare and not options.benchmark_compare_fail:
+        options.benchmark_compare_fail = [parse_compare_fail(f"median:{REGRESSION_THRESHOLD}")]
+
+
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def build_database(path: Path, orders: int) -> None:
+    from sqlalchemy import create_engine
+
+    from benchmark.generate_data import Loader, populate
+    from src.database import Base
+
+    args = argparse.Namespace(seed=DATA_SEED, users=10000, houses=20000, drivers=2000, orders=orders,
+                              days=90, password="password")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    populate(Loader(engine, 10000), args, datetime(2026, 1, 1))
+    engine.dispose()
+
+
+def cached_database(config, orders: int) -> Path:
+    directory = Path(config.cache.mkdir("benchmark-data"))
+    path = directory / f"orders-{orders}-seed{DATA_SEED}.db"
+
+    if not path.exists():
+        partial = path.with_suffix(".tmp")
+        partial.unlink(missing_ok=True)
+        build_database(partial, orders)
+        partial.rename(path)
+
+    return path
+
+
+def open_database(path: Path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", params=ORDER_ROWS, ids=lambda rows: f"{rows}rows")
+def database(request):
+    # Сессия SQLite с заданным числом заказов; файл строится один раз и кэшируется между запусками
+    yield from open_database(cached_database(request.config, request.param))
+
+
+@pytest.fixture(scope="session")
+def small_database(request):
+    # Для замеров, которым объем заказов не важен, берется самая маленькая база
+    yield from open_database(cached_database(request.config, min(ORDER_ROWS)))
@@ -0,0 +1,113 @@
+# Поиск k ближайших свободных водителей: пространственная сетка против полного перебора.
+#
+# Запуск из каталога backend:
+#   python -m benchmark.nearest_driver
+#   python -m benchmark.nearest_driver --drivers 1000 20000 --cell 0.01 --busy 0.5
+#
+# Водители равномерно разбросаны по прямоугольнику размером с крупный город, часть из них
+# занята. Для каждой точки подачи сверяется, что сетка возвращает тех же водителей, что и перебор.
+import argparse
+import os
+import random
+import statistics
+import time
+
+# Движку диспетчеризации БД не нужна, но модули src создают движок при импорте
+os.environ.setdefault("DB_URL", "sqlite://")
+
+# Москва в пределах МКАД, примерно 35 x 40 км
+LAT_RANGE = (55.57, 55.91)
+LON_RANGE = (37.37, 37.86)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Nearest driver lookup benchmark")
+    parser.add_argument("--drivers", type=int, nargs="+", default=[10000, 50000, 100000], help="Число водителей")
+    parser.add_argument("--queries", type=int, default=2000, help="Поисков на замер")
+    parser.add_argument("--k", type=int, default=5, help="Сколько ближайших искать")
+    parser.add_argument("--busy", type=float, default=0.3, help="Доля занятых водителей")
+    parser.add_argument("--cell", type=float, default=0.005, help="Размер ячейки сетки, градусы")
+    parser.add_argument("--radius", type=float, default=20, help="Радиус поиска, км")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def random_point(rng):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+
+
+def build_engine(count, args, rng):
+    from src.general.dispatch.engine import DispatchEngine
+    from src.general.dispatch.policy import LeastRecentlyAssignedPolicy
+    from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+    from src.general.driver.enum.DriverStatusEnum import DriverStatusEnum
+
+    engine = DispatchEngine(LeastRecentlyAssignedPolicy(), 1, args.cell, args.radius)
+    positions = {}
+
+    for driver_id in range(1, count + 1):
+        latitude, longitude = random_point(rng)
+        busy = rng.random() < args.busy
+        engine.sync(driver_id, DriverClassEnum.econom, "car", DriverStatusEnum.available, 1 if busy else 0,
+                    latitude, longitude)
+        if not busy:
+            positions[driver_id] = (latitude, longitude)
+
+    return engine, positions
+
+
+def brute_force(positions, latitude, longitude, k, radius):
+    from src.general.dispatch.spatial import distance_km
+
+    found = []
+    for driver_id, (point_lat, point_lon) in positions.items():
+        distance = distance_km(latitude, longitude, point_lat, point_lon)
+        if distance <= radius:
+            found.append((distance, driver_id))
+    found.sort()
+    return found[:k]
+
+
+def run(count, args):
+    from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+
+    rng = random.Random(args.seed)
+    engine, positions = build_engine(count, args, rng)
+    points = [random_point(rng) for _ in range(args.queries)]
+
+    grid_samples = []
+    scan_samples = []
+    mismatches = 0
+
+    for latitude, longitude in points:
+        started = time.perf_counter()
+        found = engine.nearest(DriverClassEnum.econom, latitude, longitude, args.k)
+        grid_samples.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        expected = brute_force(positions, latitude, longitude, args.k, args.radius)
+        scan_samples.append((time.perf_counter() - started) * 1e6)
+
+        if [slot.driver_id for _, slot in found] != [driver_id for _, driver_id in expected]:
+            mismatches += 1
+
+    return grid_samples, scan_samples, mismatches
+
+
+def main():
+    args = parse_args()
+
+    print(f"{'drivers':>8} {'grid p50 us':>12} {'grid p99 us':>12} {'scan p50 us':>12} {'mismatches':>11}")
+    for count in args.drivers:
+        grid_samples, scan_samples, mismatches = run(count, args)
+        print(f"{count:>8} {statistics.median(grid_samples):>12.1f} {percentile(grid_samples, 0.99):>12.1f} "
+              f"{statistics.median(scan_samples):>12.1f} {mismatches:>11}")
+
+
+if __name__ == "__main__":
+    main()
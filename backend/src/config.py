@@ -4,7 +4,6 @@ from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 
 import logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -15,6 +14,19 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASS = os.environ.get("DB_PASS")
 
+# Полный URL базы данных (например, sqlite:///bench.db для бенчмарков); по умолчанию собирается из DB_*
+DB_URL = os.environ.get("DB_URL")
+
+# "true" переключает приложение на AsyncSession поверх asyncpg, иначе используется синхронный psycopg2
+DB_ASYNC = os.environ.get("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Настройки пула соединений (для каждого процесса-воркера)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
 MIN_PASSWORD_LENGTH = os.environ.get("MIN_PASSWORD_LENGTH")
 
 ACCESS_TOKEN_EXPIRE_MINUTES = os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES")
@@ -23,11 +35,123 @@ ALGORITHM = os.environ.get("ALGORITHM")
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
 JWT_REFRESH_SECRET_KEY = os.environ.get("JWT_REFRESH_SECRET_KEY")
 
+# ID пользователей-администраторов через запятую: меняют статусы любых заказов, привязывают водителей
+# к учетным записям, передают координаты любых водителей и скачивают профили
+ADMIN_USER_IDS = frozenset(int(user_id) for user_id in os.environ.get("ADMIN_USER_IDS", "").split(",") if user_id.strip())
+
+# Период подтягивания отозванных другими воркерами токенов в локальный кэш, с
+CRL_REFRESH_SECONDS = float(os.environ.get("CRL_REFRESH_SECONDS", 5))
+# Значения последовательности коммитятся не по порядку: пропущенные id перечитываются
+# CRL_GAP_SECONDS секунд (не более CRL_GAP_MAX штук), а раз в CRL_FULL_REFRESH_SECONDS
+# перечитываются все действующие записи
+CRL_GAP_SECONDS = float(os.environ.get("CRL_GAP_SECONDS", 600))
+CRL_GAP_MAX = int(os.environ.get("CRL_GAP_MAX", 1000))
+CRL_FULL_REFRESH_SECONDS = float(os.environ.get("CRL_FULL_REFRESH_SECONDS", 300))
+# Период удаления из CRL записей об уже истекших токенах, с
+CRL_PRUNE_SECONDS = float(os.environ.get("CRL_PRUNE_SECONDS", 3600))
+
+# Пул потоков для bcrypt: размер и предел задач в очереди, сверх которого вход/регистрация получают 503
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+
+# Кэш пользователей для зависимости аутентификации
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", 30))
+
+# Размер страницы списков заказов: по умолчанию и максимальный
+ORDER_PAGE_SIZE = int(os.environ.get("ORDER_PAGE_SIZE", 50))
+ORDER_PAGE_SIZE_MAX = int(os.environ.get("ORDER_PAGE_SIZE_MAX", 500))
+
+# Сколько строк выгрузки заказов читается с серверного курсора за раз
+ORDER_EXPORT_CHUNK_SIZE = int(os.environ.get("ORDER_EXPORT_CHUNK_SIZE", 1000))
+
+# Диспетчеризация: политика выбора водителя и число одновременных заказов на водителя
+DISPATCH_POLICY = os.environ.get("DISPATCH_POLICY", "least_recently_assigned")
+DISPATCH_DRIVER_CAPACITY = int(os.environ.get("DISPATCH_DRIVER_CAPACITY", 1))
+# Сколько кандидатов перебирается, если водителя уже занял другой процесс
+DISPATCH_CLAIM_ATTEMPTS = int(os.environ.get("DISPATCH_CLAIM_ATTEMPTS", 5))
+# Период сверки индекса диспетчеризации с состоянием водителей в БД (секунды)
+DISPATCH_SYNC_SECONDS = float(os.environ.get("DISPATCH_SYNC_SECONDS", 5))
+# Радиус поиска ближайшего водителя (км) и размер ячейки пространственной сетки (градусы)
+DISPATCH_SEARCH_RADIUS_KM = float(os.environ.get("DISPATCH_SEARCH_RADIUS_KM", 20))
+SPATIAL_CELL_DEGREES = float(os.environ.get("SPATIAL_CELL_DEGREES", 0.005))
+
+# Период полной перезагрузки справочника адресов в памяти (секунды)
+ADDRESS_INDEX_REFRESH_SECONDS = float(os.environ.get("ADDRESS_INDEX_REFRESH_SECONDS", 60))
+# Подсказки адресов: число вариантов по умолчанию и максимальное
+HOUSE_AUTOCOMPLETE_LIMIT = int(os.environ.get("HOUSE_AUTOCOMPLETE_LIMIT", 10))
+HOUSE_AUTOCOMPLETE_LIMIT_MAX = int(os.environ.get("HOUSE_AUTOCOMPLETE_LIMIT_MAX", 50))
+# Нечеткое сопоставление адреса при создании заказа, если точного совпадения нет,
+# и минимальное триграммное сходство названия улицы
+ADDRESS_FUZZY_MATCH = os.environ.get("ADDRESS_FUZZY_MATCH", "false").lower() in ("1", "true", "yes")
+ADDRESS_FUZZY_THRESHOLD = float(os.environ.get("ADDRESS_FUZZY_THRESHOLD", 0.3))
+
+# Ключи идемпотентности создания заказа: размер и время жизни кэша недавних ключей (секунды),
+# срок хранения ключей в БД (часы) и период их очистки (секунды)
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 10000))
+IDEMPOTENCY_CACHE_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_CACHE_TTL_SECONDS", 600))
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+IDEMPOTENCY_PRUNE_SECONDS = float(os.environ.get("IDEMPOTENCY_PRUNE_SECONDS", 3600))
+
+# Групповой коммит создания заказов: заказы, пришедшие в течение окна (миллисекунды),
+# пишутся одной транзакцией; пачка уходит раньше, если набралось ORDER_BATCH_MAX_SIZE заказов
+ORDER_GROUP_COMMIT = os.environ.get("ORDER_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+ORDER_BATCH_WINDOW_MS = float(os.environ.get("ORDER_BATCH_WINDOW_MS", 5))
+ORDER_BATCH_MAX_SIZE = int(os.environ.get("ORDER_BATCH_MAX_SIZE", 100))
+
+# Максимум записей в одном запросе массового создания водителей или заказов
+BULK_CREATE_MAX = int(os.environ.get("BULK_CREATE_MAX", 5000))
+
+# Логирование: уровень, формат (json или text) и выборка сообщений INFO и ниже от горячих логгеров
+# в виде "логгер=доля,..." (пустая строка - без выборки); WARNING и выше пишутся всегда.
+# По умолчанию выборка только для логгеров, пишущих на каждый запрос: сообщения кэша отзыва
+# токенов и других фоновых задач из src.general.auth.service не теряются
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_SAMPLING = os.environ.get(
+    "LOG_SAMPLING",
+    "src.general.auth.service.auth=0.1,src.general.auth.service.user=0.1,src.general.house.service=0.1"
+)
+# Как часто поток записи сбрасывает накопленные сообщения (миллисекунды) и предел очереди сообщений:
+# при переполнении новые сообщения отбрасываются (счетчик log_records_dropped_total)
+LOG_FLUSH_INTERVAL_MS = float(os.environ.get("LOG_FLUSH_INTERVAL_MS", 50))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+# Экспорт метрик HTTP-запросов и запросов к БД в формате Prometheus (GET /api/taksa/metrics)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Диагностика SQL: порог медленного запроса (миллисекунды, 0 - не логировать) и EXPLAIN для него,
+# бюджет SQL-запросов на HTTP-запрос (0 - без проверки) и заголовки X-DB-* с числом и временем запросов
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", 20))
+QUERY_DEBUG_HEADERS = os.environ.get("QUERY_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+
+# Профилирование запросов: запрос профилируется, если в заголовке X-Profile передан PROFILING_TOKEN
+# (пустой - только по выборке), или случайно с вероятностью PROFILING_SAMPLE_RATE (0 - выключено).
+# Профилировщик pyinstrument (speedscope, учитывает await; без пакета pyinstrument - cprofile)
+# или cprofile (pstats; запускается, только если других запросов в обработке нет),
+# число последних профилей в памяти. Без токена и выборки middleware не подключается.
+# Скачивают профили администраторы (ADMIN_USER_IDS)
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_ENGINE = os.environ.get("PROFILING_ENGINE", "pyinstrument")
+PROFILING_MAX_PROFILES = int(os.environ.get("PROFILING_MAX_PROFILES", 20))
+
+# Прием координат водителей: период сброса в БД (секунды), предел водителей в буфере,
+# строк в одной команде массового UPDATE и точек в одном HTTP-запросе
+LOCATION_FLUSH_SECONDS = float(os.environ.get("LOCATION_FLUSH_SECONDS", 2))
+LOCATION_BUFFER_MAX = int(os.environ.get("LOCATION_BUFFER_MAX", 50000))
+LOCATION_FLUSH_BATCH = int(os.environ.get("LOCATION_FLUSH_BATCH", 5000))
+LOCATION_BATCH_MAX = int(os.environ.get("LOCATION_BATCH_MAX", 1000))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/taksa/login")
 
 SWAGGER_GROUPS ={
     "house": "House",
     "driver": "Driver",
     "user": "User",
-    "order": "Order"
+    "order": "Order",
+    "metrics": "Metrics",
+    "location": "Location",
+    "profiling": "Profiling"
 }
\ No newline at end of file
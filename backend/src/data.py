@@ -139,5 +139,6 @@ def seed_houses():
     finally:
         db.close()
 
-seed_drivers()
-seed_houses()
\ No newline at end of file
+if __name__ == "__main__":
+    seed_drivers()
+    seed_houses()
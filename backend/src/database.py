@@ -1,19 +1,129 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from typing import Union
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
-from src.config import DB_HOST, DB_PORT, DB_NAME, DB_PASS, DB_USER
+from src.config import DB_HOST, DB_PORT, DB_NAME, DB_PASS, DB_USER, DB_URL, DB_ASYNC
+from src.config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+from src.helper.metrics.db import instrument_engine
+from src.helper.metrics.pool import PoolMetrics, instrumented_pool_class, register_engine
 
 Base = declarative_base()
-SQLALCHEMY_DATABASE_URL = f'postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+if DB_URL:
+    SQLALCHEMY_DATABASE_URL = DB_URL
+    _url = make_url(DB_URL)
+    SQLALCHEMY_ASYNC_DATABASE_URL = _url.set(drivername=ASYNC_DRIVERS[_url.get_backend_name()]).render_as_string(hide_password=False)
+else:
+    SQLALCHEMY_DATABASE_URL = f'postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    SQLALCHEMY_ASYNC_DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING
+)
+
+sync_pool_metrics = PoolMetrics("sync")
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_metrics),
+    **POOL_OPTIONS
+)
+register_engine("sync", engine, sync_pool_metrics)
+instrument_engine("sync", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Зависимость для получения сессии базы данных
-def get_db():
+# Асинхронный движок создается только в режиме DB_ASYNC, чтобы синхронный режим не требовал asyncpg
+async_engine = None
+if DB_ASYNC:
+    async_pool_metrics = PoolMetrics("async")
+    async_engine = create_async_engine(
+        SQLALCHEMY_ASYNC_DATABASE_URL,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+        **POOL_OPTIONS
+    )
+    register_engine("async", async_engine.sync_engine, async_pool_metrics)
+    instrument_engine("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+) if DB_ASYNC else None
+
+DBSession = Union[Session, AsyncSession]
+
+
+def _get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def _get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Зависимость для получения сессии базы данных
+get_db = _get_async_db if DB_ASYNC else _get_sync_db
+
+
+# Сессия для фоновых задач и кода вне запроса (загрузка кэшей, периодические задачи)
+@asynccontextmanager
+async def open_session():
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+# Обертки над операциями сессии, одинаково работающие в синхронном и асинхронном режимах
+async def db_execute(db: DBSession, statement, params=None):
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return db.execute(statement, params)
+
+
+async def db_commit(db: DBSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        db.commit()
+
+
+async def db_flush(db: DBSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.flush()
+    else:
+        db.flush()
+
+
+async def db_refresh(db: DBSession, instance) -> None:
+    if isinstance(db, AsyncSession):
+        await db.refresh(instance)
+    else:
+        db.refresh(instance)
+
+
+async def db_rollback(db: DBSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        db.rollback()
@@ -0,0 +1,66 @@
+import logging
+import jwt
+
+from fastapi import Depends, HTTPException
+
+from src.config import oauth2_scheme, ADMIN_USER_IDS
+from src.database import get_db, DBSession
+from src.general.auth.schema.current_user import CurrentUserSchema
+from src.general.auth.service.auth import AuthService
+from src.general.auth.service.user import UserService, user_cache
+
+logger = logging.getLogger(__name__)
+
+
+# Единая зависимость для защищенных эндпоинтов: токен декодируется один раз,
+# проверяется отзыв, пользователь берется из кэша или одним запросом из базы
+async def get_current_user(access_token: str = Depends(oauth2_scheme),
+                           db: DBSession = Depends(get_db),
+                           auth_service: AuthService = Depends(AuthService),
+                           user_service: UserService = Depends(UserService)
+                           ) -> CurrentUserSchema:
+    try:
+        token_data = await auth_service.get_data_from_access_token(access_token)
+
+        if await auth_service.check_revoked(db, access_token):
+            logger.warning("(Current user) Revoked token used by user %s", token_data.get("sub"))
+            raise HTTPException(status_code=403, detail="Token revoked")
+
+        user_id = int(token_data["sub"])
+        current_user = user_cache.get(user_id)
+
+        if current_user is None:
+            user = await user_service.get_user_by_id(db, user_id)
+
+            if not user:
+                logger.warning("(Current user) User not found with ID %s", user_id)
+                raise HTTPException(status_code=404, detail="User not found")
+
+            current_user = CurrentUserSchema(
+                id=user.id,
+                name=user.name,
+                tel=user.tel,
+                email=user.email
+            )
+            user_cache.set(user_id, current_user)
+
+        return current_user
+    except jwt.PyJWTError as e:
+        logger.warning("(Current user) Bad token: %s", e)
+        raise HTTPException(status_code=403, detail="Bad token")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Current user) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def is_admin(current_user: CurrentUserSchema) -> bool:
+    return current_user.id in ADMIN_USER_IDS
+
+
+async def get_current_admin(current_user: CurrentUserSchema = Depends(get_current_user)) -> CurrentUserSchema:
+    if not is_admin(current_user):
+        logger.warning("(Current admin) User %s is not an admin", current_user.id)
+        raise HTTPException(status_code=403, detail="Admin only")
+    return current_user
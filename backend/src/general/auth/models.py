@@ -16,4 +16,7 @@ class CRL(Base):
     __tablename__ = "crl"
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True, nullable=False)
-    token = Column(String, index=True, nullable=False)
\ No newline at end of file
+    # SHA-256 от токена в hex: индекс фиксированного размера вместо индекса по всему JWT
+    token_digest = Column(String(64), unique=True, index=True, nullable=False)
+    # Момент истечения токена (UTC); после него запись больше не нужна и удаляется
+    expires_at = Column(TIMESTAMP, index=True, nullable=False)
\ No newline at end of file
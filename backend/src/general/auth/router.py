@@ -1,16 +1,19 @@
 import logging
-import jwt
 
-from fastapi import  APIRouter, HTTPException, Depends
+from datetime import datetime
+from typing import Optional
 
-from sqlalchemy.orm import Session
-from src.database import get_db
+from fastapi import  APIRouter, HTTPException, Depends, Query
+
+from src.database import get_db, DBSession
 
 from src.general.auth.schema.login import UserLoginSchema
 from src.general.auth.schema.profile import UserProfileSchema
 from src.general.auth.schema.registration import UserRegistrationSchema
 from src.general.auth.schema.access_token import AccessTokenSchema
+from src.general.auth.schema.current_user import CurrentUserSchema
 from src.general.order.schema.user_order_detail import UserOrderDetailSchema
+from src.general.order.schema.order_page import UserOrderPageSchema
 from src.general.order.service import OrderService
 
 from src.helper.message.schema import MessageSchema
@@ -18,10 +21,11 @@ from src.helper.error.schema import ErrorSchema
 
 from src.general.auth.service.auth import AuthService
 from src.general.auth.service.user import UserService
+from src.general.auth.service.hashing import PasswordHasherOverloaded
+from src.general.auth.dependency import get_current_user
 
-from src.config import oauth2_scheme, SWAGGER_GROUPS
+from src.config import oauth2_scheme, SWAGGER_GROUPS, ORDER_PAGE_SIZE, ORDER_PAGE_SIZE_MAX
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 user_router = APIRouter(prefix="/user")
@@ -40,33 +44,38 @@ user_router = APIRouter(prefix="/user")
         },
         500:{
             "model": ErrorSchema
+        },
+        503:{
+            "model": ErrorSchema
         }
     }
 )
 async def register(user_reg_sch: UserRegistrationSchema,
-                   db: Session = Depends(get_db),
+                   db: DBSession = Depends(get_db),
                    user_service: UserService = Depends(UserService),
                    ):
     try:
         user = await user_service.get_user_by_email(db,  user_reg_sch.email)
 
         if user:
-            logger.warning(f"(Registration) User already register: {user_reg_sch.email}")
+            logger.warning("(Registration) User already register: %s", user_reg_sch.email)
             raise HTTPException(status_code=400, detail="User already exist")
 
         user = await user_service.create_user(db, user_reg_sch.name, user_reg_sch.tel, user_reg_sch.email, user_reg_sch.password)
 
-        logger.info(f"(Registration) User successful register {user.id}")
+        logger.info("(Registration) User successful register %s", user.id)
         return MessageSchema(messageDigest=str(user.id),
                              description="User registered successfully"
                              )
     except HTTPException:
         raise
+    except PasswordHasherOverloaded:
+        raise HTTPException(status_code=503, detail="Too many requests, try again later")
     except ValueError as validation_error:
-        logger.warning(f"(Registration) Validation error: {validation_error}")
+        logger.warning("(Registration) Validation error: %s", validation_error)
         raise HTTPException(status_code=400, detail=str(validation_error))
     except Exception as e:
-        logger.error(f"(Registration) Error {e}")
+        logger.error("(Registration) Error %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -83,17 +92,20 @@ async def register(user_reg_sch: UserRegistrationSchema,
         },
         500:{
             "model": ErrorSchema
+        },
+        503:{
+            "model": ErrorSchema
         }
     }
 )
 async def login(user_log_sch: UserLoginSchema,
-                   db: Session = Depends(get_db),
+                   db: DBSession = Depends(get_db),
                    user_service: UserService = Depends(UserService),
                    auth_service: AuthService = Depends(AuthService),
                    ):
     try:
         if not await user_service.verify_password(db, user_log_sch.email, user_log_sch.password):
-            logger.warning(f"(Login) Failed login for user with email: {user_log_sch.email}")
+            logger.warning("(Login) Failed login for user with email: %s", user_log_sch.email)
             raise HTTPException(status_code=400, detail="Invalid credentials")
 
         user = await user_service.get_user_by_email(db,  user_log_sch.email)
@@ -102,22 +114,27 @@ async def login(user_log_sch: UserLoginSchema,
             data={"sub": str(user.id)}
         )
 
-        logger.info(f"(Login) Login successful for user with ID: {user.id}")
+        logger.info("(Login) Login successful for user with ID: %s", user.id)
         return AccessTokenSchema(access_token=access_token)
     except HTTPException:
         raise
+    except PasswordHasherOverloaded:
+        raise HTTPException(status_code=503, detail="Too many requests, try again later")
     except Exception as e:
-        logger.error(f"(Registration) Error {e}")
+        logger.error("(Registration) Error %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @user_router.get(
     "/{user_id}/orders",
     tags=[SWAGGER_GROUPS["user"]],
-    response_model=list[UserOrderDetailSchema],
+    response_model=UserOrderPageSchema,
     responses={
         200: {
-            "model": list[UserOrderDetailSchema]
+            "model": UserOrderPageSchema
+        },
+        400: {
+            "model": ErrorSchema
         },
         401: {
             "model": ErrorSchema
@@ -131,23 +148,22 @@ async def login(user_log_sch: UserLoginSchema,
     }
 )
 async def get_user_orders(user_id: int,
-                          db: Session = Depends(get_db),
-                          access_token: str = Depends(oauth2_scheme),
-                          auth_service: AuthService = Depends(AuthService),
+                          limit: int = Query(ORDER_PAGE_SIZE, ge=1, le=ORDER_PAGE_SIZE_MAX),
+                          cursor: Optional[str] = None,
+                          date_from: Optional[datetime] = None,
+                          date_to: Optional[datetime] = None,
+                          db: DBSession = Depends(get_db),
+                          current_user: CurrentUserSchema = Depends(get_current_user),
                           order_service: OrderService = Depends(OrderService)
                           ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get user orders) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
+        orders, next_cursor = await order_service.get_user_orders(db, user_id, limit, cursor, date_from, date_to)
 
-        orders = await order_service.get_user_orders(db, user_id)
-
-        if not orders:
-            logger.info(f"(Get user orders) User's {user_id} orders not found:")
+        if not orders and not cursor:
+            logger.info("(Get user orders) User's %s orders not found:", user_id)
             raise HTTPException(status_code=404, detail="No orders found for this user")
 
-        logger.info(f"(Get user orders) User's orders successful found")
+        logger.info("(Get user orders) User's orders successful found")
 
         orders_schema = []
 
@@ -166,19 +182,20 @@ async def get_user_orders(user_id: int,
                     house_to_street=order.house_to_street,
                     house_to_building=order.house_to_building,
                     house_to_number=order.house_to_number,
+                    status=order.status,
                     order_time=order.order_date
                 )
             )
 
-        return orders_schema
+        return UserOrderPageSchema(items=orders_schema, next_cursor=next_cursor)
 
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get user orders) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
+    except ValueError as validation_error:
+        logger.warning("(Get user orders) Validation error: %s", validation_error)
+        raise HTTPException(status_code=400, detail=str(validation_error))
     except Exception as e:
-        logger.error(f"(Get user orders) Error: {e}")
+        logger.error("(Get user orders) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -201,35 +218,20 @@ async def get_user_orders(user_id: int,
         }
     }
 )
-async def get_profile(access_token: str = Depends(oauth2_scheme),
-                      db: Session = Depends(get_db),
-                      user_service: UserService = Depends(UserService),
-                      auth_service: AuthService = Depends(AuthService)
-                      ):
+async def get_profile(current_user: CurrentUserSchema = Depends(get_current_user)):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get user profile) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
-        token_data = await auth_service.get_data_from_access_token(access_token)
-
-        user = await user_service.get_user_by_id(db, token_data["sub"])
-
-        logger.info(f"(Get user profile) Successful get profile with id: {user.id}")
+        logger.info("(Get user profile) Successful get profile with id: %s", current_user.id)
 
         return UserProfileSchema(
-            id=user.id,
-            name=user.name,
-            tel=user.tel,
-            email=user.email
+            id=current_user.id,
+            name=current_user.name,
+            tel=current_user.tel,
+            email=current_user.email
         )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get user profile) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get user profile) Error: {e}")
+        logger.error("(Get user profile) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @user_router.put(
@@ -252,44 +254,31 @@ async def get_profile(access_token: str = Depends(oauth2_scheme),
     }
 )
 async def edit_profile(user_profile: UserProfileSchema,
-                       access_token: str = Depends(oauth2_scheme),
-                       db: Session = Depends(get_db),
+                       current_user: CurrentUserSchema = Depends(get_current_user),
+                       db: DBSession = Depends(get_db),
                        user_service: UserService = Depends(UserService),
-                       auth_service: AuthService = Depends(AuthService)
                        ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Update user profile) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
-        token_data = await auth_service.get_data_from_access_token(access_token)
-
-        user_id = token_data["sub"]
-        user = await user_service.get_user_by_id(db, user_id)
-
         updated_user = await user_service.update_user(
             db,
-            _id=user.id,
+            _id=current_user.id,
             name=user_profile.name,
             tel=user_profile.tel,
             email=user_profile.email
         )
 
-        logger.info(f"(Update user profile) Successfully updated profile with id: {updated_user.id}")
+        logger.info("(Update user profile) Successfully updated profile with id: %s", updated_user.id)
 
         return UserProfileSchema(
-            id=user.id,
+            id=updated_user.id,
             name=updated_user.name,
             tel=updated_user.tel,
             email=updated_user.email
         )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Update user profile) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Update user profile) Error: {e}")
+        logger.error("(Update user profile) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -310,24 +299,20 @@ async def edit_profile(user_profile: UserProfileSchema,
     }
 )
 async def logout(access_token: str = Depends(oauth2_scheme),
-                 db: Session = Depends(get_db),
+                 current_user: CurrentUserSchema = Depends(get_current_user),
+                 db: DBSession = Depends(get_db),
                  auth_service: AuthService = Depends(AuthService),
                  ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Logout) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         await auth_service.revoke_access_token(db, access_token)
 
-        logger.info(f"(Logout) Token was revoked now: {access_token}")
+        logger.info("(Logout) User %s logged out", current_user.id)
 
-        return MessageSchema(description="Token was successfully revoked")
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Logout) Bad token {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
+        return MessageSchema(messageDigest=str(current_user.id),
+                             description="Token was successfully revoked"
+                             )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Logout) Error: {e}")
+        logger.error("(Logout) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+class CurrentUserSchema(BaseModel):
+    id: int = Field(..., description="ID пользователя")
+    name: str = Field(..., description="Полное имя пользователя")
+    tel: str = Field(..., description="Номер телефона")
+    email: str = Field(..., description="Электронная почта")
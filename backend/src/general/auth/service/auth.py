@@ -1,19 +1,19 @@
 import logging
 import jwt
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from debugpy.adapter.sessions import Session
-from passlib.context import CryptContext
+from sqlalchemy import select
 
 from src.config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, JWT_SECRET_KEY
+from src.database import DBSession, db_execute, db_commit
 from src.general.auth.models import CRL
-
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.general.auth.service.hashing import password_hasher
+from src.general.auth.service.revocation import revocation_cache, token_digest
+from src.helper.time.utc import utc_now
 
 class AuthService:
     def __init__(self):
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
         self.TOKEN_LIFETIME = int(ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -21,12 +21,12 @@ class AuthService:
         self.ALGORITHM = str(ALGORITHM)
 
     @staticmethod
-    def get_hashed_password(password: str) -> str:
-        return password_context.hash(password)
+    async def get_hashed_password(password: str) -> str:
+        return await password_hasher.hash(password)
 
     @staticmethod
-    def verify_hashed_password(plain_password: str, hashed_password: str) -> bool:
-        return password_context.verify(plain_password, hashed_password)
+    async def verify_hashed_password(plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
     async def create_access_token(self, data: dict) -> str:
         try:
@@ -36,42 +36,61 @@ class AuthService:
             to_encode.update({"exp": expire})
             encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
 
-            self.logger.info(f"(Create access token) Successful created access token with payload: {data}")
+            self.logger.debug("(Create access token) Created access token for user %s", data.get("sub"))
 
             return encoded_jwt
         except Exception as e:
-            self.logger.error(f"(Create access token) Error creating access token: {e}")
+            self.logger.error("(Create access token) Error creating access token: %s", e)
             raise
 
     async def get_data_from_access_token(self, token: str) -> dict:
         try:
             payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
 
-            self.logger.info(f"(Get data from token) Successful get data: {payload}")
+            self.logger.debug("(Get data from token) Decoded token of user %s", payload.get("sub"))
             return payload
         except jwt.PyJWTError as e:
-            self.logger.warning(f"(Get data from token) Bad auth token: {token}")
+            self.logger.warning("(Get data from token) Bad auth token: %s", e)
             raise
         except Exception as e:
-            self.logger.error(f"(Get data from token) Error auth token: {e}")
+            self.logger.error("(Get data from token) Error auth token: %s", e)
             raise
 
-    async def revoke_access_token(self, db: Session, token: str) -> None:
+    async def revoke_access_token(self, db: DBSession, token: str) -> None:
         try:
-            crl_entry = CRL(token=token)
+            # Подпись уже проверена вызывающим кодом; из токена нужен только exp
+            payload = jwt.decode(token, options={"verify_signature": False, "verify_exp": False})
+
+            if "exp" in payload:
+                expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc).replace(tzinfo=None)
+            else:
+                expires_at = utc_now() + timedelta(minutes=self.TOKEN_LIFETIME)
+
+            digest = token_digest(token)
+            crl_entry = CRL(token_digest=digest, expires_at=expires_at)
             db.add(crl_entry)
-            db.commit()
-            self.logger.info(f"(Revoke access token) Token revoked: {token}")
+            await db_commit(db)
+            revocation_cache.add(digest, expires_at)
+            self.logger.info("(Revoke access token) Token revoked, digest %s", digest[:12])
         except Exception as e:
-            self.logger.error(f"(Revoke access token) Error token revoked: {e}")
+            self.logger.error("(Revoke access token) Error token revoked: %s", e)
 
-    async def check_revoked(self, db: Session, token: str) -> bool:
+    async def check_revoked(self, db: DBSession, token: str) -> bool:
         try:
-            if db.query(CRL).filter(CRL.token == token).first():
-                self.logger.warning(f"(Check revoked access token) Token revoked: {token}")
+            digest = token_digest(token)
+
+            if revocation_cache.loaded:
+                revoked = revocation_cache.is_revoked(digest)
+            else:
+                # Кэш еще не загружен (например, база была недоступна при старте)
+                result = await db_execute(db, select(CRL.id).where(CRL.token_digest == digest).limit(1))
+                revoked = result.first() is not None
+
+            if revoked:
+                self.logger.warning("(Check revoked access token) Revoked token used, digest %s", digest[:12])
                 return True
             else:
-                self.logger.warning(f"(Check revoked access token) Token not revoked: {token}")
+                self.logger.debug("(Check revoked access token) Token not revoked")
                 return False
         except Exception as e:
-            self.logger.error(f"(Check revoked access token) Error revoking token: {e}")
\ No newline at end of file
+            self.logger.error("(Check revoked access token) Error revoking token: %s", e)
\ No newline at end of file
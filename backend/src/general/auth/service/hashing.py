@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from src.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+from src.helper.metrics.histogram import Histogram
+
+password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasherOverloaded(Exception):
+    pass
+
+
+class PasswordHasher:
+    # bcrypt намеренно дорогой по CPU, поэтому выполняется в отдельном пуле потоков
+    # (bcrypt отпускает GIL), а очередь ограничена: при всплеске входов растет только
+    # задержка входа, а лишние запросы сразу отклоняются, не блокируя цикл событий
+    def __init__(self, workers: int, max_pending: int):
+        self.logger = logging.getLogger(__name__)
+
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latency = Histogram()
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            self.logger.warning("(Password hasher) Queue is full: %s pending", self.pending)
+            raise PasswordHasherOverloaded("Too many password operations in progress")
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self.latency.observe(time.perf_counter() - started)
+
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(password_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(password_context.verify, plain_password, hashed_password)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot()
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import logging
+import time
+
+from datetime import datetime
+
+from sqlalchemy import select, delete, or_
+
+from src.config import CRL_GAP_SECONDS, CRL_GAP_MAX, CRL_FULL_REFRESH_SECONDS
+from src.database import DBSession, db_execute, db_commit, open_session
+from src.general.auth.models import CRL
+from src.helper.time.utc import utc_now
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationCache:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        self._expiry_by_digest = {}
+        self._last_id = 0
+        # id, пропущенные при синхронизации: транзакция с меньшим id могла закоммититься позже
+        # большего, такие id перечитываются, пока не появятся или не устареют
+        self._gaps = {}
+        self._last_full_refresh = float("-inf")
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._expiry_by_digest)
+
+    def is_revoked(self, digest: str) -> bool:
+        return digest in self._expiry_by_digest
+
+    def add(self, digest: str, expires_at: datetime) -> None:
+        self._expiry_by_digest[digest] = expires_at
+
+    def prune(self, now: datetime) -> int:
+        expired = [digest for digest, expires_at in self._expiry_by_digest.items() if expires_at <= now]
+        for digest in expired:
+            del self._expiry_by_digest[digest]
+        return len(expired)
+
+    async def refresh(self, db: DBSession) -> int:
+        now = time.monotonic()
+        if now - self._last_full_refresh >= CRL_FULL_REFRESH_SECONDS:
+            return await self.full_refresh(db)
+
+        # Подгружаются записи после последней синхронизации и ранее пропущенные id
+        condition = CRL.id > self._last_id
+        if self._gaps:
+            condition = or_(condition, CRL.id.in_(list(self._gaps)))
+        result = await db_execute(
+            db,
+            select(CRL.id, CRL.token_digest, CRL.expires_at).where(condition).order_by(CRL.id)
+        )
+        rows = result.all()
+
+        previous_last_id = self._last_id
+        loaded_ids = set()
+        for crl_id, digest, expires_at in rows:
+            self._expiry_by_digest[digest] = expires_at
+            loaded_ids.add(crl_id)
+            self._last_id = max(self._last_id, crl_id)
+
+        for gap_id in range(previous_last_id + 1, self._last_id):
+            if gap_id not in loaded_ids:
+                self._gaps[gap_id] = now
+        for crl_id in loaded_ids:
+            self._gaps.pop(crl_id, None)
+        self._expire_gaps(now)
+
+        self.loaded = True
+        return len(rows)
+
+    def _expire_gaps(self, now: float) -> None:
+        # Откаченные транзакции оставляют пропуски навсегда; их подстрахует полное перечитывание
+        for gap_id in [gap_id for gap_id, seen in self._gaps.items() if now - seen > CRL_GAP_SECONDS]:
+            del self._gaps[gap_id]
+        if len(self._gaps) > CRL_GAP_MAX:
+            for gap_id in sorted(self._gaps, key=self._gaps.get)[:len(self._gaps) - CRL_GAP_MAX]:
+                del self._gaps[gap_id]
+
+    async def full_refresh(self, db: DBSession) -> int:
+        # Все действующие записи. Отзыв не отменяется, поэтому новые записи объединяются
+        # с кэшем, а не заменяют его: токены, отозванные во время чтения, не теряются
+        started = time.monotonic()
+        result = await db_execute(
+            db,
+            select(CRL.id, CRL.token_digest, CRL.expires_at).where(CRL.expires_at > utc_now())
+        )
+        rows = result.all()
+
+        for crl_id, digest, expires_at in rows:
+            self._expiry_by_digest[digest] = expires_at
+            self._last_id = max(self._last_id, crl_id)
+
+        self._gaps.clear()
+        self._last_full_refresh = started
+        self.loaded = True
+        return len(rows)
+
+    async def load(self) -> None:
+        try:
+            async with open_session() as db:
+                count = await self.refresh(db)
+            self.logger.info("(Revocation cache) Loaded %s revoked tokens", count)
+        except Exception as e:
+            self.logger.error("(Revocation cache) Error loading revoked tokens: %s", e)
+
+    async def run_refresh(self, interval: float) -> None:
+        # Токены, отозванные другими воркерами, попадают в кэш не позже чем через interval секунд
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with open_session() as db:
+                    count = await self.refresh(db)
+                if count:
+                    self.logger.info("(Revocation cache) Synced %s revoked tokens", count)
+            except Exception as e:
+                self.logger.error("(Revocation cache) Error syncing revoked tokens: %s", e)
+
+
+revocation_cache = RevocationCache()
+
+
+async def prune_expired_revocations(db: DBSession) -> int:
+    now = utc_now()
+
+    result = await db_execute(db, delete(CRL).where(CRL.expires_at <= now))
+    await db_commit(db)
+    revocation_cache.prune(now)
+
+    return result.rowcount
+
+
+async def run_crl_pruning(interval: float) -> None:
+    logger = logging.getLogger(__name__)
+
+    while True:
+        try:
+            async with open_session() as db:
+                count = await prune_expired_revocations(db)
+            logger.info("(CRL pruning) Deleted %s expired revocations", count)
+        except Exception as e:
+            logger.error("(CRL pruning) Error: %s", e)
+        await asyncio.sleep(interval)
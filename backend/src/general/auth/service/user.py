@@ -1,67 +1,74 @@
 import logging
 from typing import List
 
-from git.util import get_user_id
+from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import Session
+
+from src.config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+from src.database import DBSession, db_execute, db_commit, db_refresh, db_rollback
 from src.general.auth.models import User
 from src.general.auth.service.auth import AuthService
+from src.helper.cache.ttl import TTLCache
+
+# Пользователи, уже прошедшие аутентификацию, по ID: CurrentUserSchema
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
 
 class UserService:
     def __init__(self):
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    async def get_user_by_email(self, db: Session, email: str) -> User:
+    async def get_user_by_email(self, db: DBSession, email: str) -> User:
         try:
-            user = db.query(User).filter(User.email == email).one_or_none()
+            result = await db_execute(db, select(User).where(User.email == email))
+            user = result.scalar_one_or_none()
 
             if user:
-                self.logger.info(f"(Email user getting) Got user with ID {user.id}")
+                self.logger.info("(Email user getting) Got user with ID %s", user.id)
             else:
-                self.logger.info(f"(Email user getting) No same user found: {email}")
+                self.logger.info("(Email user getting) No same user found: %s", email)
 
             return user
         except Exception as e:
-            self.logger.info(f"(Email user getting) Error: {e}")
+            self.logger.info("(Email user getting) Error: %s", e)
             raise
 
-    async def get_user_by_id(self, db: Session, _id: int) -> User:
+    async def get_user_by_id(self, db: DBSession, _id: int) -> User:
         try:
-            user = db.query(User).filter(User.id == _id).first()
+            result = await db_execute(db, select(User).where(User.id == _id))
+            user = result.scalars().first()
 
             if user:
-                self.logger.info(f"(User id getting) Got user with ID {user.id}")
+                self.logger.info("(User id getting) Got user with ID %s", user.id)
             else:
-                self.logger.info(f"(User id getting) No same user found: {_id}")
+                self.logger.info("(User id getting) No same user found: %s", _id)
 
             return user
         except Exception as e:
-            self.logger.info(f"(User id getting) Error: {e}")
+            self.logger.info("(User id getting) Error: %s", e)
             raise
 
-    async def verify_password(self, db: Session, email: str, password: str) -> bool:
+    async def verify_password(self, db: DBSession, email: str, password: str) -> bool:
         try:
             user = await self.get_user_by_email(db, email)
 
             if not user:
-                self.logger.info(f"(Password verify) No same user found: {email}")
+                self.logger.info("(Password verify) No same user found: %s", email)
                 return False
 
-            if AuthService.verify_hashed_password(password, user.password):
-                self.logger.info(f"(Password verify) Success: {email}")
+            if await AuthService.verify_hashed_password(password, user.password):
+                self.logger.info("(Password verify) Success: %s", email)
                 return True
             else:
-                self.logger.info(f"(Password verify) Failure: {email}")
+                self.logger.info("(Password verify) Failure: %s", email)
                 return False
 
         except Exception as e:
-            self.logger.info(f"(Password verify) Error: {email}")
+            self.logger.info("(Password verify) Error: %s", email)
             raise
 
-    async def create_user(self, db: Session, name: str, tel: str, email: str, password: str) -> User:
+    async def create_user(self, db: DBSession, name: str, tel: str, email: str, password: str) -> User:
         try:
-            hashed_password = AuthService.get_hashed_password(password)
+            hashed_password = await AuthService.get_hashed_password(password)
 
             user = User(
                 name = name,
@@ -70,20 +77,23 @@ class UserService:
                 password = hashed_password
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db_commit(db)
+            await db_refresh(db, user)
 
-            self.logger.info(f"(Creating user) Success: {user}")
+            self.logger.info("(Creating user) Success: %s", user)
 
             return user
         except Exception as e:
-            self.logger.info(f"(Creating user) Error: {e}")
+            self.logger.info("(Creating user) Error: %s", e)
             raise
 
-    async def update_user(self, db: Session, _id: int, name: str, tel: str, email: str) -> User:
+    async def update_user(self, db: DBSession, _id: int, name: str, tel: str, email: str) -> User:
         try:
             user = await self.get_user_by_id(db,_id)
 
+            if not user:
+                raise NoResultFound()
+
             if name:
                 user.name = name
             if tel:
@@ -91,25 +101,27 @@ class UserService:
             if email:
                 user.email = email
 
-            db.commit()
-            db.refresh(user)
+            await db_commit(db)
+            await db_refresh(db, user)
+            user_cache.pop(user.id)
 
-            self.logger.info(f"(Updating user) Success: {user}")
+            self.logger.info("(Updating user) Success: %s", user)
 
             return user
         except NoResultFound:
-            self.logger.info(f"(Updating user) Error: User with ID {_id} not found")
+            self.logger.info("(Updating user) Error: User with ID %s not found", _id)
             raise ValueError(f"User with ID {_id} not found")
         except Exception as e:
-            db.rollback()
-            self.logger.info(f"(Updating user) Error: {e}")
+            await db_rollback(db)
+            self.logger.info("(Updating user) Error: %s", e)
             raise
 
-    async def get_all_users(self, db: Session) -> List[User]:
+    async def get_all_users(self, db: DBSession) -> List[User]:
         try:
-            users = db.query(User).all()
-            self.logger.info(f"(Getting all users) Retrieved {len(users)} users")
+            result = await db_execute(db, select(User))
+            users = result.scalars().all()
+            self.logger.info("(Getting all users) Retrieved %s users", len(users))
             return users
         except Exception as e:
-            self.logger.info(f"(Getting all users) Error: {e}")
+            self.logger.info("(Getting all users) Error: %s", e)
             raise
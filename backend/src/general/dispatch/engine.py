@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from src.config import DISPATCH_POLICY, DISPATCH_DRIVER_CAPACITY, DISPATCH_SEARCH_RADIUS_KM, SPATIAL_CELL_DEGREES
+from src.database import open_session, db_execute
+from src.general.dispatch.policy import DispatchPolicy, get_policy
+from src.general.dispatch.slot import DriverSlot
+from src.general.dispatch.spatial import GridIndex
+from src.general.driver.models import Driver
+from src.general.driver.enum.DriverStatusEnum import DriverStatusEnum
+
+
+class DispatchEngine:
+    # Индекс свободных водителей в памяти процесса: по куче на класс водителя.
+    # Назначение и освобождение - O(log n), устаревшие записи кучи удаляются лениво.
+    # Методы без await выполняются в цикле событий атомарно относительно других запросов.
+    # Индекс только предлагает кандидата: окончательно водитель захватывается условным
+    # UPDATE в БД, а расхождения с другими процессами устраняет периодическая сверка.
+    # Водители с известной позицией дополнительно лежат в сетке своего класса для поиска ближайших.
+    def __init__(self, policy: DispatchPolicy, capacity: int, cell_degrees: float, search_radius_km: float):
+        self.logger = logging.getLogger(__name__)
+
+        self.policy = policy
+        self.capacity = capacity
+        self.search_radius_km = search_radius_km
+        self.loaded = False
+
+        self._slots: Dict[int, DriverSlot] = {}
+        self._heaps: Dict[str, List[tuple]] = defaultdict(list)
+        self._grids: Dict[str, GridIndex] = defaultdict(lambda: GridIndex(cell_degrees))
+        self._sequence = itertools.count(1)
+
+    def _is_available(self, slot: DriverSlot) -> bool:
+        return slot.online and slot.active_orders < self.capacity
+
+    def _push(self, slot: DriverSlot) -> None:
+        if not self._is_available(slot):
+            return
+
+        heap = self._heaps[slot.driver_class]
+        heapq.heappush(heap, (self.policy.key(slot), slot.driver_id, slot.version))
+
+        # Устаревшие записи удаляются только при выдаче; если выдач мало, кучу перестраиваем
+        if len(heap) > 4 * len(self._slots) + 64:
+            self._rebuild(slot.driver_class)
+
+    def _rebuild(self, driver_class: str) -> None:
+        heap = [
+            (self.policy.key(slot), slot.driver_id, slot.version)
+            for slot in self._slots.values()
+            if slot.driver_class == driver_class and self._is_available(slot)
+        ]
+        heapq.heapify(heap)
+        self._heaps[driver_class] = heap
+
+    def register(self, driver_id: int, driver_class, car: str) -> None:
+        slot = self._slots.get(driver_id)
+
+        if slot is None:
+            slot = DriverSlot(driver_id=driver_id, driver_class=driver_class.value, car=car)
+            self._slots[driver_id] = slot
+        else:
+            self._move(slot, driver_class.value)
+            slot.car = car
+            slot.version += 1
+
+        self._push(slot)
+
+    def _move(self, slot: DriverSlot, driver_class: str) -> None:
+        if slot.driver_class == driver_class:
+            return
+
+        position = self._grids[slot.driver_class].get(slot.driver_id)
+        if position:
+            self._grids[slot.driver_class].remove(slot.driver_id)
+            self._grids[driver_class].update(slot.driver_id, *position)
+
+        slot.driver_class = driver_class
+
+    def remove(self, driver_id: int) -> None:
+        slot = self._slots.pop(driver_id, None)
+
+        if slot is not None:
+            self._grids[slot.driver_class].remove(driver_id)
+
+    def set_position(self, driver_id: int, latitude: float, longitude: float) -> bool:
+        slot = self._slots.get(driver_id)
+
+        if slot is None:
+            return False
+
+        self._grids[slot.driver_class].update(driver_id, latitude, longitude)
+        return True
+
+    def nearest(self, driver_class, latitude: float, longitude: float, k: int) -> List[Tuple[float, DriverSlot]]:
+        # k ближайших свободных водителей класса в радиусе поиска: пары (расстояние в км, слот)
+        found = self._grids[driver_class.value].nearest(
+            latitude,
+            longitude,
+            k,
+            self.search_radius_km,
+            lambda driver_id: self._is_available(self._slots[driver_id])
+        )
+        return [(distance, self._slots[driver_id]) for distance, driver_id in found]
+
+    def _take(self, slot: DriverSlot) -> DriverSlot:
+        slot.active_orders += 1
+        slot.last_assigned = next(self._sequence)
+        slot.version += 1
+        self._push(slot)
+
+        return slot
+
+    def acquire(self, driver_class, latitude: Optional[float] = None, longitude: Optional[float] = None) -> Optional[DriverSlot]:
+        # При известной точке подачи назначается ближайший свободный водитель,
+        # если в радиусе поиска никого нет - водитель по политике диспетчеризации
+        if latitude is not None and longitude is not None:
+            found = self.nearest(driver_class, latitude, longitude, 1)
+            if found:
+                return self._take(found[0][1])
+
+        heap = self._heaps[driver_class.value]
+
+        while heap:
+            _, driver_id, version = heapq.heappop(heap)
+            slot = self._slots.get(driver_id)
+
+            if slot is None or slot.version != version or not self._is_available(slot):
+                continue
+
+            return self._take(slot)
+
+        return None
+
+    def release(self, driver_id: int) -> None:
+        slot = self._slots.get(driver_id)
+
+        if slot is None or slot.active_orders == 0:
+            return
+
+        slot.active_orders -= 1
+        slot.version += 1
+        self._push(slot)
+
+    def available_count(self, driver_class) -> int:
+        return sum(
+            1 for slot in self._slots.values()
+            if slot.driver_class == driver_class.value and self._is_available(slot)
+        )
+
+    def sync(self, driver_id: int, driver_class, car: str, status, active_orders: int,
+             latitude: Optional[float] = None, longitude: Optional[float] = None) -> None:
+        # Приводит слот к состоянию из БД; куча меняется только при фактическом расхождении
+        slot = self._slots.get(driver_id)
+        online = status != DriverStatusEnum.offline
+        changed = True
+
+        if slot is None:
+            slot = DriverSlot(driver_id=driver_id, driver_class=driver_class.value, car=car,
+                              active_orders=active_orders, online=online)
+            self._slots[driver_id] = slot
+        elif (slot.driver_class, slot.car, slot.active_orders, slot.online) != (driver_class.value, car, active_orders, online):
+            self._move(slot, driver_class.value)
+            slot.car = car
+            slot.active_orders = active_orders
+            slot.online = online
+            slot.version += 1
+        else:
+            changed = False
+
+        # Позиция в БД может отставать от принятой в памяти, поэтому только заполняет пропуски
+        grid = self._grids[slot.driver_class]
+        if latitude is not None and longitude is not None and driver_id not in grid:
+            grid.update(driver_id, latitude, longitude)
+
+        if changed:
+            self._push(slot)
+
+    async def load(self) -> None:
+        try:
+            async with open_session() as db:
+                result = await db_execute(
+                    db,
+                    select(Driver.id, Driver.driver_class, Driver.car, Driver.status, Driver.active_orders,
+                           Driver.latitude, Driver.longitude)
+                )
+                rows = result.all()
+
+            known = set()
+            for row in rows:
+                self.sync(*row)
+                known.add(row[0])
+
+            for driver_id in set(self._slots) - known:
+                self.remove(driver_id)
+
+            if not self.loaded:
+                self.logger.info("(Dispatch) Loaded %s drivers, policy %s", len(rows), self.policy.name)
+            self.loaded = True
+        except Exception as e:
+            self.logger.error("(Dispatch) Error loading drivers: %s", e)
+
+    async def run_sync(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.load()
+
+
+dispatch_engine = DispatchEngine(
+    get_policy(DISPATCH_POLICY),
+    DISPATCH_DRIVER_CAPACITY,
+    SPATIAL_CELL_DEGREES,
+    DISPATCH_SEARCH_RADIUS_KM
+)
@@ -0,0 +1,38 @@
+from typing import Dict, Type
+
+from src.general.dispatch.slot import DriverSlot
+
+
+class DispatchPolicy:
+    # Политика задает ключ приоритета свободного водителя: назначается водитель
+    # с минимальным ключом. Ключ должен зависеть только от состояния слота.
+    name = ""
+
+    def key(self, slot: DriverSlot) -> tuple:
+        raise NotImplementedError
+
+
+class LeastRecentlyAssignedPolicy(DispatchPolicy):
+    name = "least_recently_assigned"
+
+    def key(self, slot: DriverSlot) -> tuple:
+        return (slot.last_assigned,)
+
+
+class FewestActiveOrdersPolicy(DispatchPolicy):
+    name = "fewest_active_orders"
+
+    def key(self, slot: DriverSlot) -> tuple:
+        return (slot.active_orders, slot.last_assigned)
+
+
+POLICIES: Dict[str, Type[DispatchPolicy]] = {
+    LeastRecentlyAssignedPolicy.name: LeastRecentlyAssignedPolicy,
+    FewestActiveOrdersPolicy.name: FewestActiveOrdersPolicy,
+}
+
+
+def get_policy(name: str) -> DispatchPolicy:
+    if name not in POLICIES:
+        raise ValueError(f"Unknown dispatch policy: {name}")
+    return POLICIES[name]()
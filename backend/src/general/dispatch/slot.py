@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class DriverSlot:
+    driver_id: int
+    driver_class: str
+    car: str
+    active_orders: int = 0
+    # False для водителей со статусом offline: в выдачу они не попадают
+    online: bool = True
+    # Порядковый номер последнего назначения (0 - еще не назначался)
+    last_assigned: int = 0
+    # Увеличивается при каждом изменении: записи кучи с устаревшей версией пропускаются
+    version: int = 0
@@ -0,0 +1,120 @@
+import math
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Длина градуса широты, км
+KM_PER_DEGREE = 111.32
+
+Cell = Tuple[int, int]
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    # Равнопромежуточная аппроксимация от первой точки: на масштабе города погрешность доли процента
+    return math.hypot(lat2 - lat1, (lon2 - lon1) * math.cos(math.radians(lat1))) * KM_PER_DEGREE
+
+
+class GridIndex:
+    # Точки раскладываются по квадратным ячейкам сетки cell_degrees x cell_degrees.
+    # Поиск k ближайших обходит кольца ячеек вокруг точки запроса и останавливается,
+    # как только следующее кольцо гарантированно дальше k-го найденного кандидата.
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+
+        self._cells: Dict[Cell, Set[int]] = defaultdict(set)
+        self._points: Dict[int, Tuple[float, float, Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._points
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def get(self, key: int) -> Optional[Tuple[float, float]]:
+        point = self._points.get(key)
+        return (point[0], point[1]) if point else None
+
+    def update(self, key: int, lat: float, lon: float) -> None:
+        cell = self._cell(lat, lon)
+        point = self._points.get(key)
+
+        if point and point[2] != cell:
+            self._discard(key, point[2])
+
+        self._cells[cell].add(key)
+        self._points[key] = (lat, lon, cell)
+
+    def remove(self, key: int) -> None:
+        point = self._points.pop(key, None)
+
+        if point:
+            self._discard(key, point[2])
+
+    def _discard(self, key: int, cell: Cell) -> None:
+        bucket = self._cells.get(cell)
+
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def _ring(self, center: Cell, radius: int):
+        row, col = center
+
+        if radius == 0:
+            yield center
+            return
+
+        for d in range(-radius, radius + 1):
+            yield (row - radius, col + d)
+            yield (row + radius, col + d)
+        for d in range(-radius + 1, radius):
+            yield (row + d, col - radius)
+            yield (row + d, col + radius)
+
+    def nearest(self,
+                lat: float,
+                lon: float,
+                k: int,
+                max_km: float,
+                accept: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        # Возвращает до k пар (расстояние в км, ключ) в порядке удаления, не дальше max_km
+        center = self._cell(lat, lon)
+        lon_scale = math.cos(math.radians(lat))
+        # Минимальная сторона ячейки в км (по долготе ячейки уже, чем по широте)
+        cell_km = self.cell_degrees * KM_PER_DEGREE * max(lon_scale, 0.01)
+        max_radius = int(max_km / cell_km) + 1
+        # Сравнение ведется в квадратах градусов широты, чтобы не считать корень на каждую точку
+        bound = (max_km / KM_PER_DEGREE) ** 2
+        cells = self._cells
+        points = self._points
+
+        found: List[Tuple[float, int]] = []
+
+        for radius in range(max_radius + 1):
+            for cell in self._ring(center, radius):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+
+                for key in bucket:
+                    point_lat, point_lon, _ = points[key]
+                    dlat = point_lat - lat
+                    dlon = (point_lon - lon) * lon_scale
+                    distance = dlat * dlat + dlon * dlon
+
+                    if distance <= bound and (accept is None or accept(key)):
+                        found.append((distance, key))
+
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                # Любая точка за пределами кольца radius не ближе radius * cell_km
+                if math.sqrt(found[-1][0]) * KM_PER_DEGREE <= radius * cell_km:
+                    break
+
+        found.sort()
+        return [(math.sqrt(distance) * KM_PER_DEGREE, key) for distance, key in found[:k]]
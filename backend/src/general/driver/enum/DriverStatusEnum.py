@@ -0,0 +1,6 @@
+from enum import Enum
+
+class DriverStatusEnum(str, Enum):
+    available = "available"
+    busy = "busy"
+    offline = "offline"
\ No newline at end of file
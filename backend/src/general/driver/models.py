@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import Column, Integer, String, Enum, Float, TIMESTAMP
 
 from src.database import Base
+from src.general.driver.enum.DriverStatusEnum import DriverStatusEnum
 import enum
 
 class DriverClassEnum(enum.Enum):
@@ -15,4 +16,11 @@ class Driver(Base):
     name = Column(String, nullable=False)
     tel = Column(String, nullable=False)
     car = Column(String, nullable=False)
-    driver_class = Column(Enum(DriverClassEnum), nullable=False)
\ No newline at end of file
+    driver_class = Column(Enum(DriverClassEnum), nullable=False)
+    # Учетная запись водителя: от ее имени он начинает и завершает свои заказы и передает координаты
+    user_id = Column(Integer, unique=True, index=True)
+    status = Column(Enum(DriverStatusEnum), default=DriverStatusEnum.available, server_default=DriverStatusEnum.available.value, index=True, nullable=False)
+    active_orders = Column(Integer, default=0, server_default="0", nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    location_updated_at = Column(TIMESTAMP)
\ No newline at end of file
@@ -1,22 +1,30 @@
 import logging
-import jwt
 
-from sqlalchemy.orm import Session
-from src.database import get_db
+from collections import Counter
+from datetime import datetime
+from typing import Optional
 
-from src.config import oauth2_scheme, SWAGGER_GROUPS
-from fastapi import APIRouter, Depends, HTTPException
+from src.database import get_db, DBSession
 
-from src.general.auth.service.auth import AuthService
+from src.config import SWAGGER_GROUPS, ORDER_PAGE_SIZE, ORDER_PAGE_SIZE_MAX
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.general.auth.dependency import get_current_user, is_admin
+from src.general.auth.schema.current_user import CurrentUserSchema
+from src.general.dispatch.engine import dispatch_engine
 from src.general.driver.enum.DriverClassEnum import DriverClassEnum
 from src.general.driver.service import DriverService
 from src.general.driver.schema.driver import DriverSchema
 from src.general.driver.schema.driver_create import DriverCreateSchema
+from src.general.driver.schema.driver_batch import DriverBatchCreateSchema
+from src.general.order.schema.drive_order_detail import DriverOrderDetailSchema
+from src.general.order.schema.order_page import DriverOrderPageSchema
+from src.general.order.service import OrderService
 
+from src.helper.bulk.schema import BulkItemResultSchema, BulkResultSchema
 from src.helper.error.schema import ErrorSchema
 from src.helper.message.schema import MessageSchema
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 driver_router = APIRouter(prefix="/driver")
@@ -32,38 +40,107 @@ driver_router = APIRouter(prefix="/driver")
         400:{
             "model": ErrorSchema
         },
+        403:{
+            "model": ErrorSchema
+        },
         500:{
             "model": ErrorSchema
         }
     }
 )
 async def create_driver(driver_sch: DriverCreateSchema,
-                        db: Session = Depends(get_db),
-                        access_token: str = Depends(oauth2_scheme),
-                        auth_service: AuthService = Depends(AuthService),
+                        db: DBSession = Depends(get_db),
+                        current_user: CurrentUserSchema = Depends(get_current_user),
                         driver_service: DriverService = Depends(DriverService)
                         ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get drivers) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
+        if driver_sch.user_id is not None and not is_admin(current_user):
+            logger.warning("(Create driver) User %s is not allowed to link driver accounts", current_user.id)
+            raise HTTPException(status_code=403, detail="Only an admin can link a driver to a user")
 
-        driver = await driver_service.create_driver(db, driver_sch.name, driver_sch.tel, driver_sch.car, driver_sch.driver_class)
+        driver = await driver_service.create_driver(db, driver_sch.name, driver_sch.tel, driver_sch.car,
+                                                    driver_sch.driver_class, driver_sch.user_id)
+        dispatch_engine.register(driver.id, driver.driver_class, driver.car)
 
-        logger.info(f"(Create driver) Driver successful created {driver.id}")
+        logger.info("(Create driver) Driver successful created %s", driver.id)
         return MessageSchema(messageDigest=str(driver.id),
                              description="Driver create successfully"
                              )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get driver find by id) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except ValueError as validation_error:
-        logger.warning(f"(Create driver) Validation error: {validation_error}")
+        logger.warning("(Create driver) Validation error: %s", validation_error)
         raise HTTPException(status_code=400, detail=str(validation_error))
     except Exception as e:
-        logger.error(f"(Create driver) Error {e}")
+        logger.error("(Create driver) Error %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@driver_router.post(
+    "/batch/",
+    tags=[SWAGGER_GROUPS["driver"]],
+    response_model=BulkResultSchema,
+    responses={
+        200:{
+            "model": BulkResultSchema
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403:{
+            "model": ErrorSchema
+        },
+        500:{
+            "model": ErrorSchema
+        }
+    }
+)
+async def create_drivers(batch: DriverBatchCreateSchema,
+                         db: DBSession = Depends(get_db),
+                         current_user: CurrentUserSchema = Depends(get_current_user),
+                         driver_service: DriverService = Depends(DriverService)
+                         ):
+    try:
+        if any(driver_sch.user_id is not None for driver_sch in batch.drivers) and not is_admin(current_user):
+            logger.warning("(Create drivers) User %s is not allowed to link driver accounts", current_user.id)
+            raise HTTPException(status_code=403, detail="Only an admin can link a driver to a user")
+
+        # Учетная запись привязывается не больше чем к одному водителю: такие строки отклоняются до вставки,
+        # чтобы нарушение уникального индекса не откатило всю пачку
+        user_ids = Counter(driver_sch.user_id for driver_sch in batch.drivers if driver_sch.user_id is not None)
+        linked = await driver_service.get_linked_user_ids(db, list(user_ids)) if user_ids else set()
+
+        items = {}
+        valid = []
+        positions = []
+
+        for index, driver_sch in enumerate(batch.drivers):
+            if driver_sch.user_id is not None and user_ids[driver_sch.user_id] > 1:
+                items[index] = BulkItemResultSchema(index=index, status_code=400,
+                                                    detail="User is linked to several drivers in the batch")
+            elif driver_sch.user_id in linked:
+                items[index] = BulkItemResultSchema(index=index, status_code=409,
+                                                    detail="User is already linked to a driver")
+            else:
+                valid.append(driver_sch)
+                positions.append(index)
+
+        driver_ids = await driver_service.create_drivers(db, valid) if valid else []
+
+        for index, driver_id, driver_sch in zip(positions, driver_ids, valid):
+            dispatch_engine.register(driver_id, driver_sch.driver_class, driver_sch.car)
+            items[index] = BulkItemResultSchema(index=index, status_code=200, id=driver_id)
+
+        logger.info("(Create drivers) Created %s of %s drivers", len(driver_ids), len(batch.drivers))
+        return BulkResultSchema(
+            created=len(driver_ids),
+            failed=len(batch.drivers) - len(driver_ids),
+            items=[items[index] for index in range(len(batch.drivers))]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Create drivers) Error %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -90,23 +167,18 @@ async def create_driver(driver_sch: DriverCreateSchema,
     }
 )
 async def get_driver_by_id(driver_id: int,
-                          db: Session = Depends(get_db),
-                          access_token: str = Depends(oauth2_scheme),
-                          auth_service: AuthService = Depends(AuthService),
+                          db: DBSession = Depends(get_db),
+                          current_user: CurrentUserSchema = Depends(get_current_user),
                           driver_service: DriverService = Depends(DriverService)
                           ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get driver find by id) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         driver = await driver_service.get_driver_by_id(db, driver_id)
 
         if not driver:
-            logger.warning(f"(Get driver find by id) driver not found: {driver.id}")
+            logger.warning("(Get driver find by id) driver not found: %s", driver_id)
             raise HTTPException(status_code=404, detail="driver not found")
 
-        logger.info(f"(Get driver find by id) driver successful found: {driver.id}")
+        logger.info("(Get driver find by id) driver successful found: %s", driver.id)
 
         return DriverSchema(
             id = driver.id,
@@ -115,13 +187,79 @@ async def get_driver_by_id(driver_id: int,
             car = driver.car,
             driver_class = driver.driver_class
         )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get driver find by id) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get driver find by id) Error: {e}")
+        logger.error("(Get driver find by id) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@driver_router.get(
+    "/{driver_id}/orders",
+    tags=[SWAGGER_GROUPS["driver"]],
+    response_model=DriverOrderPageSchema,
+    responses={
+        200: {
+            "model": DriverOrderPageSchema
+        },
+        400: {
+            "model": ErrorSchema
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        },
+    }
+)
+async def get_driver_orders(driver_id: int,
+                            limit: int = Query(ORDER_PAGE_SIZE, ge=1, le=ORDER_PAGE_SIZE_MAX),
+                            cursor: Optional[str] = None,
+                            date_from: Optional[datetime] = None,
+                            date_to: Optional[datetime] = None,
+                            db: DBSession = Depends(get_db),
+                            current_user: CurrentUserSchema = Depends(get_current_user),
+                            order_service: OrderService = Depends(OrderService)
+                            ):
+    try:
+        orders, next_cursor = await order_service.get_driver_orders(db, driver_id, limit, cursor, date_from, date_to)
+
+        logger.info("(Get driver orders) Driver's %s orders successful found", driver_id)
+
+        orders_schema = []
+
+        for order in orders:
+            orders_schema.append(
+                DriverOrderDetailSchema(
+                    id=order.id,
+                    user_id=order.user_id,
+                    driver_class=order.driver_class,
+                    car=order.car,
+                    house_from_id=order.house_from_id,
+                    house_from_street=order.house_from_street,
+                    house_from_building=order.house_from_building,
+                    house_from_number=order.house_from_number,
+                    house_to_id=order.house_to_id,
+                    house_to_street=order.house_to_street,
+                    house_to_building=order.house_to_building,
+                    house_to_number=order.house_to_number,
+                    status=order.status,
+                    order_time=order.order_date
+                )
+            )
+
+        return DriverOrderPageSchema(items=orders_schema, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except ValueError as validation_error:
+        logger.warning("(Get driver orders) Validation error: %s", validation_error)
+        raise HTTPException(status_code=400, detail=str(validation_error))
+    except Exception as e:
+        logger.error("(Get driver orders) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -147,19 +285,14 @@ async def get_driver_by_id(driver_id: int,
         }
     }
 )
-async def get_drivers(db: Session = Depends(get_db),
-                      access_token: str = Depends(oauth2_scheme),
-                      auth_service: AuthService = Depends(AuthService),
+async def get_drivers(db: DBSession = Depends(get_db),
+                      current_user: CurrentUserSchema = Depends(get_current_user),
                       driver_service: DriverService = Depends(DriverService)
                       ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get drivers) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         drivers = await driver_service.get_drivers(db)
 
-        logger.info(f"(Get drivers) Successful get drivers")
+        logger.info("(Get drivers) Successful get drivers")
 
         drivers_schema = []
 
@@ -175,13 +308,10 @@ async def get_drivers(db: Session = Depends(get_db),
             )
 
         return drivers_schema
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get drivers) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get drivers) Error: {e}")
+        logger.error("(Get drivers) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -205,20 +335,15 @@ async def get_drivers(db: Session = Depends(get_db),
     }
 )
 async def get_drivers_by_class(driver_class: DriverClassEnum,
-                               db: Session = Depends(get_db),
-                               access_token: str = Depends(oauth2_scheme),
-                               auth_service: AuthService = Depends(AuthService),
+                               db: DBSession = Depends(get_db),
+                               current_user: CurrentUserSchema = Depends(get_current_user),
                                driver_service: DriverService = Depends(DriverService)
                                ):
     try:
 
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get drivers by class) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         drivers_by_class = await driver_service.get_drivers_by_class(db, driver_class)
 
-        logger.info(f"(Get drivers by class) Successful get drivers by class {driver_class}")
+        logger.info("(Get drivers by class) Successful get drivers by class %s", driver_class)
 
         drivers_by_class_schema = []
 
@@ -235,7 +360,7 @@ async def get_drivers_by_class(driver_class: DriverClassEnum,
 
         return drivers_by_class_schema
     except Exception as e:
-        logger.error(f"(Get drivers by class) Error: {e}")
+        logger.error("(Get drivers by class) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @driver_router.get(
@@ -258,20 +383,15 @@ async def get_drivers_by_class(driver_class: DriverClassEnum,
     }
 )
 async def get_drivers_by_class(car: str,
-                               db: Session = Depends(get_db),
-                               access_token: str = Depends(oauth2_scheme),
-                               auth_service: AuthService = Depends(AuthService),
+                               db: DBSession = Depends(get_db),
+                               current_user: CurrentUserSchema = Depends(get_current_user),
                                driver_service: DriverService = Depends(DriverService)
                                ):
     try:
 
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get drivers by car) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         drivers_by_car = await driver_service.get_drivers_by_car(db, car)
 
-        logger.info(f"(Get drivers by car) Successful get drivers which user the {car}")
+        logger.info("(Get drivers by car) Successful get drivers which user the %s", car)
 
         drivers_by_car_schema = []
 
@@ -288,5 +408,5 @@ async def get_drivers_by_class(car: str,
 
         return drivers_by_car_schema
     except Exception as e:
-        logger.error(f"(Get drivers by car) Error: {e}")
+        logger.error("(Get drivers by car) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from src.config import BULK_CREATE_MAX
+from src.general.driver.schema.driver_create import DriverCreateSchema
+
+class DriverBatchCreateSchema(BaseModel):
+    drivers: List[DriverCreateSchema] = Field(..., min_length=1, max_length=BULK_CREATE_MAX, description="Водители")
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 from src.general.driver.enum.DriverClassEnum import DriverClassEnum
@@ -6,4 +8,5 @@ class DriverCreateSchema(BaseModel):
     name: str = Field(..., description="Имя водителя")
     tel: str = Field(..., description="Телефон водителя")
     car: str = Field(..., description="Машина водителя")
-    driver_class: DriverClassEnum = Field(..., description="Класс водителя")
\ No newline at end of file
+    driver_class: DriverClassEnum = Field(..., description="Класс водителя")
+    user_id: Optional[int] = Field(None, description="ID учетной записи водителя (задает только администратор)")
\ No newline at end of file
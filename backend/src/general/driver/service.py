@@ -1,73 +1,174 @@
 import logging
 
-from typing import List, Optional
+from typing import List, Optional, Set
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, case, insert
+
+from src.config import DISPATCH_DRIVER_CAPACITY
+from src.database import DBSession, db_execute, db_commit, db_refresh, db_rollback
 from src.general.driver.models import Driver
 from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.driver.enum.DriverStatusEnum import DriverStatusEnum
+from src.general.driver.schema.driver_create import DriverCreateSchema
 
 
 class DriverService:
     def __init__(self):
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    async def get_driver_by_id(self, db: Session, _id: int) -> Optional[Driver]:
+    async def get_driver_by_id(self, db: DBSession, _id: int) -> Optional[Driver]:
         try:
-            driver = db.query(Driver).filter(Driver.id == _id).first()
+            result = await db_execute(db, select(Driver).where(Driver.id == _id))
+            driver = result.scalars().first()
 
             if driver:
-                self.logger.info(f"(Get driver by ID) Found driver with ID {_id}")
+                self.logger.info("(Get driver by ID) Found driver with ID %s", _id)
             else:
-                self.logger.info(f"(Get driver by ID) No driver found with ID {_id}")
+                self.logger.info("(Get driver by ID) No driver found with ID %s", _id)
 
             return driver
         except Exception as e:
-            self.logger.error(f"(Get driver by ID) Error: {e}")
+            self.logger.error("(Get driver by ID) Error: %s", e)
             raise
 
-    async def get_drivers(self, db: Session) -> List[Driver]:
+    async def get_driver_id_by_user_id(self, db: DBSession, user_id: int) -> Optional[int]:
         try:
-            drivers = db.query(Driver).all()
-            self.logger.info(f"(Get drivers) Retrieved {len(drivers)} drivers")
+            result = await db_execute(db, select(Driver.id).where(Driver.user_id == user_id))
+            return result.scalar()
+        except Exception as e:
+            self.logger.error("(Get driver by user ID) Error: %s", e)
+            raise
+
+    async def get_linked_user_ids(self, db: DBSession, user_ids: List[int]) -> Set[int]:
+        try:
+            result = await db_execute(db, select(Driver.user_id).where(Driver.user_id.in_(user_ids)))
+            return set(result.scalars().all())
+        except Exception as e:
+            self.logger.error("(Get linked user IDs) Error: %s", e)
+            raise
+
+    async def get_drivers(self, db: DBSession) -> List[Driver]:
+        try:
+            result = await db_execute(db, select(Driver))
+            drivers = result.scalars().all()
+            self.logger.info("(Get drivers) Retrieved %s drivers", len(drivers))
             return drivers
         except Exception as e:
-            self.logger.error(f"(Get drivers) Error: {e}")
+            self.logger.error("(Get drivers) Error: %s", e)
             raise
 
-    async def get_drivers_by_car(self, db: Session, car: str) -> List[Driver]:
+    async def get_drivers_by_car(self, db: DBSession, car: str) -> List[Driver]:
         try:
-            class_drivers = db.query(Driver).filter(Driver.car == car).all()
-            self.logger.info(f"(Get drivers by car) Retrieved {len(class_drivers)} drivers which use car model is {car}")
+            result = await db_execute(db, select(Driver).where(Driver.car == car))
+            class_drivers = result.scalars().all()
+            self.logger.info("(Get drivers by car) Retrieved %s drivers which use car model is %s",
+                             len(class_drivers), car)
             return class_drivers
         except Exception as e:
-            self.logger.error(f"(Get class by car) Error: {e}")
+            self.logger.error("(Get class by car) Error: %s", e)
             raise
 
-    async def get_drivers_by_class(self, db: Session, _class: DriverClassEnum) -> List[Driver]:
+    async def get_drivers_by_class(self, db: DBSession, _class: DriverClassEnum) -> List[Driver]:
         try:
-            car_drivers = db.query(Driver).filter(Driver.driver_class == _class).all()
-            self.logger.info(f"(Get drivers by class) Retrieved {len(car_drivers)} class {_class} drivers")
+            result = await db_execute(db, select(Driver).where(Driver.driver_class == _class))
+            car_drivers = result.scalars().all()
+            self.logger.info("(Get drivers by class) Retrieved %s class %s drivers", len(car_drivers), _class)
             return car_drivers
         except Exception as e:
-            self.logger.error(f"(Get drivers by class) Error: {e}")
+            self.logger.error("(Get drivers by class) Error: %s", e)
             raise
 
-    async def create_driver(self, db: Session, name: str, tel: str, car: str, driver_class: DriverClassEnum) -> Driver:
+    async def create_driver(self,
+                            db: DBSession,
+                            name: str,
+                            tel: str,
+                            car: str,
+                            driver_class: DriverClassEnum,
+                            user_id: Optional[int] = None) -> Driver:
         try:
             driver = Driver(
                 name = name,
                 tel = tel,
                 car = car,
-                driver_class = driver_class
+                driver_class = driver_class,
+                user_id = user_id
             )
             db.add(driver)
-            db.commit()
-            db.refresh(driver)
+            await db_commit(db)
+            await db_refresh(db, driver)
 
-            self.logger.info(f"(Creating driver) Success: {driver}")
+            self.logger.info("(Creating driver) Success: %s", driver)
 
             return driver
         except Exception as e:
-            self.logger.info(f"(Creating driver) Error: {e}")
-            raise
\ No newline at end of file
+            self.logger.info("(Creating driver) Error: %s", e)
+            raise
+
+    async def create_drivers(self, db: DBSession, drivers: List[DriverCreateSchema]) -> List[int]:
+        # Один многострочный INSERT ... RETURNING и один коммит на всю пачку; ID в порядке входного списка
+        try:
+            result = await db_execute(
+                db,
+                insert(Driver).returning(Driver.id, sort_by_parameter_order=True),
+                [
+                    dict(name=driver.name, tel=driver.tel, car=driver.car, driver_class=driver.driver_class,
+                         user_id=driver.user_id)
+                    for driver in drivers
+                ]
+            )
+            driver_ids = list(result.scalars().all())
+            await db_commit(db)
+
+            self.logger.info("(Creating drivers) Success: %s drivers", len(driver_ids))
+
+            return driver_ids
+        except Exception as e:
+            await db_rollback(db)
+            self.logger.error("(Creating drivers) Error: %s", e)
+            raise
+
+    # Переходы состояния водителя выполняются одним условным UPDATE без чтения строки:
+    # из двух конкурирующих транзакций условие выполнится только у одной.
+    # Коммит остается за вызывающим, чтобы захват водителя и запись заказа были атомарны.
+    async def claim_driver(self, db: DBSession, driver_id: int) -> bool:
+        result = await db_execute(
+            db,
+            update(Driver)
+            .where(
+                Driver.id == driver_id,
+                Driver.status == DriverStatusEnum.available,
+                Driver.active_orders < DISPATCH_DRIVER_CAPACITY
+            )
+            .values(
+                active_orders=Driver.active_orders + 1,
+                status=case(
+                    (Driver.active_orders + 1 >= DISPATCH_DRIVER_CAPACITY, DriverStatusEnum.busy),
+                    else_=DriverStatusEnum.available
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        claimed = result.rowcount == 1
+
+        if not claimed:
+            self.logger.info("(Claim driver) Driver %s is no longer available", driver_id)
+
+        return claimed
+
+    async def release_driver(self, db: DBSession, driver_id: int) -> bool:
+        result = await db_execute(
+            db,
+            update(Driver)
+            .where(Driver.id == driver_id, Driver.active_orders > 0)
+            .values(
+                active_orders=Driver.active_orders - 1,
+                status=case(
+                    (Driver.status == DriverStatusEnum.offline, DriverStatusEnum.offline),
+                    else_=DriverStatusEnum.available
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        return result.rowcount == 1
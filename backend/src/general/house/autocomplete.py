@@ -0,0 +1,81 @@
+import re
+
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Optional, Tuple
+
+from src.general.house.index import AddressIndex, DerivedIndex, HouseRecord, address_index
+
+# Тип улицы в начале названия: "ул. Ленина", "пр-т Мира", "улица Садовая"
+STREET_TYPE = re.compile(
+    r"^(?:улица|ул|проспект|просп|пр-кт|пр-т|пр|переулок|пер|бульвар|б-р|шоссе|ш|набережная|наб|площадь|пл)"
+    r"(?:\.\s*|\s+)(?=\S)"
+)
+SEPARATORS = re.compile(r"[\s,]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_search(value: Optional[str]) -> str:
+    # Регистр и "ё" при поиске не различаем, знаки препинания между словами считаем пробелом
+    if not value:
+        return ""
+    return SEPARATORS.sub(" ", value.casefold().replace("ё", "е")).strip()
+
+
+@lru_cache(maxsize=65536)
+def normalize_street(street: str) -> str:
+    return STREET_TYPE.sub("", normalize_search(street), count=1)
+
+
+class AutocompleteIndex(DerivedIndex):
+    # Отсортированный массив строк "улица номер строение" с бинарным поиском по префиксу.
+    # Каждый дом попадает в массив и с каждого слова названия улицы, чтобы "жукова"
+    # находило "ул. Маршала Жукова". Массив перестраивается при изменении справочника адресов.
+    def __init__(self, source: AddressIndex):
+        super().__init__(source)
+
+        self._keys: List[str] = []
+        self._ids: List[int] = []
+
+    def _entries(self, record: HouseRecord) -> List[Tuple[str, int]]:
+        words = normalize_street(record.street).split()
+        tail = " ".join(part for part in (normalize_search(record.number), normalize_search(record.building)) if part)
+
+        return [(" ".join(words[start:] + [tail]), record.id) for start in range(len(words))]
+
+    def _build(self, records: List[HouseRecord]) -> Tuple[List[str], List[int]]:
+        entries = [entry for record in records for entry in self._entries(record)]
+        entries.sort(key=itemgetter(0))
+
+        return [key for key, _ in entries], [house_id for _, house_id in entries]
+
+    def _swap(self, state: Tuple[List[str], List[int]]) -> None:
+        self._keys, self._ids = state
+
+    def search(self, query: str, limit: int) -> List[HouseRecord]:
+        self.refresh()
+
+        prefix = normalize_street(query)
+        if not prefix:
+            return []
+
+        found = []
+        seen = set()
+        position = bisect_left(self._keys, prefix)
+
+        while position < len(self._keys) and len(found) < limit and self._keys[position].startswith(prefix):
+            house_id = self._ids[position]
+            position += 1
+
+            record = self.source.get_by_id(house_id)
+            if record is None or house_id in seen:
+                continue
+
+            seen.add(house_id)
+            found.append(record)
+
+        return found
+
+
+autocomplete_index = AutocompleteIndex(address_index)
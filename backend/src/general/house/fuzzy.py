@@ -0,0 +1,168 @@
+from collections import Counter, defaultdict
+from itertools import chain, groupby
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.general.house.autocomplete import normalize_search, normalize_street
+from src.general.house.index import AddressIndex, DerivedIndex, HouseRecord, address_index
+
+
+def trigrams(text: str) -> Set[str]:
+    # Как в pg_trgm: каждое слово дополняется двумя пробелами слева и одним справа
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def normalize_number(value: Optional[str]) -> str:
+    # "26 Б" и "26б" - один и тот же номер
+    return normalize_search(value).replace(" ", "")
+
+
+class FuzzyAddressIndex(DerivedIndex):
+    # Нечеткий поиск улицы по триграммам среди различных названий улиц справочника.
+    # Номер дома и строение опечаток не прощают: иначе легко подставить соседний дом.
+    # Сходство - доля общих триграмм (как similarity в pg_trgm) по названию без типа улицы;
+    # при равенстве выше улица, у которой совпадает и тип ("ул. Ленина" против "пр. Ленина").
+    # Индекс перестраивается при изменении справочника адресов.
+    def __init__(self, source: AddressIndex):
+        super().__init__(source)
+
+        self._streets: List[str] = []
+        self._sizes: List[int] = []
+        self._full_grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._houses: List[Dict[str, List[HouseRecord]]] = []
+
+    def _build(self, records: List[HouseRecord]) -> Tuple[Any, ...]:
+        positions: Dict[str, int] = {}
+        streets: List[str] = []
+        houses: List[Dict[str, List[HouseRecord]]] = []
+
+        for record in records:
+            street = normalize_search(record.street)
+            position = positions.get(street)
+
+            if position is None:
+                position = positions[street] = len(streets)
+                streets.append(street)
+                houses.append(defaultdict(list))
+
+            houses[position][normalize_number(record.number)].append(record)
+
+        for by_number in houses:
+            for records in by_number.values():
+                records.sort(key=lambda record: record.id)
+
+        postings = defaultdict(list)
+        sizes = []
+        for position, street in enumerate(streets):
+            grams = trigrams(normalize_street(street))
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+
+        return streets, sizes, [trigrams(street) for street in streets], dict(postings), houses
+
+    def _swap(self, state: Tuple[Any, ...]) -> None:
+        self._streets, self._sizes, self._full_grams, self._postings, self._houses = state
+
+    def similar_streets(self, street: str, threshold: float) -> List[Tuple[float, float, int]]:
+        # Улицы со сходством не ниже порога: тройки (сходство, сходство с типом улицы, позиция)
+        grams = trigrams(normalize_street(street))
+        if not grams:
+            return []
+
+        postings = self._postings
+        shared = Counter(chain.from_iterable(postings[gram] for gram in grams if gram in postings))
+
+        # Сходство count / (|q| + |c| - count) не меньше порога только при count >= t * |q| / (1 + t):
+        # улицы, у которых с запросом общая лишь пара частых триграмм, отсекаются без деления
+        size = len(grams)
+        sizes = self._sizes
+        min_count = threshold * size / (1 + threshold)
+
+        scored = []
+        for position, count in shared.items():
+            if count >= min_count:
+                score = count / (size + sizes[position] - count)
+                if score >= threshold:
+                    scored.append((score, position))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        # Сходство с учетом типа улицы нужно только для упорядочивания равных оценок
+        full_grams = None
+        result = []
+        for score, group in groupby(scored, key=lambda item: item[0]):
+            group = [position for _, position in group]
+
+            if len(group) == 1:
+                result.append((score, 0.0, group[0]))
+                continue
+
+            full_grams = full_grams or trigrams(normalize_search(street))
+            ranked = []
+            for position in group:
+                candidate = self._full_grams[position]
+                ranked.append((score, len(full_grams & candidate) / len(full_grams | candidate), position))
+            ranked.sort(key=lambda item: (-item[1], item[2]))
+            result.extend(ranked)
+
+        return result
+
+    def _candidates(self, street: str, building: Optional[str], number: str, threshold: float):
+        self.refresh()
+
+        number = normalize_number(number)
+        building = normalize_number(building)
+
+        for score, full_score, position in self.similar_streets(street, threshold):
+            for record in self._houses[position].get(number, ()):
+                if building and normalize_number(record.building) != building:
+                    continue
+                # До окончания перестроения индекс может держать измененный или удаленный дом
+                if self.source.get_by_id(record.id) != record:
+                    continue
+                yield score, full_score, position, record
+
+    def match(self,
+              street: str,
+              building: Optional[str],
+              number: str,
+              threshold: float,
+              limit: int) -> List[Tuple[float, HouseRecord]]:
+        # Дома-кандидаты в порядке убывания сходства улицы: пары (сходство, дом)
+        found = []
+
+        for score, _, _, record in self._candidates(street, building, number, threshold):
+            found.append((round(score, 3), record))
+            if len(found) >= limit:
+                break
+
+        return found
+
+    def resolve(self,
+                street: str,
+                building: Optional[str],
+                number: str,
+                threshold: float) -> Optional[Tuple[float, HouseRecord]]:
+        # Лучший кандидат, только если улица определилась однозначно: при равных оценках
+        # разных улиц адрес не угадываем. Без строения, как и при точном поиске, берется первый дом
+        best = None
+
+        for score, full_score, position, record in self._candidates(street, building, number, threshold):
+            if best is None:
+                best = (score, full_score, position, record)
+                continue
+
+            if (score, full_score) != best[:2]:
+                break
+            if position != best[2]:
+                return None
+
+        return (round(best[0], 3), best[3]) if best else None
+
+
+fuzzy_index = FuzzyAddressIndex(address_index)
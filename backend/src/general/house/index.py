@@ -0,0 +1,224 @@
+import asyncio
+import logging
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from src.database import open_session, db_execute
+from src.general.house.models import House
+
+AddressKey = Tuple[str, str, str]
+
+
+@lru_cache(maxsize=65536)
+def normalize_part(value: Optional[str]) -> str:
+    # Регистр и лишние пробелы в адресе не различаем
+    return " ".join(value.split()).casefold() if value else ""
+
+
+def address_key(street: str, building: Optional[str], number: str) -> AddressKey:
+    return (normalize_part(street), normalize_part(building), normalize_part(number))
+
+
+@dataclass(frozen=True)
+class HouseRecord:
+    id: int
+    street: str
+    building: Optional[str]
+    number: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    @classmethod
+    def from_model(cls, house: House) -> "HouseRecord":
+        return cls(
+            id=house.id,
+            street=house.street,
+            building=house.building,
+            number=house.number,
+            latitude=house.latitude,
+            longitude=house.longitude
+        )
+
+
+class AddressIndex:
+    # Справочник домов в памяти процесса: адрес разрешается поиском в словаре вместо запроса к БД.
+    # Таблица домов небольшая и меняется редко, поэтому индекс целиком перечитывается
+    # при старте и периодически, а изменения через update_house применяются сразу.
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+        self.loaded = False
+        # Увеличивается при каждом изменении: производные индексы по нему понимают, что устарели
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._by_id: Dict[int, HouseRecord] = {}
+        self._by_address: Dict[AddressKey, int] = {}
+        # Если строение не указано, подходит дом с любым строением (как и в запросе к БД)
+        self._by_street_number: Dict[Tuple[str, str], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def records(self) -> Iterable[HouseRecord]:
+        return self._by_id.values()
+
+    def _insert(self, record: HouseRecord) -> None:
+        key = address_key(record.street, record.building, record.number)
+        self._by_address.setdefault(key, record.id)
+
+        ids = self._by_street_number.setdefault((key[0], key[2]), [])
+        ids.append(record.id)
+        ids.sort()
+
+        self._by_id[record.id] = record
+
+    def _delete(self, house_id: int) -> None:
+        record = self._by_id.pop(house_id, None)
+
+        if record is None:
+            return
+
+        key = address_key(record.street, record.building, record.number)
+        if self._by_address.get(key) == house_id:
+            del self._by_address[key]
+
+        ids = self._by_street_number.get((key[0], key[2]), [])
+        if house_id in ids:
+            ids.remove(house_id)
+        if not ids:
+            self._by_street_number.pop((key[0], key[2]), None)
+
+    def put(self, record: HouseRecord) -> None:
+        self._delete(record.id)
+        self._insert(record)
+        self.version += 1
+
+    def remove(self, house_id: int) -> None:
+        self._delete(house_id)
+        self.version += 1
+
+    def replace(self, records: Iterable[HouseRecord]) -> None:
+        records = list(records)
+
+        # Периодическая перезагрузка обычно ничего не меняет: тогда индекс не перестраиваем
+        if self.loaded and len(records) == len(self._by_id) and all(self._by_id.get(r.id) == r for r in records):
+            return
+
+        index = AddressIndex()
+        for record in records:
+            index._insert(record)
+
+        self._by_id = index._by_id
+        self._by_address = index._by_address
+        self._by_street_number = index._by_street_number
+        self.version += 1
+        self.loaded = True
+
+    def get_by_id(self, house_id: int) -> Optional[HouseRecord]:
+        return self._by_id.get(house_id)
+
+    def get(self, street: str, building: Optional[str], number: str) -> Optional[HouseRecord]:
+        key = address_key(street, building, number)
+
+        if key[1]:
+            house_id = self._by_address.get(key)
+        else:
+            ids = self._by_street_number.get((key[0], key[2]))
+            house_id = ids[0] if ids else None
+
+        if house_id is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._by_id[house_id]
+
+    async def refresh(self) -> int:
+        async with open_session() as db:
+            result = await db_execute(db, select(House))
+            records = [HouseRecord.from_model(house) for house in result.scalars().all()]
+
+        self.replace(records)
+        return len(records)
+
+    async def load(self) -> None:
+        try:
+            count = await self.refresh()
+            self.logger.info("(Address index) Loaded %s houses", count)
+        except Exception as e:
+            self.logger.error("(Address index) Error loading houses: %s", e)
+
+    async def run_refresh(self, interval: float) -> None:
+        # Дома, измененные другими воркерами, попадают в индекс не позже чем через interval секунд
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.logger.error("(Address index) Error syncing houses: %s", e)
+
+    def snapshot(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+address_index = AddressIndex()
+
+
+class DerivedIndex:
+    # Индекс, производный от справочника адресов. Перестраивается в пуле потоков по снимку записей
+    # и подменяется целиком в цикле событий: запрос не ждет перестроения, а до его окончания
+    # работает с прежней версией индекса
+    def __init__(self, source: AddressIndex):
+        self.logger = logging.getLogger(__name__)
+
+        self.source = source
+        self._version = -1
+        self._rebuilding: Optional[asyncio.Task] = None
+
+    def _build(self, records: List[HouseRecord]) -> Any:
+        raise NotImplementedError
+
+    def _swap(self, state: Any) -> None:
+        raise NotImplementedError
+
+    async def rebuild(self) -> None:
+        version = self.source.version
+        # Снимок берется в цикле событий: справочник меняется только там
+        records = list(self.source.records())
+        state = await asyncio.to_thread(self._build, records)
+
+        self._swap(state)
+        self._version = version
+
+    async def _rebuild_logged(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception as e:
+            self.logger.error("(%s) Error rebuilding index: %s", type(self).__name__, e)
+
+    def refresh(self) -> None:
+        # Запускает перестроение, если справочник изменился; одновременно идет не больше одного
+        if self._version == self.source.version:
+            return
+        if self._rebuilding is not None and not self._rebuilding.done():
+            return
+        self._rebuilding = asyncio.get_running_loop().create_task(self._rebuild_logged())
+
+    async def ready(self) -> None:
+        # Первое построение дожидаемся: пустой индекс ничего бы не нашел
+        if self._version >= 0:
+            return
+        self.refresh()
+        if self._rebuilding is not None:
+            await asyncio.shield(self._rebuilding)
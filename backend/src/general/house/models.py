@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Float
 from src.database import Base
 
 class House(Base):
@@ -7,4 +7,6 @@ class House(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, index=True, nullable=False)
     number = Column(String, nullable=False, index=True)
     building = Column(String, index=True)
-    street = Column(String, nullable=False, index=True)
\ No newline at end of file
+    street = Column(String, nullable=False, index=True)
+    latitude = Column(Float)
+    longitude = Column(Float)
\ No newline at end of file
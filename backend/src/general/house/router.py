@@ -1,23 +1,120 @@
 import logging
-import jwt
 
-from sqlalchemy.orm import Session
-from src.database import get_db
+from src.database import get_db, DBSession
 
-from src.config import oauth2_scheme, SWAGGER_GROUPS
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from src.config import SWAGGER_GROUPS, HOUSE_AUTOCOMPLETE_LIMIT, HOUSE_AUTOCOMPLETE_LIMIT_MAX, ADDRESS_FUZZY_THRESHOLD
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from src.general.house.service import HouseService
-from src.general.auth.service.auth import AuthService
+from src.general.house.index import address_index
+from src.general.house.autocomplete import autocomplete_index
+from src.general.house.fuzzy import fuzzy_index
+from src.general.auth.dependency import get_current_user
+from src.general.auth.schema.current_user import CurrentUserSchema
 from src.general.house.schema.house import HouseSchema
+from src.general.house.schema.house_match import HouseMatchSchema
 
 from src.helper.error.schema import ErrorSchema
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 house_router = APIRouter(prefix="/house")
 
+@house_router.get(
+    "/autocomplete",
+    tags=[SWAGGER_GROUPS["house"]],
+    response_model=list[HouseSchema],
+    responses={
+        200: {
+            "model": list[HouseSchema]
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403:{
+            "model": ErrorSchema
+        },
+        500:{
+            "model": ErrorSchema
+        }
+    }
+)
+async def autocomplete_houses(q: str = Query(..., min_length=1, max_length=200),
+                              limit: int = Query(HOUSE_AUTOCOMPLETE_LIMIT, ge=1, le=HOUSE_AUTOCOMPLETE_LIMIT_MAX),
+                              current_user: CurrentUserSchema = Depends(get_current_user)
+                              ):
+    try:
+        if not address_index.loaded:
+            await address_index.load()
+        await autocomplete_index.ready()
+
+        return [
+            HouseSchema(
+                id = house.id,
+                street = house.street,
+                building = house.building,
+                number = house.number,
+                latitude = house.latitude,
+                longitude = house.longitude
+            )
+            for house in autocomplete_index.search(q, limit)
+        ]
+    except Exception as e:
+        logger.error("(Autocomplete houses) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@house_router.get(
+    "/match",
+    tags=[SWAGGER_GROUPS["house"]],
+    response_model=list[HouseMatchSchema],
+    responses={
+        200: {
+            "model": list[HouseMatchSchema]
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403:{
+            "model": ErrorSchema
+        },
+        500:{
+            "model": ErrorSchema
+        }
+    }
+)
+async def match_houses(street: str = Query(..., min_length=1, max_length=200),
+                       number: str = Query(..., min_length=1, max_length=20),
+                       building: Optional[str] = Query(None, max_length=20),
+                       threshold: float = Query(ADDRESS_FUZZY_THRESHOLD, ge=0, le=1),
+                       limit: int = Query(HOUSE_AUTOCOMPLETE_LIMIT, ge=1, le=HOUSE_AUTOCOMPLETE_LIMIT_MAX),
+                       current_user: CurrentUserSchema = Depends(get_current_user)
+                       ):
+    try:
+        if not address_index.loaded:
+            await address_index.load()
+        await fuzzy_index.ready()
+
+        return [
+            HouseMatchSchema(
+                house=HouseSchema(
+                    id = house.id,
+                    street = house.street,
+                    building = house.building,
+                    number = house.number,
+                    latitude = house.latitude,
+                    longitude = house.longitude
+                ),
+                score=score
+            )
+            for score, house in fuzzy_index.match(street, building, number, threshold, limit)
+        ]
+    except Exception as e:
+        logger.error("(Match houses) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @house_router.get(
     "/{house_id}",
     tags=[SWAGGER_GROUPS["house"]],
@@ -41,37 +138,31 @@ house_router = APIRouter(prefix="/house")
     }
 )
 async def get_house_by_id(house_id: int,
-                          db: Session = Depends(get_db),
-                          access_token: str = Depends(oauth2_scheme),
-                          auth_service: AuthService = Depends(AuthService),
+                          db: DBSession = Depends(get_db),
+                          current_user: CurrentUserSchema = Depends(get_current_user),
                           house_service: HouseService = Depends(HouseService)
                           ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get house find by id) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         house = await house_service.get_house_by_id(db, house_id)
 
         if not house:
-            logger.warning(f"(Get house find by id) House not found: {house.id}")
+            logger.warning("(Get house find by id) House not found: %s", house_id)
             raise HTTPException(status_code=404, detail="House not found")
 
-        logger.info(f"(Get house find by id) House successful found: {house.id}")
+        logger.info("(Get house find by id) House successful found: %s", house.id)
 
         return HouseSchema(
             id = house.id,
             street = house.street,
             building = house.building,
-            number = house.number
+            number = house.number,
+            latitude = house.latitude,
+            longitude = house.longitude
         )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get house find by id) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get house find by id) Error: {e}")
+        logger.error("(Get house find by id) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -95,20 +186,15 @@ async def get_house_by_id(house_id: int,
         }
     }
 )
-async def get_houses(access_token: str = Depends(oauth2_scheme),
-                     db: Session = Depends(get_db),
-                     auth_service: AuthService = Depends(AuthService),
+async def get_houses(current_user: CurrentUserSchema = Depends(get_current_user),
+                     db: DBSession = Depends(get_db),
                      house_service: HouseService = Depends(HouseService)
                      ):
     try:
 
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get houses) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         houses = await house_service.get_houses(db)
 
-        logger.info(f"(Get houses) Successful get houses")
+        logger.info("(Get houses) Successful get houses")
 
         houses_schema = []
 
@@ -118,16 +204,15 @@ async def get_houses(access_token: str = Depends(oauth2_scheme),
                     id = house.id,
                     street = house.street,
                     building = house.building,
-                    number = house.number
+                    number = house.number,
+                    latitude = house.latitude,
+                    longitude = house.longitude
                 )
             )
 
         return houses_schema
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get houses) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get houses) Error: {e}")
+        logger.error("(Get houses) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
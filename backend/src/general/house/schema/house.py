@@ -5,4 +5,6 @@ class HouseSchema(BaseModel):
     id: int = Field(..., description="ID дома")
     street: str = Field(..., description="Улица")
     building: Optional[str] = Field(..., description="Строение")
-    number: str = Field(..., description="Номер дома")
\ No newline at end of file
+    number: str = Field(..., description="Номер дома")
+    latitude: Optional[float] = Field(None, description="Широта")
+    longitude: Optional[float] = Field(None, description="Долгота")
\ No newline at end of file
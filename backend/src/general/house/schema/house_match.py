@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+from src.general.house.schema.house import HouseSchema
+
+class HouseMatchSchema(BaseModel):
+    house: HouseSchema = Field(..., description="Дом")
+    score: float = Field(..., description="Сходство названия улицы, от 0 до 1")
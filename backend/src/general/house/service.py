@@ -1,97 +1,139 @@
 import logging
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+from src.database import DBSession, db_execute, db_commit, db_refresh
 from src.general.house.models import House
+from src.config import ADDRESS_FUZZY_MATCH, ADDRESS_FUZZY_THRESHOLD
+from src.general.house.index import HouseRecord, address_index
+from src.general.house.fuzzy import fuzzy_index
 
 
 class HouseService:
     def __init__(self):
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    async def get_house_by_id(self, db: Session, house_id: int) -> Optional[House]:
+    async def get_house_by_id(self, db: DBSession, house_id: int) -> Optional[House]:
         try:
-            house = db.query(House).filter(House.id == house_id).first()
+            result = await db_execute(db, select(House).where(House.id == house_id))
+            house = result.scalars().first()
 
             if house:
-                self.logger.info(f"(Get house by ID) Found house with ID {house_id}")
+                self.logger.info("(Get house by ID) Found house with ID %s", house_id)
             else:
-                self.logger.info(f"(Get house by ID) No house found with ID {house_id}")
+                self.logger.info("(Get house by ID) No house found with ID %s", house_id)
 
             return house
         except Exception as e:
-            self.logger.error(f"(Get house by ID) Error: {e}")
+            self.logger.error("(Get house by ID) Error: %s", e)
             raise
 
-    async def get_houses(self, db: Session) -> List[House]:
+    async def get_houses(self, db: DBSession) -> List[House]:
         try:
-            houses = db.query(House).all()
-            self.logger.info(f"(Get houses) Retrieved {len(houses)} houses")
+            result = await db_execute(db, select(House))
+            houses = result.scalars().all()
+            self.logger.info("(Get houses) Retrieved %s houses", len(houses))
             return houses
         except Exception as e:
-            self.logger.error(f"(Get houses) Error: {e}")
+            self.logger.error("(Get houses) Error: %s", e)
             raise
 
-    async def update_house(self, db: Session, house_id: int, number: str, building: Optional[str], street: str) -> Optional[House]:
+    async def update_house(self, db: DBSession, house_id: int, number: str, building: Optional[str], street: str) -> Optional[House]:
         try:
-            house = db.query(House).filter(House.id == house_id).first()
+            result = await db_execute(db, select(House).where(House.id == house_id))
+            house = result.scalars().first()
 
             if not house:
-                self.logger.info(f"(Update house) No house found with ID {house_id}")
+                self.logger.info("(Update house) No house found with ID %s", house_id)
                 return None
 
             if house.number != number or house.building != building or house.street != street:
                 house.number = number
                 house.building = building
                 house.street = street
-                db.commit()
-                db.refresh(house)
-                self.logger.info(f"(Update house) Updated house with ID {house_id}")
+                await db_commit(db)
+                await db_refresh(db, house)
+                self.logger.info("(Update house) Updated house with ID %s", house_id)
             else:
-                self.logger.info(f"(Update house) No changes detected for house with ID {house_id}")
+                self.logger.info("(Update house) No changes detected for house with ID %s", house_id)
 
             house.number = number
             house.building = building
             house.street = street
 
-            db.commit()
-            db.refresh(house)
+            await db_commit(db)
+            await db_refresh(db, house)
+
+            self.logger.info("(Update house) Updated house with ID %s", house_id)
 
-            self.logger.info(f"(Update house) Updated house with ID {house_id}")
+            address_index.put(HouseRecord.from_model(house))
 
             return house
         except Exception as e:
-            self.logger.error(f"(Update house) Error: {e}")
+            self.logger.error("(Update house) Error: %s", e)
             raise
 
-    async def get_houses_by_street(self, db: Session, street: str) -> List[House]:
+    async def get_houses_by_street(self, db: DBSession, street: str) -> List[House]:
         try:
-            houses = db.query(House).filter(House.street == street).all()
-            self.logger.info(f"(Get houses by street) Retrieved {len(houses)} houses on street {street}")
+            result = await db_execute(db, select(House).where(House.street == street))
+            houses = result.scalars().all()
+            self.logger.info("(Get houses by street) Retrieved %s houses on street %s", len(houses), street)
             return houses
         except Exception as e:
-            self.logger.error(f"(Get houses by street) Error: {e}")
+            self.logger.error("(Get houses by street) Error: %s", e)
             raise
 
-    async def get_house_id(self, db: Session, street: str, building: Optional[str], number: str) -> Optional[int]:
+    async def get_house(self, db: DBSession, street: str, building: Optional[str], number: str) -> Optional[HouseRecord]:
+        if address_index.loaded:
+            record = address_index.get(street, building, number)
+            if record:
+                return record
+
+        # Промах индекса: дом мог быть добавлен другим процессом после последней загрузки
         try:
-            query = db.query(House).filter(House.street == street, House.number == number)
+            query = select(House).where(House.street == street, House.number == number)
 
             if building:
-                query = query.filter(House.building == building)
+                query = query.where(House.building == building)
 
-            house = query.first()
+            result = await db_execute(db, query)
+            house = result.scalars().first()
 
-            if house:
-                self.logger.info(
-                    f"(Get house ID) Found house with ID {house.id} for street '{street}', building '{building}', and number '{number}'")
-                return house.id
-            else:
+            if not house:
                 self.logger.info(
-                    f"(Get house ID) No house found for street '{street}', building '{building}', and number '{number}'")
-                return None
+                    "(Get house) No house found for street '%s', building '%s', and number '%s'",
+                    street, building, number)
+                return self.get_house_fuzzy(street, building, number)
 
+            self.logger.info(
+                "(Get house) Found house with ID %s for street '%s', building '%s', and number '%s'",
+                house.id, street, building, number)
+
+            record = HouseRecord.from_model(house)
+            if address_index.loaded:
+                address_index.put(record)
+
+            return record
         except Exception as e:
-            self.logger.error(f"(Get house ID) Error: {e}")
-            raise
\ No newline at end of file
+            self.logger.error("(Get house) Error: %s", e)
+            raise
+
+    def get_house_fuzzy(self, street: str, building: Optional[str], number: str) -> Optional[HouseRecord]:
+        if not ADDRESS_FUZZY_MATCH or not address_index.loaded:
+            return None
+
+        found = fuzzy_index.resolve(street, building, number, ADDRESS_FUZZY_THRESHOLD)
+
+        if not found:
+            return None
+
+        score, record = found
+        self.logger.info(
+            "(Get house) Fuzzy matched '%s', '%s', '%s' to house with ID %s (score %s)",
+            street, building, number, record.id, score)
+        return record
+
+    async def get_house_id(self, db: DBSession, street: str, building: Optional[str], number: str) -> Optional[int]:
+        house = await self.get_house(db, street, building, number)
+        return house.id if house else None
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from src.config import DB_ASYNC, LOCATION_BUFFER_MAX, LOCATION_FLUSH_BATCH
+from src.database import SessionLocal, open_session, db_execute, db_commit
+from src.helper.time.utc import utc_now
+from src.general.dispatch.engine import dispatch_engine
+from src.general.driver.models import Driver
+from src.helper.metrics.histogram import Histogram
+
+Position = Tuple[float, float, datetime]
+
+
+class LocationBuffer:
+    # Принятые координаты сразу попадают в пространственный индекс диспетчеризации,
+    # а в БД уходят пачками: между сбросами от каждого водителя хранится только последняя точка.
+    # Число водителей, ожидающих сброса, ограничено: при переполнении пачки отклоняются целиком.
+    def __init__(self, max_pending: int, flush_batch: int):
+        self.logger = logging.getLogger(__name__)
+
+        self.max_pending = max_pending
+        self.flush_batch = flush_batch
+
+        self._pending: Dict[int, Position] = {}
+        self._last_seen: Dict[int, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+
+        self.received = 0
+        self.accepted = 0
+        self.dropped_overload = 0
+        self.dropped_stale = 0
+        self.dropped_unknown = 0
+        self.flushed = 0
+        self.flush_errors = 0
+        self.flush_time = Histogram()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    def offer(self, driver_id: int, latitude: float, longitude: float, timestamp: Optional[datetime] = None) -> bool:
+        self.received += 1
+        now = utc_now()
+
+        if timestamp is None:
+            timestamp = now
+        else:
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            # Точка "из будущего" иначе отбрасывала бы все последующие как устаревшие
+            timestamp = min(timestamp, now)
+
+        last_seen = self._last_seen.get(driver_id)
+        if last_seen is not None and timestamp <= last_seen:
+            self.dropped_stale += 1
+            return False
+
+        if driver_id not in self._pending and self.is_full():
+            self.dropped_overload += 1
+            return False
+
+        if not dispatch_engine.set_position(driver_id, latitude, longitude):
+            # Водитель удален из диспетчеризации: его состояние в буфере больше не нужно
+            self.forget(driver_id)
+            self.dropped_unknown += 1
+            return False
+
+        self._last_seen[driver_id] = timestamp
+        self._pending[driver_id] = (latitude, longitude, timestamp)
+        self.accepted += 1
+        return True
+
+    def reject(self, count: int) -> None:
+        self.received += count
+        self.dropped_overload += count
+
+    def forget(self, driver_id: int) -> None:
+        self._pending.pop(driver_id, None)
+        self._last_seen.pop(driver_id, None)
+
+    def _write_sync(self, rows: List[dict]) -> None:
+        with SessionLocal() as db:
+            for start in range(0, len(rows), self.flush_batch):
+                db.execute(update(Driver), rows[start:start + self.flush_batch])
+            db.commit()
+
+    async def _write(self, rows: List[dict]) -> None:
+        if not DB_ASYNC:
+            # Синхронная сессия блокирует поток, поэтому пишем вне цикла событий
+            await asyncio.to_thread(self._write_sync, rows)
+            return
+
+        async with open_session() as db:
+            for start in range(0, len(rows), self.flush_batch):
+                await db_execute(db, update(Driver), rows[start:start + self.flush_batch])
+            await db_commit(db)
+
+    def _restore(self, batch: Dict[int, Position]) -> None:
+        # Возвращаем точки в буфер, не затирая пришедшие за время записи более свежие
+        for driver_id, position in batch.items():
+            self._pending.setdefault(driver_id, position)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            # Массовый UPDATE по первичному ключу: одна подготовленная команда на пачку строк
+            rows = [
+                {"id": driver_id, "latitude": latitude, "longitude": longitude, "location_updated_at": timestamp}
+                for driver_id, (latitude, longitude, timestamp) in batch.items()
+            ]
+
+            started = time.perf_counter()
+            try:
+                await self._write(rows)
+            except asyncio.CancelledError:
+                self._restore(batch)
+                raise
+            except Exception as e:
+                self.flush_errors += 1
+                self._restore(batch)
+                self.logger.error("(Location flush) Error writing %s positions: %s", len(rows), e)
+                return 0
+            finally:
+                self.flush_time.observe(time.perf_counter() - started)
+
+            self.flushed += len(rows)
+            return len(rows)
+
+    async def run_flush(self, interval: float) -> None:
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "received": self.received,
+            "accepted": self.accepted,
+            "dropped_overload": self.dropped_overload,
+            "dropped_stale": self.dropped_stale,
+            "dropped_unknown": self.dropped_unknown,
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+            "flush_time": self.flush_time.snapshot()
+        }
+
+
+location_buffer = LocationBuffer(LOCATION_BUFFER_MAX, LOCATION_FLUSH_BATCH)
@@ -0,0 +1,72 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.config import SWAGGER_GROUPS, LOCATION_FLUSH_SECONDS
+from src.database import get_db, DBSession
+from src.general.auth.dependency import get_current_user, is_admin
+from src.general.auth.schema.current_user import CurrentUserSchema
+from src.general.driver.service import DriverService
+from src.general.location.buffer import location_buffer
+from src.general.location.schema.location_batch import LocationBatchSchema, LocationBatchResultSchema
+from src.helper.error.schema import ErrorSchema
+
+logger = logging.getLogger(__name__)
+
+location_router = APIRouter(prefix="/location")
+
+@location_router.post(
+    "/batch/",
+    tags=[SWAGGER_GROUPS["location"]],
+    response_model=LocationBatchResultSchema,
+    responses={
+        200: {
+            "model": LocationBatchResultSchema
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        503: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        },
+    }
+)
+async def ingest_locations(batch: LocationBatchSchema,
+                           db: DBSession = Depends(get_db),
+                           current_user: CurrentUserSchema = Depends(get_current_user),
+                           driver_service: DriverService = Depends(DriverService)
+                           ):
+    try:
+        # Водитель передает только свои координаты; пачки по многим водителям - только от администратора
+        if not is_admin(current_user):
+            driver_id = await driver_service.get_driver_id_by_user_id(db, current_user.id)
+            if driver_id is None or any(ping.driver_id != driver_id for ping in batch.pings):
+                logger.warning("(Ingest locations) User %s sent positions of another driver", current_user.id)
+                raise HTTPException(status_code=403, detail="Not allowed to send positions of this driver")
+
+        if location_buffer.is_full():
+            location_buffer.reject(len(batch.pings))
+            logger.warning("(Ingest locations) Buffer is full, batch of %s rejected", len(batch.pings))
+            raise HTTPException(
+                status_code=503,
+                detail="Location buffer is full",
+                headers={"Retry-After": str(max(1, round(LOCATION_FLUSH_SECONDS)))}
+            )
+
+        accepted = 0
+        for ping in batch.pings:
+            if location_buffer.offer(ping.driver_id, ping.latitude, ping.longitude, ping.timestamp):
+                accepted += 1
+
+        return LocationBatchResultSchema(accepted=accepted, dropped=len(batch.pings) - accepted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Ingest locations) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,13 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from src.config import LOCATION_BATCH_MAX
+from src.general.location.schema.location_ping import LocationPingSchema
+
+class LocationBatchSchema(BaseModel):
+    pings: List[LocationPingSchema] = Field(..., max_length=LOCATION_BATCH_MAX, description="Координаты водителей")
+
+class LocationBatchResultSchema(BaseModel):
+    accepted: int = Field(..., description="Принято точек")
+    dropped: int = Field(..., description="Отброшено точек: устаревшие, неизвестные водители, переполнение")
@@ -0,0 +1,10 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+class LocationPingSchema(BaseModel):
+    driver_id: int = Field(..., description="ID водителя")
+    latitude: float = Field(..., ge=-90, le=90, description="Широта")
+    longitude: float = Field(..., ge=-180, le=180, description="Долгота")
+    timestamp: Optional[datetime] = Field(None, description="Время замера, по умолчанию время приема")
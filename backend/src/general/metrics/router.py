@@ -0,0 +1,146 @@
+import logging
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.config import SWAGGER_GROUPS
+from src.general.auth.service.hashing import password_hasher
+from src.general.house.index import address_index
+from src.general.location.buffer import location_buffer
+from src.general.order.batcher import order_batcher
+from src.general.metrics.schema.address_index import AddressIndexStatsSchema
+from src.general.metrics.schema.location import LocationIngestStatsSchema
+from src.general.metrics.schema.order_batch import OrderBatchStatsSchema
+from src.general.metrics.schema.password_hasher import PasswordHasherStatsSchema
+from src.general.metrics.schema.pool import PoolStatsSchema
+from src.helper.error.schema import ErrorSchema
+from src.helper.metrics.pool import pool_snapshot
+from src.helper.metrics.prometheus import registry
+
+logger = logging.getLogger(__name__)
+
+metrics_router = APIRouter(prefix="/metrics")
+
+@metrics_router.get(
+    "",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_class=PlainTextResponse,
+    responses={
+        200: {
+            "content": {"text/plain": {}}
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_prometheus_metrics():
+    try:
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+    except Exception as e:
+        logger.error("(Get prometheus metrics) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get(
+    "/pool",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_model=list[PoolStatsSchema],
+    responses={
+        200: {
+            "model": list[PoolStatsSchema]
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_pool_stats():
+    try:
+        return [PoolStatsSchema(**stats) for stats in pool_snapshot()]
+    except Exception as e:
+        logger.error("(Get pool stats) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get(
+    "/password-hasher",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_model=PasswordHasherStatsSchema,
+    responses={
+        200: {
+            "model": PasswordHasherStatsSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_password_hasher_stats():
+    try:
+        return PasswordHasherStatsSchema(**password_hasher.snapshot())
+    except Exception as e:
+        logger.error("(Get password hasher stats) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get(
+    "/location",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_model=LocationIngestStatsSchema,
+    responses={
+        200: {
+            "model": LocationIngestStatsSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_location_stats():
+    try:
+        return LocationIngestStatsSchema(**location_buffer.snapshot())
+    except Exception as e:
+        logger.error("(Get location stats) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get(
+    "/address-index",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_model=AddressIndexStatsSchema,
+    responses={
+        200: {
+            "model": AddressIndexStatsSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_address_index_stats():
+    try:
+        return AddressIndexStatsSchema(**address_index.snapshot())
+    except Exception as e:
+        logger.error("(Get address index stats) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@metrics_router.get(
+    "/order-batch",
+    tags=[SWAGGER_GROUPS["metrics"]],
+    response_model=OrderBatchStatsSchema,
+    responses={
+        200: {
+            "model": OrderBatchStatsSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_order_batch_stats():
+    try:
+        return OrderBatchStatsSchema(**order_batcher.snapshot())
+    except Exception as e:
+        logger.error("(Get order batch stats) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+class AddressIndexStatsSchema(BaseModel):
+    loaded: bool = Field(..., description="Справочник адресов загружен")
+    size: int = Field(..., description="Домов в справочнике")
+    hits: int = Field(..., description="Адресов найдено в справочнике")
+    misses: int = Field(..., description="Адресов не найдено в справочнике")
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+from src.general.metrics.schema.pool import HistogramSchema
+
+class LocationIngestStatsSchema(BaseModel):
+    max_pending: int = Field(..., description="Предел водителей, ожидающих записи в БД")
+    pending: int = Field(..., description="Водителей, ожидающих записи в БД")
+    received: int = Field(..., description="Получено точек")
+    accepted: int = Field(..., description="Принято точек")
+    dropped_overload: int = Field(..., description="Отброшено из-за переполнения буфера")
+    dropped_stale: int = Field(..., description="Отброшено как устаревшие")
+    dropped_unknown: int = Field(..., description="Отброшено для неизвестных водителей")
+    flushed: int = Field(..., description="Записано позиций в БД")
+    flush_errors: int = Field(..., description="Неудачных сбросов в БД")
+    flush_time: HistogramSchema = Field(..., description="Время сброса пачки в БД")
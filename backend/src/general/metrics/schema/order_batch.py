@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+from src.general.metrics.schema.pool import HistogramSchema
+
+class OrderBatchStatsSchema(BaseModel):
+    enabled: bool = Field(..., description="Групповой коммит заказов включен")
+    window_ms: float = Field(..., description="Окно сбора пачки, мс")
+    max_size: int = Field(..., description="Максимальный размер пачки")
+    pending: int = Field(..., description="Заказов, ожидающих записи")
+    batches: int = Field(..., description="Записано пачек")
+    orders: int = Field(..., description="Создано заказов")
+    fallbacks: int = Field(..., description="Пачек, переписанных по одному заказу после ошибки")
+    flush_time: HistogramSchema = Field(..., description="Время записи пачки")
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+from src.general.metrics.schema.pool import HistogramSchema
+
+class PasswordHasherStatsSchema(BaseModel):
+    workers: int = Field(..., description="Потоков в пуле bcrypt")
+    max_pending: int = Field(..., description="Предел задач в работе и очереди")
+    pending: int = Field(..., description="Задач в работе и очереди сейчас")
+    completed: int = Field(..., description="Успешно выполнено задач")
+    failed: int = Field(..., description="Задач, завершившихся ошибкой или отменой")
+    rejected: int = Field(..., description="Отклонено из-за переполнения очереди")
+    latency: HistogramSchema = Field(..., description="Время хеширования/проверки с учетом ожидания в очереди")
@@ -0,0 +1,20 @@
+from typing import Dict
+
+from pydantic import BaseModel, Field
+
+class HistogramSchema(BaseModel):
+    buckets: Dict[str, int] = Field(..., description="Кумулятивное число наблюдений по верхним границам корзин, с")
+    count: int = Field(..., description="Число наблюдений")
+    sum: float = Field(..., description="Сумма наблюдений, с")
+
+class PoolStatsSchema(BaseModel):
+    engine: str = Field(..., description="Движок базы данных (sync/async)")
+    size: int = Field(..., description="Размер пула")
+    checked_out: int = Field(..., description="Соединений выдано")
+    idle: int = Field(..., description="Свободных соединений в пуле")
+    overflow: int = Field(..., description="Соединений сверх размера пула")
+    checkouts: int = Field(..., description="Всего выдач соединений")
+    timeouts: int = Field(..., description="Выдач, завершившихся таймаутом")
+    connects: int = Field(..., description="Открыто новых соединений")
+    invalidations: int = Field(..., description="Инвалидированных соединений")
+    checkout_wait: HistogramSchema = Field(..., description="Время ожидания соединения")
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from sqlalchemy import insert
+
+from src.config import ORDER_GROUP_COMMIT, ORDER_BATCH_WINDOW_MS, ORDER_BATCH_MAX_SIZE
+from src.database import open_session, db_execute, db_commit, db_rollback
+from src.general.driver.service import DriverService
+from src.general.order.bulk import insert_orders
+from src.general.order.models import OrderIdempotencyKey
+from src.helper.metrics.histogram import Histogram
+
+
+@dataclass
+class PendingOrder:
+    values: dict
+    idempotency_key: Optional[str]
+    future: asyncio.Future
+
+
+class OrderBatcher:
+    # Групповой коммит: заказы, пришедшие в течение окна window_ms, пишутся одной транзакцией -
+    # условные UPDATE захвата водителей и один многострочный INSERT ... RETURNING.
+    # Каждый вызывающий ждет свой результат: ID заказа или None, если водителя уже заняли.
+    # Если пачка падает целиком (например, на повторном ключе идемпотентности),
+    # заказы переписываются по одному, чтобы ошибка одного не задела остальных.
+    def __init__(self, enabled: bool, window_ms: float, max_size: int):
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_size = max_size
+
+        self._pending: List[PendingOrder] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.orders = 0
+        self.fallbacks = 0
+        self.flush_time = Histogram()
+
+    async def submit(self, values: dict, idempotency_key: Optional[str] = None) -> Optional[int]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(PendingOrder(values, idempotency_key, future))
+
+        if len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: List[PendingOrder]) -> List[Optional[int]]:
+        driver_service = DriverService()
+
+        async with open_session() as db:
+            try:
+                claimed = []
+                for item in batch:
+                    if await driver_service.claim_driver(db, item.values["driver_id"]):
+                        claimed.append(item)
+
+                order_ids = await insert_orders(db, [item.values for item in claimed])
+                ids = {id(item): order_id for item, order_id in zip(claimed, order_ids)}
+
+                keys = [
+                    {"user_id": item.values["user_id"], "key": item.idempotency_key, "order_id": ids[id(item)]}
+                    for item in claimed if item.idempotency_key
+                ]
+                if keys:
+                    await db_execute(db, insert(OrderIdempotencyKey), keys)
+
+                await db_commit(db)
+                return [ids.get(id(item)) for item in batch]
+            except Exception:
+                await db_rollback(db)
+                raise
+
+    def _resolve(self, item: PendingOrder, result: Optional[int]) -> None:
+        self.orders += result is not None
+        # Вызывающий мог уже уйти (отмена запроса): его future отменен
+        if not item.future.done():
+            item.future.set_result(result)
+
+    @staticmethod
+    def _fail(item: PendingOrder, error: BaseException) -> None:
+        if not item.future.done():
+            item.future.set_exception(error)
+
+    async def _flush(self, batch: List[PendingOrder]) -> None:
+        self.batches += 1
+        started = time.perf_counter()
+
+        try:
+            try:
+                results = await self._write(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch[0], e)
+                    return
+
+                self.fallbacks += 1
+                self.logger.warning("(Order batch) Batch of %s failed, writing one by one: %s", len(batch), e)
+
+                for item in batch:
+                    try:
+                        result = (await self._write([item]))[0]
+                    except Exception as item_error:
+                        self._fail(item, item_error)
+                    else:
+                        self._resolve(item, result)
+                return
+
+            for item, result in zip(batch, results):
+                self._resolve(item, result)
+        finally:
+            self.flush_time.observe(time.perf_counter() - started)
+            # При отмене задачи (остановка приложения) никто из вызывающих не должен ждать вечно
+            for item in batch:
+                self._fail(item, RuntimeError("Order batch was not written"))
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "orders": self.orders,
+            "fallbacks": self.fallbacks,
+            "flush_time": self.flush_time.snapshot()
+        }
+
+
+order_batcher = OrderBatcher(ORDER_GROUP_COMMIT, ORDER_BATCH_WINDOW_MS, ORDER_BATCH_MAX_SIZE)
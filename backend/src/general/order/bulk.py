@@ -0,0 +1,15 @@
+from typing import List
+
+from sqlalchemy import insert
+
+from src.database import DBSession, db_execute
+from src.general.order.models import Order
+
+
+async def insert_orders(db: DBSession, rows: List[dict]) -> List[int]:
+    # Один многострочный INSERT ... RETURNING без коммита; ID возвращаются в порядке строк
+    if not rows:
+        return []
+
+    result = await db_execute(db, insert(Order).returning(Order.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars().all())
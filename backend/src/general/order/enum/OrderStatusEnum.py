@@ -0,0 +1,8 @@
+from enum import Enum
+
+class OrderStatusEnum(str, Enum):
+    created = "created"
+    assigned = "assigned"
+    in_progress = "in_progress"
+    completed = "completed"
+    cancelled = "cancelled"
\ No newline at end of file
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+import logging
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Iterator, AsyncIterator
+
+from sqlalchemy import select
+
+from src.config import DB_ASYNC
+from src.database import SessionLocal, open_session
+from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.order.enum.ExportFormatEnum import ExportFormatEnum
+from src.general.order.models import Order
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [column.name for column in Order.__table__.columns]
+
+
+def build_export_query(user_id: Optional[int],
+                       driver_id: Optional[int],
+                       driver_class: Optional[DriverClassEnum],
+                       date_from: Optional[datetime],
+                       date_to: Optional[datetime]):
+    # Выбираются столбцы таблицы, а не ORM-объекты: без identity map память не растет
+    query = select(Order.__table__)
+
+    if user_id is not None:
+        query = query.where(Order.user_id == user_id)
+    if driver_id is not None:
+        query = query.where(Order.driver_id == driver_id)
+    if driver_class is not None:
+        query = query.where(Order.driver_class == driver_class)
+    if date_from:
+        query = query.where(Order.order_date >= date_from)
+    if date_to:
+        query = query.where(Order.order_date < date_to)
+
+    return query.order_by(Order.id)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def format_chunk(rows, export_format: ExportFormatEnum) -> str:
+    if export_format == ExportFormatEnum.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        return buffer.getvalue()
+
+    return "".join(
+        json.dumps({column: _plain(value) for column, value in zip(EXPORT_COLUMNS, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def format_header(export_format: ExportFormatEnum) -> str:
+    if export_format == ExportFormatEnum.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_COLUMNS)
+        return buffer.getvalue()
+    return ""
+
+
+# Синхронный генератор Starlette читает в пуле потоков, поэтому блокирующий курсор
+# psycopg2 не останавливает цикл событий
+def _iter_export_sync(query, export_format: ExportFormatEnum, chunk_size: int) -> Iterator[str]:
+    yield format_header(export_format)
+
+    with SessionLocal() as db:
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            yield format_chunk(rows, export_format)
+
+
+async def _iter_export_async(query, export_format: ExportFormatEnum, chunk_size: int) -> AsyncIterator[str]:
+    yield format_header(export_format)
+
+    async with open_session() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield format_chunk(rows, export_format)
+
+
+# Сессия открывается внутри генератора: сессия запроса закрывается до того,
+# как начнется отправка тела ответа
+def iter_export(query, export_format: ExportFormatEnum, chunk_size: int):
+    if DB_ASYNC:
+        return _iter_export_async(query, export_format, chunk_size)
+    return _iter_export_sync(query, export_format, chunk_size)
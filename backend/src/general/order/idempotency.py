@@ -0,0 +1,37 @@
+import asyncio
+import logging
+
+from datetime import timedelta
+
+from sqlalchemy import delete
+
+from src.config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_CACHE_TTL_SECONDS, IDEMPOTENCY_KEY_TTL_HOURS
+from src.database import DBSession, open_session, db_execute, db_commit
+from src.helper.time.utc import utc_now
+from src.general.order.models import OrderIdempotencyKey
+from src.helper.cache.ttl import TTLCache
+
+# (user_id, ключ) -> ID заказа: повторы вскоре после исходного запроса обходятся без БД
+idempotency_cache = TTLCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_CACHE_TTL_SECONDS)
+
+
+async def prune_idempotency_keys(db: DBSession) -> int:
+    expired = utc_now() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+
+    result = await db_execute(db, delete(OrderIdempotencyKey).where(OrderIdempotencyKey.created_at <= expired))
+    await db_commit(db)
+
+    return result.rowcount
+
+
+async def run_idempotency_pruning(interval: float) -> None:
+    logger = logging.getLogger(__name__)
+
+    while True:
+        try:
+            async with open_session() as db:
+                count = await prune_idempotency_keys(db)
+            logger.info("(Idempotency pruning) Deleted %s expired keys", count)
+        except Exception as e:
+            logger.error("(Idempotency pruning) Error: %s", e)
+        await asyncio.sleep(interval)
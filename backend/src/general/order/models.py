@@ -1,11 +1,20 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, func, Enum
+from sqlalchemy import Column, Integer, String, TIMESTAMP, func, Enum, Index, UniqueConstraint
+from sqlalchemy.dialects import sqlite
 from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
 
 from src.database import Base
+from src.helper.time.utc import utc_now
 
 
 class Order(Base):
     __tablename__ = "order"
+    # Составные индексы под keyset-пагинацию по (order_date, id) для общих, пользовательских и водительских списков
+    __table_args__ = (
+        Index("ix_order_order_date_id", "order_date", "id"),
+        Index("ix_order_user_id_order_date_id", "user_id", "order_date", "id"),
+        Index("ix_order_driver_id_order_date_id", "driver_id", "order_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
     user_id = Column(Integer, index=True, nullable=False)
@@ -20,4 +29,26 @@ class Order(Base):
     house_to_number = Column(String, index=True, nullable=False)
     driver_class = Column(Enum(DriverClassEnum), index=True, nullable=False)
     car = Column(String, index=True, nullable=False)
-    order_date = Column(TIMESTAMP, server_default=func.now(), index=True, nullable=False)
\ No newline at end of file
+    # Заказ создается сразу с назначенным водителем; значение created в перечислении оставлено для старых строк
+    status = Column(Enum(OrderStatusEnum), default=OrderStatusEnum.assigned, server_default=OrderStatusEnum.assigned.value, index=True, nullable=False)
+    # Время ставит база. SQLite пишет CURRENT_TIMESTAMP с точностью до секунды, поэтому там значения
+    # и параметры (курсор страницы, фильтры по дате) тоже пишутся без микросекунд, иначе строки не сравнить
+    order_date = Column(
+        TIMESTAMP().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now(), index=True, nullable=False
+    )
+
+
+class OrderIdempotencyKey(Base):
+    __tablename__ = "order_idempotency_key"
+    # Повтор запроса с тем же ключом от того же пользователя не может создать второй заказ
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_order_idempotency_key_user_id_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    key = Column(String(255), nullable=False)
+    order_id = Column(Integer, nullable=False)
+    # Наивное UTC-время из Python: очистка сравнивает его с utc_now(), а now() сервера дает местное время
+    created_at = Column(TIMESTAMP, default=utc_now, server_default=func.now(), index=True, nullable=False)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import base64
+import binascii
+
+from datetime import datetime
+from typing import Tuple
+
+
+# Курсор - непрозрачная для клиента строка с ключом (order_date, id) последнего заказа страницы
+def encode_cursor(order_date: datetime, order_id: int) -> str:
+    raw = f"{order_date.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        order_date, order_id = raw.split("|")
+        return datetime.fromisoformat(order_date), int(order_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -1,30 +1,66 @@
 import logging
-import jwt
-import random
 
-from src.database import get_db
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
 
-from src.config import oauth2_scheme, SWAGGER_GROUPS
-from fastapi import APIRouter, Depends, HTTPException
+from src.database import get_db, DBSession
+
+from src.config import (SWAGGER_GROUPS, ORDER_PAGE_SIZE, ORDER_PAGE_SIZE_MAX, ORDER_EXPORT_CHUNK_SIZE, DISPATCH_CLAIM_ATTEMPTS,
+                        ORDER_GROUP_COMMIT)
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
 
-from src.general.auth.service.user import UserService
-from src.general.driver.service import DriverService
 from src.general.house.service import HouseService
+from src.general.driver.service import DriverService
 from src.general.order.service import OrderService
-from src.general.auth.service.auth import AuthService
+from src.general.order.export import build_export_query, iter_export
+from src.general.order.enum.ExportFormatEnum import ExportFormatEnum
+from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
+from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.dispatch.engine import dispatch_engine
+from src.general.auth.dependency import get_current_user, is_admin
+from src.general.auth.schema.current_user import CurrentUserSchema
 
 
+from src.helper.bulk.schema import BulkItemResultSchema, BulkResultSchema
 from src.helper.error.schema import ErrorSchema
 from src.helper.message.schema import MessageSchema
 from src.general.order.schema.order_create import OrderCreateSchema
+from src.general.order.schema.order_batch import OrderBatchCreateSchema
 from src.general.order.schema.order_detail import OrderDetailSchema
+from src.general.order.schema.order_page import OrderPageSchema
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 order_router = APIRouter(prefix="/order")
 
+
+def to_order_detail(order) -> OrderDetailSchema:
+    return OrderDetailSchema(
+        id=order.id,
+        user_id=order.user_id,
+        driver_id=order.driver_id,
+        driver_class=order.driver_class,
+        car=order.car,
+        house_from_id=order.house_from_id,
+        house_from_street=order.house_from_street,
+        house_from_building=order.house_from_building,
+        house_from_number=order.house_from_number,
+        house_to_id=order.house_to_id,
+        house_to_street=order.house_to_street,
+        house_to_building=order.house_to_building,
+        house_to_number=order.house_to_number,
+        status=order.status,
+        order_time=order.order_date
+    )
+
+def replay_order(response: Response, order_id: int) -> MessageSchema:
+    # Повтор запроса с уже использованным ключом идемпотентности получает исходный ответ
+    response.headers["Idempotent-Replayed"] = "true"
+    return MessageSchema(messageDigest=str(order_id),
+                         description="Order successfully created"
+                         )
+
 @order_router.post(
     "/create/",
     tags=[SWAGGER_GROUPS["order"]],
@@ -51,34 +87,23 @@ order_router = APIRouter(prefix="/order")
     }
 )
 async def create_order(order_create_sch: OrderCreateSchema,
-                       access_token: str = Depends(oauth2_scheme),
-                       db: Session = Depends(get_db),
-                       auth_service: AuthService = Depends(AuthService),
+                       response: Response,
+                       idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+                       current_user: CurrentUserSchema = Depends(get_current_user),
+                       db: DBSession = Depends(get_db),
                        order_service: OrderService = Depends(OrderService),
-                       user_service: UserService = Depends(UserService),
-                       driver_service: DriverService = Depends(DriverService),
-                       house_service: HouseService = Depends(HouseService)
+                       house_service: HouseService = Depends(HouseService),
+                       driver_service: DriverService = Depends(DriverService)
                        ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Create order) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
-        token_data = await auth_service.get_data_from_access_token(access_token)
-        user = await user_service.get_user_by_id(db, token_data["sub"])
-
-        if not user:
-            logger.warning(f"(Create order) User not found with ID {token_data['sub']}")
-            raise HTTPException(status_code=404, detail="User not found")
-
-        drivers = await driver_service.get_drivers_by_class(db, order_create_sch.driver_class)
+        if idempotency_key:
+            order_id = await order_service.get_order_id_by_idempotency_key(db, current_user.id, idempotency_key)
 
-        if not drivers:
-            raise HTTPException(status_code=404, detail="No drivers available for the selected class")
-
-        driver = random.choice(drivers)
+            if order_id is not None:
+                logger.info("(Create order) Replayed order %s for idempotency key", order_id)
+                return replay_order(response, order_id)
 
-        house_from_id = await house_service.get_house_id(
+        house_from = await house_service.get_house(
             db,
             order_create_sch.house_from_street,
             order_create_sch.house_from_building,
@@ -92,30 +117,208 @@ async def create_order(order_create_sch: OrderCreateSchema,
             order_create_sch.house_to_number
         )
 
-        if not house_from_id or not house_to_id:
+        if not house_from or not house_to_id:
             raise HTTPException(status_code=400, detail="Invalid departure or arrival location")
 
-        order = await order_service.create_order(
-            db=db,
-            user_id=user.id,
-            driver_id=driver.id,
-            order_create_sch=order_create_sch,
-            house_from_id=house_from_id,
-            house_to_id=house_to_id,
-            car=driver.car
-        )
+        if not dispatch_engine.loaded:
+            await dispatch_engine.load()
+
+        driver = None
+        order_id = None
+
+        for _ in range(DISPATCH_CLAIM_ATTEMPTS):
+            driver = dispatch_engine.acquire(order_create_sch.driver_class, house_from.latitude, house_from.longitude)
+
+            if not driver:
+                break
+
+            if ORDER_GROUP_COMMIT:
+                try:
+                    order_id = await order_service.create_order_batched(
+                        user_id=current_user.id,
+                        driver_id=driver.driver_id,
+                        order_create_sch=order_create_sch,
+                        house_from_id=house_from.id,
+                        house_to_id=house_to_id,
+                        car=driver.car,
+                        idempotency_key=idempotency_key
+                    )
+                except Exception:
+                    break
+
+                if order_id is not None:
+                    break
+            elif await driver_service.claim_driver(db, driver.driver_id):
+                order = await order_service.create_order(
+                    db=db,
+                    user_id=current_user.id,
+                    driver_id=driver.driver_id,
+                    order_create_sch=order_create_sch,
+                    house_from_id=house_from.id,
+                    house_to_id=house_to_id,
+                    car=driver.car,
+                    idempotency_key=idempotency_key
+                )
+                order_id = order.id if order else None
+                break
 
-        logger.info(f"(Create order) Order successfully created {order.id}")
-        return MessageSchema(messageDigest=str(order.id),
+            # Водителя уже занял другой процесс: здесь он остается занятым до следующей сверки
+            driver = None
+
+        if not driver:
+            raise HTTPException(status_code=404, detail="No drivers available for the selected class")
+
+        if order_id is None:
+            dispatch_engine.release(driver.driver_id)
+
+            # Параллельный повтор с тем же ключом успел создать заказ первым
+            if idempotency_key:
+                order_id = await order_service.get_order_id_by_idempotency_key(db, current_user.id, idempotency_key)
+                if order_id is not None:
+                    logger.info("(Create order) Replayed concurrent order %s for idempotency key", order_id)
+                    return replay_order(response, order_id)
+
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+        logger.info("(Create order) Order successfully created %s", order_id)
+        return MessageSchema(messageDigest=str(order_id),
                              description="Order successfully created"
                              )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Create order) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Create order) Error: {e}")
+        logger.error("(Create order) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@order_router.post(
+    "/batch/",
+    tags=[SWAGGER_GROUPS["order"]],
+    response_model=BulkResultSchema,
+    responses={
+        200: {
+            "model": BulkResultSchema
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        },
+    }
+)
+async def create_orders(batch: OrderBatchCreateSchema,
+                        current_user: CurrentUserSchema = Depends(get_current_user),
+                        db: DBSession = Depends(get_db),
+                        order_service: OrderService = Depends(OrderService),
+                        house_service: HouseService = Depends(HouseService)
+                        ):
+    try:
+        items = {}
+        resolved = []
+        positions = []
+
+        for index, order_create_sch in enumerate(batch.orders):
+            house_from = await house_service.get_house(
+                db,
+                order_create_sch.house_from_street,
+                order_create_sch.house_from_building,
+                order_create_sch.house_from_number
+            )
+            house_to_id = await house_service.get_house_id(
+                db,
+                order_create_sch.house_to_street,
+                order_create_sch.house_to_building,
+                order_create_sch.house_to_number
+            )
+
+            if not house_from or not house_to_id:
+                items[index] = BulkItemResultSchema(index=index, status_code=400,
+                                                    detail="Invalid departure or arrival location")
+                continue
+
+            resolved.append((order_create_sch, house_from, house_to_id))
+            positions.append(index)
+
+        if not dispatch_engine.loaded:
+            await dispatch_engine.load()
+
+        order_ids = await order_service.create_orders_bulk(db, current_user.id, resolved)
+
+        for index, order_id in zip(positions, order_ids):
+            if order_id is None:
+                items[index] = BulkItemResultSchema(index=index, status_code=404,
+                                                    detail="No drivers available for the selected class")
+            else:
+                items[index] = BulkItemResultSchema(index=index, status_code=200, id=order_id)
+
+        created = sum(1 for order_id in order_ids if order_id is not None)
+        logger.info("(Create orders) Created %s of %s orders", created, len(batch.orders))
+        return BulkResultSchema(
+            created=created,
+            failed=len(batch.orders) - created,
+            items=[items[index] for index in range(len(batch.orders))]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Create orders) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormatEnum.ndjson: "application/x-ndjson",
+    ExportFormatEnum.csv: "text/csv"
+}
+
+@order_router.get(
+    "/export/",
+    tags=[SWAGGER_GROUPS["order"]],
+    responses={
+        200: {
+            "content": {
+                "application/x-ndjson": {},
+                "text/csv": {}
+            }
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        },
+    }
+)
+async def export_orders(export_format: ExportFormatEnum = Query(ExportFormatEnum.ndjson, alias="format"),
+                        user_id: Optional[int] = None,
+                        driver_id: Optional[int] = None,
+                        driver_class: Optional[DriverClassEnum] = None,
+                        date_from: Optional[datetime] = None,
+                        date_to: Optional[datetime] = None,
+                        current_user: CurrentUserSchema = Depends(get_current_user)
+                        ):
+    try:
+        # Все заказы выгружает только администратор, остальным доступны лишь свои
+        if not is_admin(current_user):
+            user_id = current_user.id
+
+        query = build_export_query(user_id, driver_id, driver_class, date_from, date_to)
+
+        logger.info("(Export orders) Export started by user %s in %s", current_user.id, export_format.value)
+
+        return StreamingResponse(
+            iter_export(query, export_format, ORDER_EXPORT_CHUNK_SIZE),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f"attachment; filename=orders.{export_format.value}"}
+        )
+    except Exception as e:
+        logger.error("(Export orders) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -133,62 +336,45 @@ async def create_order(order_create_sch: OrderCreateSchema,
         403: {
             "model": ErrorSchema
         },
+        404: {
+            "model": ErrorSchema
+        },
         500: {
             "model": ErrorSchema
         },
     }
 )
 async def get_order_by_id(order_id: int,
-                          db: Session = Depends(get_db),
-                          access_token: str = Depends(oauth2_scheme),
-                          auth_service: AuthService = Depends(AuthService),
+                          db: DBSession = Depends(get_db),
+                          current_user: CurrentUserSchema = Depends(get_current_user),
                           order_service: OrderService = Depends(OrderService)
                           ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get order find by id) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
         order = await order_service.get_order_by_id(db, order_id)
 
         if not order:
-            logger.warning(f"(Get order find by id) order not found: {order.id}")
-            raise HTTPException(status_code=404, detail="House not found")
-
-        logger.info(f"(Get order find by id) order successful found: {order.id}")
-
-        return OrderDetailSchema(
-            id = order.id,
-            user_id = order.user_id,
-            driver_id = order.driver_id,
-            driver_class = order.driver_class,
-            car = order.car,
-            house_from_id = order.house_from_id,
-            house_from_street = order.house_from_street,
-            house_from_building = order.house_from_building,
-            house_from_number = order.house_from_number,
-            house_to_id = order.house_to_id,
-            house_to_street = order.house_to_street,
-            house_to_building = order.house_to_building,
-            house_to_number = order.house_to_number,
-            order_time = order.order_date
-        )
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get order find by id) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
+            logger.warning("(Get order find by id) order not found: %s", order_id)
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        logger.info("(Get order find by id) order successful found: %s", order.id)
+
+        return to_order_detail(order)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"(Get order find by id) Error: {e}")
+        logger.error("(Get order find by id) Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @order_router.get(
     "/",
     tags=[SWAGGER_GROUPS["order"]],
-    response_model=list[OrderDetailSchema],
+    response_model=OrderPageSchema,
     responses={
         200: {
-            "model": list[OrderDetailSchema]
+            "model": OrderPageSchema
+        },
+        400: {
+            "model": ErrorSchema
         },
         401: {
             "model": ErrorSchema
@@ -201,48 +387,151 @@ async def get_order_by_id(order_id: int,
         },
     }
 )
-async def get_orders(db: Session = Depends(get_db),
-                     access_token: str = Depends(oauth2_scheme),
-                     auth_service: AuthService = Depends(AuthService),
+async def get_orders(limit: int = Query(ORDER_PAGE_SIZE, ge=1, le=ORDER_PAGE_SIZE_MAX),
+                     cursor: Optional[str] = None,
+                     date_from: Optional[datetime] = None,
+                     date_to: Optional[datetime] = None,
+                     db: DBSession = Depends(get_db),
+                     current_user: CurrentUserSchema = Depends(get_current_user),
                      order_service: OrderService = Depends(OrderService)
                      ):
     try:
-        if await auth_service.check_revoked(db, access_token):
-            logger.warning(f"(Get orders) Token is revoked: {access_token}")
-            raise HTTPException(status_code=403, detail="Token revoked")
-
-        orders = await order_service.get_orders(db)
-
-        logger.info(f"(Get orders) Successful get orders")
-
-        orders_schema = []
-
-        for order in orders:
-            orders_schema.append(
-                OrderDetailSchema(
-                    id=order.id,
-                    user_id=order.user_id,
-                    driver_id=order.driver_id,
-                    driver_class=order.driver_class,
-                    car=order.car,
-                    house_from_id=order.house_from_id,
-                    house_from_street=order.house_from_street,
-                    house_from_building=order.house_from_building,
-                    house_from_number=order.house_from_number,
-                    house_to_id=order.house_to_id,
-                    house_to_street=order.house_to_street,
-                    house_to_building=order.house_to_building,
-                    house_to_number=order.house_to_number,
-                    order_time=order.order_date
-                )
-            )
+        orders, next_cursor = await order_service.get_orders(db, limit, cursor, date_from, date_to)
 
-        return orders_schema
-    except jwt.PyJWTError as e:
-        logger.warning(f"(Get orders) Bad token: {e}")
-        raise HTTPException(status_code=403, detail="Bad token")
+        logger.info("(Get orders) Successful get orders")
+
+        orders_schema = [to_order_detail(order) for order in orders]
+
+        return OrderPageSchema(items=orders_schema, next_cursor=next_cursor)
     except HTTPException:
         raise
+    except ValueError as validation_error:
+        logger.warning("(Get orders) Validation error: %s", validation_error)
+        raise HTTPException(status_code=400, detail=str(validation_error))
     except Exception as e:
-        logger.error(f"(Get orders) Error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.error("(Get orders) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+async def change_order_status(order_id: int,
+                              status: OrderStatusEnum,
+                              db: DBSession,
+                              current_user: CurrentUserSchema,
+                              order_service: OrderService
+                              ) -> MessageSchema:
+    order = await order_service.get_order_by_id(db, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    # Отменить заказ может его пассажир, начать и завершить - назначенный водитель; администратор - любой заказ
+    if not is_admin(current_user):
+        if status == OrderStatusEnum.cancelled:
+            allowed = order.user_id == current_user.id
+        else:
+            allowed = await DriverService().get_driver_id_by_user_id(db, current_user.id) == order.driver_id
+        if not allowed:
+            logger.warning("(Change order status) User %s is not allowed to move order %s to %s",
+                           current_user.id, order_id, status.value)
+            raise HTTPException(status_code=403, detail="Not allowed to change this order")
+
+    driver_id = await order_service.change_status(db, order_id, status)
+
+    if driver_id is None:
+        raise HTTPException(status_code=409, detail=f"Order can not be moved to {status.value}")
+
+    if status in (OrderStatusEnum.completed, OrderStatusEnum.cancelled):
+        dispatch_engine.release(driver_id)
+
+    return MessageSchema(messageDigest=str(order_id),
+                         description=f"Order status changed to {status.value}"
+                         )
+
+
+ORDER_STATUS_RESPONSES = {
+    200: {
+        "model": MessageSchema
+    },
+    401: {
+        "model": ErrorSchema
+    },
+    403: {
+        "model": ErrorSchema
+    },
+    404: {
+        "model": ErrorSchema
+    },
+    409: {
+        "model": ErrorSchema
+    },
+    500: {
+        "model": ErrorSchema
+    },
+}
+
+@order_router.post(
+    "/{order_id}/start/",
+    tags=[SWAGGER_GROUPS["order"]],
+    response_model=MessageSchema,
+    responses=ORDER_STATUS_RESPONSES
+)
+async def start_order(order_id: int,
+                      db: DBSession = Depends(get_db),
+                      current_user: CurrentUserSchema = Depends(get_current_user),
+                      order_service: OrderService = Depends(OrderService)
+                      ):
+    try:
+        message = await change_order_status(order_id, OrderStatusEnum.in_progress, db, current_user, order_service)
+
+        logger.info("(Start order) Order started: %s", order_id)
+        return message
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Start order) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@order_router.post(
+    "/{order_id}/complete/",
+    tags=[SWAGGER_GROUPS["order"]],
+    response_model=MessageSchema,
+    responses=ORDER_STATUS_RESPONSES
+)
+async def complete_order(order_id: int,
+                         db: DBSession = Depends(get_db),
+                         current_user: CurrentUserSchema = Depends(get_current_user),
+                         order_service: OrderService = Depends(OrderService)
+                         ):
+    try:
+        message = await change_order_status(order_id, OrderStatusEnum.completed, db, current_user, order_service)
+
+        logger.info("(Complete order) Order completed: %s", order_id)
+        return message
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Complete order) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@order_router.post(
+    "/{order_id}/cancel/",
+    tags=[SWAGGER_GROUPS["order"]],
+    response_model=MessageSchema,
+    responses=ORDER_STATUS_RESPONSES
+)
+async def cancel_order(order_id: int,
+                       db: DBSession = Depends(get_db),
+                       current_user: CurrentUserSchema = Depends(get_current_user),
+                       order_service: OrderService = Depends(OrderService)
+                       ):
+    try:
+        message = await change_order_status(order_id, OrderStatusEnum.cancelled, db, current_user, order_service)
+
+        logger.info("(Cancel order) Order cancelled: %s", order_id)
+        return message
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Cancel order) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -3,6 +3,7 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
 
 class DriverOrderDetailSchema(BaseModel):
     id: int = Field(..., description="ID заказа")
@@ -17,4 +18,5 @@ class DriverOrderDetailSchema(BaseModel):
     house_to_street: str = Field(..., description="Улица прибытия")
     house_to_building: Optional[str] = Field(..., description="Строение прибытия")
     house_to_number: str = Field(..., description="Номер дома прибытия")
+    status: OrderStatusEnum = Field(..., description="Статус заказа")
     order_time: datetime = Field(..., description="Время заказа")
\ No newline at end of file
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from src.config import BULK_CREATE_MAX
+from src.general.order.schema.order_create import OrderCreateSchema
+
+class OrderBatchCreateSchema(BaseModel):
+    orders: List[OrderCreateSchema] = Field(..., min_length=1, max_length=BULK_CREATE_MAX, description="Заказы")
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from src.general.order.schema.drive_order_detail import DriverOrderDetailSchema
+from src.general.order.schema.order_detail import OrderDetailSchema
+from src.general.order.schema.user_order_detail import UserOrderDetailSchema
+
+class OrderPageSchema(BaseModel):
+    items: list[OrderDetailSchema] = Field(..., description="Заказы страницы, от новых к старым")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, если она есть")
+
+class UserOrderPageSchema(BaseModel):
+    items: list[UserOrderDetailSchema] = Field(..., description="Заказы страницы, от новых к старым")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, если она есть")
+
+class DriverOrderPageSchema(BaseModel):
+    items: list[DriverOrderDetailSchema] = Field(..., description="Заказы страницы, от новых к старым")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы, если она есть")
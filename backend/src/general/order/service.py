@@ -1,17 +1,62 @@
 import logging
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, tuple_, literal
 
-from src.general.order.models import Order
+from src.config import DISPATCH_CLAIM_ATTEMPTS
+from src.database import DBSession, db_execute, db_commit, db_refresh, db_rollback, db_flush
+from src.general.dispatch.engine import dispatch_engine
+from src.general.driver.service import DriverService
+from src.general.house.index import HouseRecord
+from src.general.order.models import Order, OrderIdempotencyKey
+from src.general.order.batcher import order_batcher
+from src.general.order.bulk import insert_orders
+from src.general.order.idempotency import idempotency_cache
+from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
+from src.general.order.pagination import encode_cursor, decode_cursor
 from src.general.order.schema.order_create import OrderCreateSchema
 
+OrderPage = Tuple[List[Order], Optional[str]]
+
+# Из каких статусов допустим переход в данный
+ORDER_TRANSITIONS = {
+    OrderStatusEnum.in_progress: (OrderStatusEnum.assigned,),
+    OrderStatusEnum.completed: (OrderStatusEnum.in_progress,),
+    OrderStatusEnum.cancelled: (OrderStatusEnum.assigned,),
+}
+
+# Статусы, в которых заказ больше не занимает водителя
+ORDER_FINAL_STATUSES = (OrderStatusEnum.completed, OrderStatusEnum.cancelled)
+
 
 class OrderService:
     def __init__(self):
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
+    @staticmethod
+    def _order_values(user_id,
+                      driver_id,
+                      order_create_sch: OrderCreateSchema,
+                      house_from_id,
+                      house_to_id,
+                      car) -> dict:
+        return dict(
+            user_id = user_id,
+            driver_id = driver_id,
+            house_from_id = house_from_id,
+            house_from_street = order_create_sch.house_from_street,
+            house_from_building=order_create_sch.house_from_building,
+            house_from_number=order_create_sch.house_from_number,
+            house_to_id=house_to_id,
+            house_to_street = order_create_sch.house_to_street,
+            house_to_building=order_create_sch.house_to_building,
+            house_to_number=order_create_sch.house_to_number,
+            driver_class = order_create_sch.driver_class,
+            car = car,
+            status = OrderStatusEnum.assigned
+        )
+
     async def create_order(self,
                            user_id,
                            driver_id,
@@ -19,74 +64,256 @@ class OrderService:
                            house_from_id,
                            house_to_id,
                            car,
-                           db: Session):
+                           db: DBSession,
+                           idempotency_key: Optional[str] = None):
         try:
-            new_order = Order(
-                user_id = user_id,
-                driver_id = driver_id,
-                house_from_id = house_from_id,
-                house_from_street = order_create_sch.house_from_street,
-                house_from_building=order_create_sch.house_from_building,
-                house_from_number=order_create_sch.house_from_number,
-                house_to_id=house_to_id,
-                house_to_street = order_create_sch.house_to_street,
-                house_to_building=order_create_sch.house_to_building,
-                house_to_number=order_create_sch.house_to_number,
-                driver_class = order_create_sch.driver_class,
-                car = car
-            )
+            new_order = Order(**self._order_values(user_id, driver_id, order_create_sch, house_from_id, house_to_id, car))
 
             db.add(new_order)
-            db.commit()
-            db.refresh(new_order)
 
-            self.logger.info(f"(Create order) Success: {new_order}")
+            if idempotency_key:
+                # Ключ пишется в той же транзакции, что и заказ: из двух одновременных повторов
+                # закоммитится только один, у второго откатится и заказ, и захват водителя
+                await db_flush(db)
+                db.add(OrderIdempotencyKey(user_id=user_id, key=idempotency_key, order_id=new_order.id))
+
+            await db_commit(db)
+            await db_refresh(db, new_order)
+
+            if idempotency_key:
+                idempotency_cache.set((user_id, idempotency_key), new_order.id)
+
+            self.logger.info("(Create order) Success: %s", new_order)
             return new_order
 
         except Exception as e:
-            db.rollback()
-            self.logger.error(f"(Create order) Error {e}")
+            await db_rollback(db)
+            self.logger.error("(Create order) Error %s", e)
 
-    async def get_order_by_id(self, db:Session, order_id: int) -> Optional[Order]:
+    async def create_order_batched(self,
+                                   user_id,
+                                   driver_id,
+                                   order_create_sch: OrderCreateSchema,
+                                   house_from_id,
+                                   house_to_id,
+                                   car,
+                                   idempotency_key: Optional[str] = None) -> Optional[int]:
+        # Захват водителя и вставка заказа выполняются в общей транзакции с соседними заказами.
+        # Возвращает ID заказа или None, если водителя уже занял другой процесс
         try:
-            order = db.query(Order).filter(Order.id == order_id).first()
+            order_id = await order_batcher.submit(
+                self._order_values(user_id, driver_id, order_create_sch, house_from_id, house_to_id, car),
+                idempotency_key
+            )
+
+            if order_id is not None:
+                if idempotency_key:
+                    idempotency_cache.set((user_id, idempotency_key), order_id)
+                self.logger.info("(Create order batched) Success: order %s", order_id)
+
+            return order_id
+        except Exception as e:
+            self.logger.error("(Create order batched) Error %s", e)
+            raise
+
+    async def create_orders_bulk(self,
+                                 db: DBSession,
+                                 user_id: int,
+                                 orders: List[Tuple[OrderCreateSchema, HouseRecord, int]]) -> List[Optional[int]]:
+        # Пары адресов уже разрешены: (заказ, дом отправления, ID дома прибытия).
+        # Водители захватываются по одному условным UPDATE, заказы пишутся одним INSERT,
+        # все в одной транзакции. Возвращает ID заказа или None, если водителя не нашлось
+        driver_service = DriverService()
+        acquired = []
+        rows = []
+        positions = []
+
+        try:
+            for position, (order_create_sch, house_from, house_to_id) in enumerate(orders):
+                for _ in range(DISPATCH_CLAIM_ATTEMPTS):
+                    driver = dispatch_engine.acquire(order_create_sch.driver_class, house_from.latitude, house_from.longitude)
+
+                    if not driver:
+                        break
+
+                    if await driver_service.claim_driver(db, driver.driver_id):
+                        acquired.append(driver.driver_id)
+                        rows.append(self._order_values(
+                            user_id, driver.driver_id, order_create_sch, house_from.id, house_to_id, driver.car
+                        ))
+                        positions.append(position)
+                        break
+
+            order_ids = await insert_orders(db, rows)
+            await db_commit(db)
+        except Exception as e:
+            await db_rollback(db)
+            for driver_id in acquired:
+                dispatch_engine.release(driver_id)
+            self.logger.error("(Create orders bulk) Error: %s", e)
+            raise
+
+        result: List[Optional[int]] = [None] * len(orders)
+        for position, order_id in zip(positions, order_ids):
+            result[position] = order_id
+
+        self.logger.info("(Create orders bulk) Created %s of %s orders", len(order_ids), len(orders))
+        return result
+
+    async def get_order_id_by_idempotency_key(self, db: DBSession, user_id: int, key: str) -> Optional[int]:
+        order_id = idempotency_cache.get((user_id, key))
+        if order_id is not None:
+            return order_id
+
+        try:
+            result = await db_execute(
+                db,
+                select(OrderIdempotencyKey.order_id).where(
+                    OrderIdempotencyKey.user_id == user_id,
+                    OrderIdempotencyKey.key == key
+                )
+            )
+            order_id = result.scalar()
+
+            if order_id is not None:
+                idempotency_cache.set((user_id, key), order_id)
+
+            return order_id
+        except Exception as e:
+            self.logger.error("(Get order by idempotency key) Error: %s", e)
+            raise
+
+    async def change_status(self, db: DBSession, order_id: int, status: OrderStatusEnum) -> Optional[int]:
+        # Возвращает ID водителя заказа, если переход выполнен, иначе None
+        try:
+            result = await db_execute(
+                db,
+                update(Order)
+                .where(Order.id == order_id, Order.status.in_(ORDER_TRANSITIONS[status]))
+                .values(status=status)
+                .returning(Order.driver_id)
+                .execution_options(synchronize_session=False)
+            )
+            driver_id = result.scalar()
+
+            if driver_id is None:
+                await db_rollback(db)
+                self.logger.info("(Change order status) Order %s can not move to %s", order_id, status.value)
+                return None
+
+            if status in ORDER_FINAL_STATUSES:
+                await DriverService().release_driver(db, driver_id)
+
+            await db_commit(db)
+
+            self.logger.info("(Change order status) Order %s moved to %s", order_id, status.value)
+            return driver_id
+        except Exception as e:
+            await db_rollback(db)
+            self.logger.error("(Change order status) Error: %s", e)
+            raise
+
+    async def get_order_by_id(self, db: DBSession, order_id: int) -> Optional[Order]:
+        try:
+            result = await db_execute(db, select(Order).where(Order.id == order_id))
+            order = result.scalars().first()
 
             if order:
-                self.logger.info(f"(Get order by ID) Found order with ID {order_id}")
+                self.logger.info("(Get order by ID) Found order with ID %s", order_id)
             else:
-                self.logger.info(f"(Get order by ID) No house order with ID {order_id}")
+                self.logger.info("(Get order by ID) No house order with ID %s", order_id)
 
             return order
         except Exception as e:
-            self.logger.error(f"(Get order by ID) Error: {e}")
+            self.logger.error("(Get order by ID) Error: %s", e)
             raise
 
-    async def get_user_orders(self, db: Session, user_id: int) -> List[Order]:
+    @staticmethod
+    async def _get_page(db: DBSession,
+                        query,
+                        limit: int,
+                        cursor: Optional[str],
+                        date_from: Optional[datetime],
+                        date_to: Optional[datetime]) -> OrderPage:
+        if date_from:
+            query = query.where(Order.order_date >= date_from)
+        if date_to:
+            query = query.where(Order.order_date < date_to)
+        if cursor:
+            order_date, order_id = decode_cursor(cursor)
+            # Значение курсора привязывается с типом колонки, чтобы совпасть с хранимым форматом
+            query = query.where(
+                tuple_(Order.order_date, Order.id) < tuple_(literal(order_date, Order.order_date.type), order_id)
+            )
+
+        # Лишняя запись показывает, есть ли следующая страница
+        query = query.order_by(Order.order_date.desc(), Order.id.desc()).limit(limit + 1)
+        result = await db_execute(db, query)
+        orders = result.scalars().all()
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1].order_date, orders[-1].id)
+
+        return orders, next_cursor
+
+    async def get_user_orders(self,
+                              db: DBSession,
+                              user_id: int,
+                              limit: int,
+                              cursor: Optional[str] = None,
+                              date_from: Optional[datetime] = None,
+                              date_to: Optional[datetime] = None) -> OrderPage:
         try:
-            orders = db.query(Order).filter(Order.user_id == user_id).all()
-            self.logger.info(f"(Get user orders) Retrieved user {len(orders)} orders")
+            orders, next_cursor = await self._get_page(
+                db, select(Order).where(Order.user_id == user_id), limit, cursor, date_from, date_to
+            )
+            self.logger.info("(Get user orders) Retrieved user %s orders", len(orders))
 
-            return orders
+            return orders, next_cursor
+        except ValueError as e:
+            self.logger.warning("(Get user orders) Invalid cursor: %s", e)
+            raise
         except Exception as e:
-            self.logger.error(f"(Get user orders) Error: {e}")
+            self.logger.error("(Get user orders) Error: %s", e)
             raise
 
-    async def get_driver_orders(self, db: Session, driver_id: int) -> List[Order]:
+    async def get_driver_orders(self,
+                                db: DBSession,
+                                driver_id: int,
+                                limit: int,
+                                cursor: Optional[str] = None,
+                                date_from: Optional[datetime] = None,
+                                date_to: Optional[datetime] = None) -> OrderPage:
         try:
-            orders = db.query(Order).filter(Order.driver_id == driver_id).all()
-            self.logger.info(f"(Get driver orders) Retrieved driver {len(orders)} orders")
+            orders, next_cursor = await self._get_page(
+                db, select(Order).where(Order.driver_id == driver_id), limit, cursor, date_from, date_to
+            )
+            self.logger.info("(Get driver orders) Retrieved driver %s orders", len(orders))
 
-            return orders
+            return orders, next_cursor
+        except ValueError as e:
+            self.logger.warning("(Get driver orders) Invalid cursor: %s", e)
+            raise
         except Exception as e:
-            self.logger.error(f"(Get driver orders) Error: {e}")
+            self.logger.error("(Get driver orders) Error: %s", e)
             raise
 
-    async def get_orders(self, db: Session) -> List[Order]:
+    async def get_orders(self,
+                         db: DBSession,
+                         limit: int,
+                         cursor: Optional[str] = None,
+                         date_from: Optional[datetime] = None,
+                         date_to: Optional[datetime] = None) -> OrderPage:
         try:
-            orders = db.query(Order).all()
-            self.logger.info(f"(Get orders) Retrieved {len(orders)} orders")
+            orders, next_cursor = await self._get_page(db, select(Order), limit, cursor, date_from, date_to)
+            self.logger.info("(Get orders) Retrieved %s orders", len(orders))
 
-            return orders
+            return orders, next_cursor
+        except ValueError as e:
+            self.logger.warning("(Get orders) Invalid cursor: %s", e)
+            raise
         except Exception as e:
-            self.logger.error(f"(Get orders) Error: {e}")
-            raise
\ No newline at end of file
+            self.logger.error("(Get orders) Error: %s", e)
+            raise
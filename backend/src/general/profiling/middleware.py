@@ -0,0 +1,101 @@
+import hmac
+import logging
+import random
+import time
+
+from datetime import datetime
+
+from src.config import PROFILING_TOKEN, PROFILING_SAMPLE_RATE
+from src.general.profiling.profiler import profiler_class
+from src.general.profiling.store import profile_store, ProfileRecord
+from src.helper.metrics.http import route_label
+
+PROFILE_HEADER = b"x-profile"
+# Скачивание профилей не профилируется
+EXCLUDED_PREFIX = "/api/taksa/profiles"
+
+
+def has_profile_token(scope) -> bool:
+    if not PROFILING_TOKEN:
+        return False
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value, PROFILING_TOKEN.encode())
+    return False
+
+
+class ProfilingMiddleware:
+    # Подключается только при заданном токене или выборке, иначе запросы его не проходят
+    def __init__(self, app):
+        self.logger = logging.getLogger(__name__)
+
+        self.app = app
+        self.profiler_class = profiler_class()
+        # Профилировщик один на поток: одновременно профилируется один запрос, остальные идут как обычно
+        self._active = False
+        self._in_flight = 0
+        self._overlapped = 0
+
+    def should_profile(self, scope) -> bool:
+        if self._active or scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PREFIX):
+            return False
+        if not (has_profile_token(scope) or random.random() < PROFILING_SAMPLE_RATE):
+            return False
+        if self.profiler_class.exclusive and self._in_flight:
+            # cProfile записал бы в профиль и чужие запросы
+            self.logger.info("(Profiling) Skipped %s: %s requests in flight", scope["path"], self._in_flight)
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not self.should_profile(scope):
+            self._overlapped += self._active
+            self._in_flight += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._in_flight -= 1
+            return
+
+        profile_id = profile_store.new_id()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = self.profiler_class()
+        self._active = True
+        self._overlapped = 0
+        self._in_flight += 1
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            elapsed = time.perf_counter() - started
+            self._in_flight -= 1
+            self._active = False
+
+            profile_store.add(ProfileRecord(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=route_label(scope),
+                status_code=status,
+                duration_ms=round(elapsed * 1000, 2),
+                overlapped=self._overlapped,
+                engine=profiler.engine,
+                extension=profiler.extension,
+                media_type=profiler.media_type,
+                created_at=datetime.now(),
+                data=profiler.dump()
+            ))
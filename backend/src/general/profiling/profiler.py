@@ -0,0 +1,67 @@
+import cProfile
+import logging
+import marshal
+import pstats
+
+from src.config import PROFILING_ENGINE
+
+try:
+    from pyinstrument import Profiler as StatisticalProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    StatisticalProfiler = None
+
+logger = logging.getLogger(__name__)
+
+
+class CProfileProfiler:
+    # Детерминированный профилировщик; результат в формате pstats (snakeviz, flameprof, gprof2dot).
+    # Видит только поток цикла событий: синхронные зависимости в пуле потоков не попадают.
+    # Не различает задачи: все, что цикл событий выполняет между await, попадает в профиль
+    engine = "cprofile"
+    # Запускается только без других запросов в обработке
+    exclusive = True
+    extension = "pstats"
+    media_type = "application/octet-stream"
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        self._profiler.disable()
+
+    def dump(self) -> bytes:
+        # То же, что pstats.Stats.dump_stats, но без временного файла
+        return marshal.dumps(pstats.Stats(self._profiler).stats)
+
+
+class PyinstrumentProfiler:
+    # Статистический профилировщик с учетом await: в профиль попадает только задача запроса;
+    # результат для speedscope.app
+    engine = "pyinstrument"
+    exclusive = False
+    extension = "speedscope.json"
+    media_type = "application/json"
+
+    def __init__(self):
+        self._profiler = StatisticalProfiler(async_mode="enabled")
+
+    def start(self) -> None:
+        self._profiler.start()
+
+    def stop(self) -> None:
+        self._profiler.stop()
+
+    def dump(self) -> bytes:
+        return self._profiler.output(SpeedscopeRenderer()).encode()
+
+
+def profiler_class():
+    if PROFILING_ENGINE == "pyinstrument":
+        if StatisticalProfiler is not None:
+            return PyinstrumentProfiler
+        logger.warning("(Profiling) pyinstrument is not installed, falling back to cProfile")
+    return CProfileProfiler
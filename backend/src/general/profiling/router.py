@@ -0,0 +1,99 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+
+from src.config import SWAGGER_GROUPS
+from src.general.auth.dependency import get_current_admin
+from src.general.profiling.schema.profile import ProfileInfoSchema
+from src.general.profiling.store import profile_store
+from src.helper.error.schema import ErrorSchema
+
+logger = logging.getLogger(__name__)
+
+profiling_router = APIRouter(prefix="/profiles")
+
+
+@profiling_router.get(
+    "/",
+    tags=[SWAGGER_GROUPS["profiling"]],
+    response_model=list[ProfileInfoSchema],
+    dependencies=[Depends(get_current_admin)],
+    responses={
+        200: {
+            "model": list[ProfileInfoSchema]
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def get_profiles():
+    try:
+        return [
+            ProfileInfoSchema(
+                id=record.id,
+                method=record.method,
+                path=record.path,
+                route=record.route,
+                status_code=record.status_code,
+                duration_ms=record.duration_ms,
+                overlapped=record.overlapped,
+                engine=record.engine,
+                size=len(record.data),
+                created_at=record.created_at
+            )
+            for record in profile_store.list()
+        ]
+    except Exception as e:
+        logger.error("(Get profiles) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@profiling_router.get(
+    "/{profile_id}",
+    tags=[SWAGGER_GROUPS["profiling"]],
+    response_class=Response,
+    dependencies=[Depends(get_current_admin)],
+    responses={
+        200: {
+            "content": {"application/octet-stream": {}, "application/json": {}}
+        },
+        401: {
+            "model": ErrorSchema
+        },
+        403: {
+            "model": ErrorSchema
+        },
+        404: {
+            "model": ErrorSchema
+        },
+        500: {
+            "model": ErrorSchema
+        }
+    }
+)
+async def download_profile(profile_id: str):
+    try:
+        record = profile_store.get(profile_id)
+
+        if record is None:
+            logger.warning("(Download profile) Profile not found: %s", profile_id)
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+        return Response(
+            content=record.data,
+            media_type=record.media_type,
+            headers={"Content-Disposition": f'attachment; filename="{record.id}.{record.extension}"'}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("(Download profile) Error: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
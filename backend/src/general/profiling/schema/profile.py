@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+class ProfileInfoSchema(BaseModel):
+    id: str = Field(..., description="Идентификатор профиля (заголовок X-Profile-Id ответа)")
+    method: str = Field(..., description="HTTP-метод")
+    path: str = Field(..., description="Путь запроса")
+    route: str = Field(..., description="Шаблон маршрута")
+    status_code: int = Field(..., description="Код ответа")
+    duration_ms: float = Field(..., description="Время обработки под профилировщиком, мс")
+    overlapped: int = Field(..., description="Запросов, начатых во время профилирования")
+    engine: str = Field(..., description="Профилировщик: cprofile или pyinstrument")
+    size: int = Field(..., description="Размер профиля, байт")
+    created_at: datetime = Field(..., description="Время записи профиля")
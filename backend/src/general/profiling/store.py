@@ -0,0 +1,50 @@
+import uuid
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from src.config import PROFILING_MAX_PROFILES
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    method: str
+    path: str
+    route: str
+    status_code: int
+    duration_ms: float
+    # Сколько запросов началось, пока шло профилирование (для cprofile они попадают в профиль)
+    overlapped: int
+    engine: str
+    extension: str
+    media_type: str
+    created_at: datetime
+    data: bytes
+
+
+class ProfileStore:
+    # Последние профили в памяти процесса; самые старые вытесняются
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, ProfileRecord]" = OrderedDict()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex[:16]
+
+    def add(self, record: ProfileRecord) -> None:
+        self._profiles[record.id] = record
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[ProfileRecord]:
+        return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(PROFILING_MAX_PROFILES)
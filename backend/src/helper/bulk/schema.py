@@ -0,0 +1,14 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+class BulkItemResultSchema(BaseModel):
+    index: int = Field(..., description="Позиция элемента в запросе")
+    status_code: int = Field(..., description="HTTP-код, который вернул бы одиночный запрос")
+    id: Optional[int] = Field(None, description="ID созданной записи")
+    detail: Optional[str] = Field(None, description="Причина отказа")
+
+class BulkResultSchema(BaseModel):
+    created: int = Field(..., description="Создано записей")
+    failed: int = Field(..., description="Не создано записей")
+    items: List[BulkItemResultSchema] = Field(..., description="Результаты по элементам в порядке запроса")
@@ -0,0 +1,198 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Dict, Optional, TextIO
+
+from src.config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLING, LOG_FLUSH_INTERVAL_MS, LOG_QUEUE_SIZE
+from src.helper.metrics.prometheus import registry, CounterFamily
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+log_records_dropped_total = registry.register(CounterFamily(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+))
+
+# JWT (три base64url-части, заголовок всегда начинается с eyJ) и значение заголовка Authorization
+TOKEN_PATTERNS = (
+    (re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*"), "[redacted token]"),
+    (re.compile(r"(Bearer\s+)\S+", re.IGNORECASE), r"\1[redacted]"),
+)
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in TOKEN_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    # "src.general.auth.service=0.1,src.general.house.service=0.5" -> {логгер: доля}
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, rate = item.rsplit("=", 1)
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    # Пропускает долю сообщений INFO и ниже от горячих логгеров; WARNING и выше проходят всегда.
+    # Доля берется по самому длинному совпадающему префиксу имени логгера
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._by_logger: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._by_logger.get(name)
+        if rate is None:
+            rate, matched = 1.0, -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > matched:
+                    rate, matched = value, len(prefix)
+            self._by_logger[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        if rate >= 1:
+            return True
+        # Доля сохраняется в записи, чтобы по логам можно было восстановить исходное число сообщений
+        record.sample_rate = rate
+        return random.random() < rate
+
+
+class ArgsMergingQueueHandler(QueueHandler):
+    # Аргументы подставляются в сообщение в потоке вызова: объекты (например, модели ORM) нельзя
+    # читать из другого потока. Форматирование, JSON, маскирование и запись - в потоке LogWriter
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Если поток записи не успевает, сообщение теряется, а не блокирует цикл событий
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage())
+        }
+        if hasattr(record, "sample_rate"):
+            entry["sample_rate"] = record.sample_rate
+        if record.exc_info:
+            entry["exception"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class LogWriter:
+    # Поток записи из очереди. В отличие от QueueListener просыпается не на каждое сообщение:
+    # после первого ждет interval и забирает все накопившееся, пишет пачку одним flush.
+    # Так поток реже отбирает GIL у цикла событий
+    _stop = object()
+
+    def __init__(self, log_queue: queue.Queue, formatter: logging.Formatter, stream: TextIO,
+                 interval: float):
+        self.queue = log_queue
+        self.formatter = formatter
+        self.stream = stream
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.queue.put(self._stop)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            if batch[0] is not self._stop:
+                time.sleep(self.interval)
+            try:
+                while True:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            lines = []
+            for record in batch:
+                if record is self._stop:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(self.formatter.format(record))
+                except Exception:
+                    lines.append(f"Unformattable log record from {record.name}: {record.msg!r}")
+
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    pass
+
+
+_queue_handler: Optional[QueueHandler] = None
+_writer: Optional[LogWriter] = None
+
+
+def setup_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT, sampling: str = LOG_SAMPLING,
+                  stream: Optional[TextIO] = None) -> None:
+    # Логгеры пишут в очередь, форматирование и вывод делает отдельный поток,
+    # поэтому запись лога не блокирует цикл событий
+    global _queue_handler, _writer
+    shutdown_logging()
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = ArgsMergingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    formatter = JsonFormatter() if log_format == "json" else TextFormatter(TEXT_FORMAT)
+    _writer = LogWriter(log_queue, formatter, stream or sys.stderr, LOG_FLUSH_INTERVAL_MS / 1000)
+    _writer.start()
+
+
+def shutdown_logging() -> None:
+    # Дописывает оставшиеся в очереди сообщения и останавливает поток записи
+    global _queue_handler, _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(shutdown_logging)
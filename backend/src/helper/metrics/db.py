@@ -0,0 +1,136 @@
+import logging
+import time
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN
+from src.helper.metrics.prometheus import registry, CounterFamily, HistogramFamily
+
+logger = logging.getLogger(__name__)
+
+# Предел длины текста запроса, параметров и плана в логе
+LOG_TEXT_LIMIT = 1000
+EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN "
+}
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+@dataclass
+class RequestQueries:
+    count: int = 0
+    seconds: float = 0.0
+    slow: int = 0
+    # Число выполнений каждого текста запроса: повторы одного запроса указывают на N+1
+    statements: Counter = field(default_factory=Counter)
+
+
+# Запросы к БД текущего HTTP-запроса; вне запроса (фоновые задачи) не задан
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+db_queries_total = registry.register(CounterFamily(
+    "db_queries_total", "SQL statements executed", ("engine",)
+))
+db_query_duration = registry.register(HistogramFamily(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine",)
+))
+db_slow_queries_total = registry.register(CounterFamily(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS", ("engine",)
+))
+
+
+def _truncate(value) -> str:
+    text = " ".join(str(value).split())
+    return text if len(text) <= LOG_TEXT_LIMIT else text[:LOG_TEXT_LIMIT] + "..."
+
+
+def describe_parameters(parameters) -> str:
+    # В лог попадают только число и типы параметров: значения могут быть почтой или хешем пароля
+    if not parameters:
+        return "-"
+    if isinstance(parameters, dict):
+        return ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items())
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"{len(parameters)} rows of {describe_parameters(parameters[0])}"
+    return ", ".join(type(value).__name__ for value in parameters)
+
+
+def explain(conn, statement: str, parameters) -> str:
+    # План через сырой курсор того же соединения, без повторного срабатывания событий.
+    # В PostgreSQL ошибка EXPLAIN прервала бы транзакцию запроса, поэтому он идет внутри точки сохранения;
+    # SQLite транзакцию при ошибке не прерывает, а точку сохранения не создаст, пока не дочитан RETURNING
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return "-"
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(EXPLAIN_PREFIX.get(conn.dialect.name, "EXPLAIN ") + statement, parameters)
+            plan = " / ".join(str(row[-1]) for row in cursor.fetchall()) or "-"
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        finally:
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def log_slow_query(conn, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+    plan = "-"
+    if SLOW_QUERY_EXPLAIN and not executemany:
+        try:
+            plan = explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"unavailable ({type(e).__name__})"
+
+    logger.warning("(Slow query) %.1f ms: %s | params: %s | plan: %s",
+                   elapsed * 1000, _truncate(statement), _truncate(describe_parameters(parameters)), _truncate(plan))
+
+
+def instrument_engine(name: str, engine: Engine) -> None:
+    # Время выполнения каждого SQL-запроса; для асинхронного движка передается его sync_engine
+    labels = (name,)
+    slow_seconds = SLOW_QUERY_MS / 1000
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_queries_total.inc(labels)
+        db_query_duration.observe(labels, elapsed)
+
+        slow = 0 < slow_seconds <= elapsed
+        if slow:
+            db_slow_queries_total.inc(labels)
+            log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+        queries = current_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += elapsed
+            queries.slow += slow
+            queries.statements[statement] += 1
+
+    def handle_error(context):
+        # after_cursor_execute при ошибке не вызывается
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
@@ -0,0 +1,110 @@
+import logging
+import time
+
+from fastapi import Request
+
+from src.config import QUERY_BUDGET, QUERY_DEBUG_HEADERS
+
+from src.helper.metrics.db import current_queries, RequestQueries
+from src.helper.metrics.prometheus import registry, CounterFamily, GaugeFamily, HistogramFamily
+
+logger = logging.getLogger(__name__)
+
+# Сколько самых частых запросов показывать при превышении бюджета
+BUDGET_TOP_STATEMENTS = 3
+# Число SQL-запросов на HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+http_requests_total = registry.register(CounterFamily(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+http_request_duration = registry.register(HistogramFamily(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(GaugeFamily(
+    "http_requests_in_flight", "HTTP requests being handled", ("method", "route")
+))
+http_request_db_queries = registry.register(HistogramFamily(
+    "http_request_db_queries", "SQL statements per HTTP request", ("method", "route"), QUERY_COUNT_BUCKETS
+))
+http_request_db_seconds = registry.register(HistogramFamily(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request", ("method", "route")
+))
+http_requests_over_query_budget = registry.register(CounterFamily(
+    "http_requests_over_query_budget_total", "HTTP requests issuing more than QUERY_BUDGET SQL statements",
+    ("method", "route")
+))
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_label(scope) -> str:
+    # Метка по шаблону пути (/order/{order_id}/), а не по самому пути, чтобы не плодить ряды;
+    # маршрут известен только после маршрутизации
+    return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+async def track_in_flight(request: Request):
+    # Зависимость роутера: в middleware маршрут до вызова приложения еще не определен
+    labels = (request.method, route_label(request.scope))
+    http_requests_in_flight.inc(labels)
+    try:
+        yield
+    finally:
+        http_requests_in_flight.dec(labels)
+
+
+class MetricsMiddleware:
+    # Чистый ASGI-middleware: BaseHTTPMiddleware буферизует ответ и добавляет задержку
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        queries = RequestQueries()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if QUERY_DEBUG_HEADERS:
+                    # Для потоковых ответов учитываются запросы до начала отправки тела
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(queries.count).encode()),
+                        (b"x-db-time-ms", f"{queries.seconds * 1000:.1f}".encode()),
+                        (b"x-db-slow-queries", str(queries.slow).encode())
+                    ]
+            await send(message)
+
+        token = current_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_queries.reset(token)
+
+            method, route = scope["method"], route_label(scope)
+            labels = (method, route, str(status))
+            http_requests_total.inc(labels)
+            http_request_duration.observe(labels, elapsed)
+            http_request_db_queries.observe((method, route), queries.count)
+            http_request_db_seconds.observe((method, route), queries.seconds)
+
+            if 0 < QUERY_BUDGET < queries.count:
+                http_requests_over_query_budget.inc((method, route))
+                log_query_budget_exceeded(method, route, queries)
+
+
+def log_query_budget_exceeded(method: str, route: str, queries: RequestQueries) -> None:
+    # Повторы одного и того же запроса в пределах HTTP-запроса - признак N+1
+    repeated = ", ".join(
+        f"{count}x {' '.join(statement.split())[:200]}"
+        for statement, count in queries.statements.most_common(BUDGET_TOP_STATEMENTS)
+    )
+    logger.warning("(Query budget) %s %s issued %s queries (budget %s) in %.1f ms, most frequent: %s",
+                   method, route, queries.count, QUERY_BUDGET, queries.seconds * 1000, repeated)
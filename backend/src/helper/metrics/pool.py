@@ -0,0 +1,89 @@
+import threading
+import time
+
+from typing import Dict, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from src.helper.metrics.histogram import Histogram
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, wait_seconds: float, timed_out: bool) -> None:
+        self.checkout_wait.observe(wait_seconds)
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+
+# Метрики всех инструментированных движков, ключ - имя движка ("sync", "async")
+pool_metrics: Dict[str, PoolMetrics] = {}
+_engines = {}
+
+
+def instrumented_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    # QueuePool не публикует событие "ожидание соединения", поэтому время ожидания
+    # измеряется вокруг _do_get. Класс пересоздается через self.__class__ при dispose(),
+    # так что привязанные метрики переживают пересоздание пула.
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.observe_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.observe_checkout(time.perf_counter() - started, timed_out=False)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def register_engine(name: str, engine, metrics: PoolMetrics) -> None:
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+    pool_metrics[name] = metrics
+    _engines[name] = engine
+
+
+def pool_snapshot() -> list:
+    snapshot = []
+
+    for name, engine in _engines.items():
+        pool = engine.pool
+        metrics = pool_metrics[name]
+
+        snapshot.append({
+            "engine": name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "connects": metrics.connects,
+            "invalidations": metrics.invalidations,
+            "checkout_wait": metrics.checkout_wait.snapshot()
+        })
+
+    return snapshot
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    # Наивное UTC-время: так его трактуют PyJWT при проверке exp и колонки TIMESTAMP без часового пояса
+    return datetime.now(timezone.utc).replace(tzinfo=None)
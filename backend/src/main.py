@@ -1,24 +1,77 @@
+import asyncio
 import logging
 
-from fastapi import FastAPI, APIRouter
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.config import (CRL_REFRESH_SECONDS, CRL_PRUNE_SECONDS, DISPATCH_SYNC_SECONDS, LOCATION_FLUSH_SECONDS,
+                        ADDRESS_INDEX_REFRESH_SECONDS, IDEMPOTENCY_PRUNE_SECONDS, METRICS_ENABLED,
+                        PROFILING_TOKEN, PROFILING_SAMPLE_RATE, ADDRESS_FUZZY_MATCH)
+from src.general.auth.service.hashing import password_hasher
+from src.general.auth.service.revocation import revocation_cache, run_crl_pruning
+from src.general.dispatch.engine import dispatch_engine
+from src.general.location.buffer import location_buffer
+from src.general.house.index import address_index
+from src.general.house.autocomplete import autocomplete_index
+from src.general.house.fuzzy import fuzzy_index
+from src.general.order.idempotency import run_idempotency_pruning
+from src.general.profiling.middleware import ProfilingMiddleware
+from src.helper.log.pipeline import setup_logging
+from src.helper.metrics.http import MetricsMiddleware, track_in_flight
+
 from src.general.auth.router import user_router
 from src.general.house.router import house_router
 from src.general.driver.router import driver_router
 from src.general.order.router import order_router
+from src.general.location.router import location_router
+from src.general.metrics.router import metrics_router
+from src.general.profiling.router import profiling_router
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/taksa")
+router = APIRouter(prefix="/api/taksa", dependencies=[Depends(track_in_flight)] if METRICS_ENABLED else [])
 
 router.include_router(driver_router)
 router.include_router(house_router)
 router.include_router(user_router)
 router.include_router(order_router)
+router.include_router(location_router)
+router.include_router(metrics_router)
+router.include_router(profiling_router)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await revocation_cache.load()
+    await dispatch_engine.load()
+    await address_index.load()
+    await autocomplete_index.rebuild()
+    if ADDRESS_FUZZY_MATCH:
+        # Нечеткий поиск при создании заказа не ждет построения индекса
+        await fuzzy_index.rebuild()
+
+    background_tasks = [
+        asyncio.create_task(revocation_cache.run_refresh(CRL_REFRESH_SECONDS)),
+        asyncio.create_task(run_crl_pruning(CRL_PRUNE_SECONDS)),
+        asyncio.create_task(run_idempotency_pruning(IDEMPOTENCY_PRUNE_SECONDS)),
+        asyncio.create_task(dispatch_engine.run_sync(DISPATCH_SYNC_SECONDS)),
+        asyncio.create_task(address_index.run_refresh(ADDRESS_INDEX_REFRESH_SECONDS)),
+        # При остановке задача сбрасывает в БД оставшиеся в буфере координаты
+        asyncio.create_task(location_buffer.run_flush(LOCATION_FLUSH_SECONDS))
+    ]
 
-app = FastAPI()
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(router)
 
@@ -29,3 +82,11 @@ app.add_middleware(
      allow_methods=["*"],
      allow_headers=["*"],
 )
+
+# Профилировщик внутри метрик: его накладные расходы видны в задержке профилируемых запросов
+if PROFILING_TOKEN or PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+
+# Добавляется последним, чтобы быть внешним и учитывать время всех остальных middleware
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,38 @@
+# Тесты сервиса. Запуск из каталога backend:
+#   pytest tests
+import asyncio
+import os
+
+import pytest
+
+# Модули src создают движок при импорте: без DB_URL он смотрел бы в PostgreSQL приложения
+os.environ.setdefault("DB_URL", "sqlite://")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("JWT_REFRESH_SECRET_KEY", "test-refresh-secret-key-of-at-least-32-bytes")
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from src import database
+
+    # Сессии приложения (get_db, open_session) открываются на той же базе, что и сессия теста
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+    database.Base.metadata.create_all(engine)
+    with database.SessionLocal() as session:
+        yield session
+    engine.dispose()
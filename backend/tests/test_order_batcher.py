@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.driver.models import Driver
+from src.general.order.batcher import OrderBatcher
+from src.general.order.enum.OrderStatusEnum import OrderStatusEnum
+from src.general.order.models import Order, OrderIdempotencyKey
+
+
+def order_values(driver_id: int) -> dict:
+    return dict(user_id=1, driver_id=driver_id, house_from_id=1, house_from_street="ул. Ленина", house_from_number="1",
+                house_to_id=2, house_to_street="ул. Мира", house_to_number="2",
+                driver_class=DriverClassEnum.econom, car="А001АА", status=OrderStatusEnum.assigned)
+
+
+def test_failed_order_does_not_fail_the_batch(loop, db):
+    for index in range(4):
+        db.add(Driver(name=f"Водитель {index}", tel="+7 (999) 000 00-00", car=f"А00{index}АА",
+                      driver_class=DriverClassEnum.econom))
+    # Ключ уже использован: заказ с ним падает на уникальном индексе и валит общую транзакцию пачки
+    db.add(OrderIdempotencyKey(user_id=1, key="used", order_id=100))
+    db.commit()
+
+    batcher = OrderBatcher(True, 50, 100)
+
+    async def submit_all():
+        return await asyncio.gather(
+            batcher.submit(order_values(1), "first"),
+            batcher.submit(order_values(2), "used"),
+            batcher.submit(order_values(3)),
+            batcher.submit(order_values(4), "fourth"),
+            return_exceptions=True
+        )
+
+    results = loop.run_until_complete(submit_all())
+
+    assert isinstance(results[1], IntegrityError)
+    order_ids = [results[0], results[2], results[3]]
+    assert all(isinstance(order_id, int) for order_id in order_ids)
+    assert batcher.batches == 1
+    assert batcher.fallbacks == 1
+
+    orders = db.execute(select(Order.id, Order.driver_id)).all()
+    assert sorted(orders) == sorted(zip(order_ids, (1, 3, 4)))
+    drivers = dict(db.execute(select(Driver.id, Driver.active_orders)).all())
+    assert drivers == {1: 1, 2: 0, 3: 1, 4: 1}
@@ -0,0 +1,39 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from src.main import app
+from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.driver.models import Driver
+from src.general.house.models import House
+from src.general.order.models import Order
+
+PREFIX = "/api/taksa"
+
+ORDER = dict(house_from_street="ул. Зелёная", house_from_building=None, house_from_number="48",
+             house_to_street="ул. Ленина", house_to_building="2", house_to_number="1", driver_class="econom")
+
+
+def test_create_order_replays_idempotency_key(db):
+    for index in range(2):
+        db.add(Driver(name=f"Водитель {index}", tel="+7 (999) 000 00-00", car=f"А00{index}АА",
+                      driver_class=DriverClassEnum.econom))
+    db.add(House(street="ул. Зелёная", building=None, number="48"))
+    db.add(House(street="ул. Ленина", building="2", number="1"))
+    db.commit()
+
+    with TestClient(app) as client:
+        client.post(PREFIX + "/user/register/",
+                    json=dict(name="Пользователь", tel="+7 (999) 111 22-33", email="user@test.ru", password="password1"))
+        token = client.post(PREFIX + "/user/login/", json=dict(email="user@test.ru", password="password1")).json()
+        headers = {"Authorization": "Bearer " + token["access_token"], "Idempotency-Key": str(uuid.uuid4())}
+
+        first = client.post(PREFIX + "/order/create/", json=ORDER, headers=headers)
+        second = client.post(PREFIX + "/order/create/", json=ORDER, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["messageDigest"] == first.json()["messageDigest"]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert db.execute(select(func.count(Order.id))).scalar() == 1
@@ -0,0 +1,36 @@
+import pytest
+
+from src.general.driver.enum.DriverClassEnum import DriverClassEnum
+from src.general.order.models import Order
+from src.general.order.service import OrderService
+
+
+def add_orders(db, count: int) -> None:
+    for index in range(count):
+        db.add(Order(user_id=1, driver_id=1, house_from_id=1, house_from_street="ул. Ленина", house_from_number="1",
+                     house_to_id=2, house_to_street="ул. Мира", house_to_number=str(index),
+                     driver_class=list(DriverClassEnum)[0], car="А001АА"))
+    db.commit()
+
+
+def test_get_orders_pages_through_all_orders(loop, db):
+    add_orders(db, 7)
+    service = OrderService()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        orders, cursor = loop.run_until_complete(service.get_orders(db, 3, cursor))
+        seen.extend(order.id for order in orders)
+        pages += 1
+        if cursor is None:
+            break
+        assert pages < 10, "cursor does not advance"
+
+    assert pages == 3
+    assert sorted(seen) == sorted(set(seen))
+    assert len(seen) == 7
+
+
+def test_get_orders_rejects_invalid_cursor(loop, db):
+    with pytest.raises(ValueError):
+        loop.run_until_complete(OrderService().get_orders(db, 3, "not-a-cursor"))